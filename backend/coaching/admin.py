@@ -1,10 +1,41 @@
 from django.contrib import admin
-from .models import Consultation
+from .models import AnalysisCache, Consultation, DailyConsultationRollup, TranscriptCache, UploadSession
 
 
 @admin.register(Consultation)
 class ConsultationAdmin(admin.ModelAdmin):
-    list_display = ['title', 'file_type', 'status', 'created_at', 'completed_at']
-    list_filter = ['status', 'file_type', 'created_at']
+    list_display = ['title', 'file_type', 'status', 'overall_score', 'created_at', 'completed_at']
+    list_filter = ['status', 'archive_status', 'file_type', 'created_at']
     search_fields = ['title']
-    readonly_fields = ['created_at', 'updated_at', 'completed_at', 'original_content', 'analysis_result', 'supabase_file_url']
+    readonly_fields = ['created_at', 'updated_at', 'completed_at', 'original_content', 'analysis_result', 'supabase_file_url', 'archive_status', 'archive_attempts', 'archive_error', 'archived_at', 'content_hash', 'stt_engine', 'stt_model', 'media_duration', 'stt_seconds', 'stt_rtf', 'analysis_cache_hit']
+
+
+@admin.register(AnalysisCache)
+class AnalysisCacheAdmin(admin.ModelAdmin):
+    list_display = ['key', 'model_name', 'prompt_version', 'hit_count', 'created_at', 'last_hit_at']
+    list_filter = ['model_name', 'prompt_version']
+    search_fields = ['key']
+    readonly_fields = ['key', 'model_name', 'prompt_version', 'result', 'hit_count', 'created_at', 'last_hit_at']
+
+
+@admin.register(TranscriptCache)
+class TranscriptCacheAdmin(admin.ModelAdmin):
+    list_display = ['content_hash', 'engine', 'model_name', 'stt_version', 'hit_count', 'created_at', 'last_hit_at']
+    list_filter = ['engine', 'model_name', 'stt_version']
+    search_fields = ['key', 'content_hash']
+    readonly_fields = ['key', 'content_hash', 'engine', 'model_name', 'stt_version', 'text', 'segments', 'hit_count', 'created_at', 'last_hit_at']
+
+
+@admin.register(DailyConsultationRollup)
+class DailyConsultationRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'file_type', 'status', 'consultation_count', 'distinct_users', 'processing_seconds_sum']
+    list_filter = ['file_type', 'status']
+    date_hierarchy = 'date'
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['file_name', 'user', 'status', 'offset', 'total_size', 'created_at', 'updated_at']
+    list_filter = ['status', 'file_type']
+    search_fields = ['file_name', 'title']
+    readonly_fields = ['id', 'file', 'offset', 'content_hash', 'consultation', 'created_at', 'updated_at']
@@ -0,0 +1,23 @@
+"""
+PostgreSQL 전용 집계 함수
+"""
+from django.db.models import Aggregate, FloatField, Func
+
+
+class EpochSeconds(Func):
+    """interval(timedelta) 값을 초 단위 실수로 변환"""
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    output_field = FloatField()
+
+
+class PercentileCont(Aggregate):
+    """연속 백분위수 (PERCENTILE_CONT ... WITHIN GROUP)"""
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile, **extra):
+        if not 0 <= percentile <= 1:
+            raise ValueError('percentile은 0과 1 사이여야 합니다.')
+        super().__init__(expression, percentile=float(percentile), **extra)
@@ -0,0 +1,67 @@
+"""
+LLM 분석 결과(JSON)에서 KPI 집계용 구조화 필드 추출
+"""
+
+# 분석 JSON의 카테고리 키 -> Consultation 점수 컬럼
+CATEGORY_SCORE_FIELDS = {
+    'customer_service_attitude': 'attitude_score',
+    'problem_solving': 'problem_solving_score',
+    'communication_skills': 'communication_score',
+}
+
+RECOMMENDATION_PRIORITIES = ('high', 'medium', 'low')
+
+
+def _to_score(value):
+    """점수 값을 실수로 변환 (숫자가 아니면 None)"""
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_analysis_fields(parsed_result, analysis_text: str) -> dict:
+    """
+    분석 결과에서 Consultation에 저장할 구조화 필드 추출
+
+    Args:
+        parsed_result: 파싱된 분석 JSON (파싱 실패 시 None)
+        analysis_text: 저장할 분석 결과 문자열
+
+    Returns:
+        Consultation 필드명 -> 값 딕셔너리
+    """
+    fields = {
+        'analysis_parsed': isinstance(parsed_result, dict),
+        'analysis_length': len(analysis_text) if analysis_text else None,
+        'overall_score': None,
+        'recommendation_high_count': None,
+        'recommendation_medium_count': None,
+        'recommendation_low_count': None,
+    }
+    for field_name in CATEGORY_SCORE_FIELDS.values():
+        fields[field_name] = None
+
+    if not isinstance(parsed_result, dict):
+        return fields
+
+    fields['overall_score'] = _to_score(parsed_result.get('overall_score'))
+    for key, field_name in CATEGORY_SCORE_FIELDS.items():
+        category = parsed_result.get(key)
+        if isinstance(category, dict):
+            fields[field_name] = _to_score(category.get('score'))
+
+    recommendations = parsed_result.get('improvement_recommendations')
+    if isinstance(recommendations, list):
+        counts = dict.fromkeys(RECOMMENDATION_PRIORITIES, 0)
+        for item in recommendations:
+            if isinstance(item, dict):
+                priority = str(item.get('priority', '')).strip().lower()
+                if priority in counts:
+                    counts[priority] += 1
+        for priority, count in counts.items():
+            fields[f'recommendation_{priority}_count'] = count
+
+    return fields
@@ -0,0 +1,57 @@
+"""
+짧은 텍스트 상담 일괄 분석 대기열 (Redis)
+
+분석할 텍스트 상담 ID를 Redis 리스트에 모아두었다가 최대 건수에 도달하거나
+대기 시간이 지나면 한 번의 Gemini 요청으로 함께 분석합니다.
+상담을 추가할 때마다 지연 flush를 예약하고(예약 하나가 유실되어도 다음 예약이 처리),
+최대 건수에 도달하면 즉시 flush를 예약하므로 대기열에 남는 상담이 없습니다.
+"""
+import redis
+from django.conf import settings
+
+from .events import get_redis
+
+
+BATCH_QUEUE_KEY = 'analysis:batch:pending'
+
+
+def is_batchable(consultation) -> bool:
+    """일괄 분석 대상인지 확인 (짧은 텍스트 상담만)"""
+    if not settings.ANALYSIS_BATCH_ENABLED or settings.ANALYSIS_BATCH_MAX_ITEMS < 2:
+        return False
+    if consultation.file_type != 'text':
+        return False
+    try:
+        return consultation.file.size <= settings.ANALYSIS_BATCH_MAX_FILE_SIZE
+    except (OSError, ValueError):
+        return False
+
+
+def enqueue(consultation_id):
+    """
+    일괄 분석 대기열에 상담 추가
+
+    Returns:
+        추가 후 대기열 길이. Redis를 사용할 수 없으면 None (호출한 쪽에서 단건 분석으로 처리)
+    """
+    try:
+        return get_redis().rpush(BATCH_QUEUE_KEY, consultation_id)
+    except redis.RedisError as e:
+        print(f"일괄 분석 대기열 추가 실패, 단건 분석으로 처리합니다: {e}")
+        return None
+
+
+def pop_batch(max_items: int = None) -> list:
+    """대기열 앞에서 최대 max_items건의 상담 ID를 꺼냄"""
+    max_items = max_items or settings.ANALYSIS_BATCH_MAX_ITEMS
+    client = get_redis()
+    with client.pipeline() as pipe:
+        pipe.lrange(BATCH_QUEUE_KEY, 0, max_items - 1)
+        pipe.ltrim(BATCH_QUEUE_KEY, max_items, -1)
+        ids, _ = pipe.execute()
+    return [int(i) for i in ids]
+
+
+def pending_count() -> int:
+    """대기열에 남아 있는 상담 수"""
+    return get_redis().llen(BATCH_QUEUE_KEY)
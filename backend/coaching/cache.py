@@ -0,0 +1,173 @@
+"""
+LLM 분석 결과 / STT 전사본 캐시
+
+- 분석 결과: 정규화한 상담 내용 + 모델명 + 프롬프트 버전 + generation_config의 해시를 키로
+  저장하여, 동일한 내용이 다시 들어오면 Gemini 호출을 생략합니다.
+- 전사본: 원본 파일 지문 + STT 엔진 + 모델명 + STT 버전을 키로 저장하여,
+  같은 녹음이 다시 업로드되면 ffmpeg 디코딩과 Whisper 전사를 생략합니다.
+"""
+import hashlib
+import json
+import re
+import unicodedata
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AnalysisCache, TranscriptCache
+
+
+def normalize_transcript(text: str) -> str:
+    """캐시 키 계산용 상담 내용 정규화 (유니코드 NFC, 공백 정리)"""
+    text = unicodedata.normalize('NFC', text or '')
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def make_analysis_cache_key(content: str, model_name: str, prompt_version: str, generation_config: dict) -> str:
+    """분석 결과 캐시 키 (SHA-256 hex) 생성"""
+    payload = json.dumps({
+        'content': normalize_transcript(content),
+        'model': model_name,
+        'prompt_version': prompt_version,
+        'generation_config': generation_config,
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_cached_analysis(key: str):
+    """
+    캐시된 분석 결과 조회
+
+    Returns:
+        분석 결과 문자열. 없거나 TTL이 지났으면 None
+    """
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return None
+
+    entry = AnalysisCache.objects.filter(key=key).only('id', 'result', 'created_at').first()
+    if entry is None:
+        return None
+
+    if entry.created_at < timezone.now() - timedelta(seconds=settings.ANALYSIS_CACHE_TTL_SECONDS):
+        entry.delete()
+        return None
+
+    AnalysisCache.objects.filter(id=entry.id).update(
+        hit_count=F('hit_count') + 1,
+        last_hit_at=timezone.now(),
+    )
+    return entry.result
+
+
+def store_cached_analysis(key: str, model_name: str, prompt_version: str, result: str):
+    """분석 결과를 캐시에 저장하고 만료/초과 항목 정리"""
+    if not settings.ANALYSIS_CACHE_ENABLED:
+        return
+
+    try:
+        AnalysisCache.objects.update_or_create(
+            key=key,
+            defaults={
+                'model_name': model_name,
+                'prompt_version': prompt_version,
+                'result': result,
+                'created_at': timezone.now(),
+                'last_hit_at': timezone.now(),
+            },
+        )
+        prune_analysis_cache()
+    except Exception as e:
+        # 캐시 저장 실패는 분석 결과에 영향을 주지 않음
+        print(f"분석 결과 캐시 저장 실패: {e}")
+
+
+def prune_analysis_cache():
+    """TTL이 지난 항목을 삭제하고, 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+    expire_before = timezone.now() - timedelta(seconds=settings.ANALYSIS_CACHE_TTL_SECONDS)
+    AnalysisCache.objects.filter(created_at__lt=expire_before).delete()
+
+    max_entries = settings.ANALYSIS_CACHE_MAX_ENTRIES
+    overflow = AnalysisCache.objects.count() - max_entries
+    if overflow > 0:
+        stale_ids = list(
+            AnalysisCache.objects.order_by('last_hit_at').values_list('id', flat=True)[:overflow]
+        )
+        AnalysisCache.objects.filter(id__in=stale_ids).delete()
+
+
+def make_transcript_cache_key(content_hash: str, engine: str, model_name: str, stt_version: str, language: str) -> str:
+    """전사본 캐시 키 (SHA-256 hex) 생성"""
+    payload = json.dumps({
+        'content_hash': content_hash,
+        'engine': engine,
+        'model': model_name,
+        'stt_version': stt_version,
+        'language': language,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_cached_transcript(key: str):
+    """
+    캐시된 전사본 조회
+
+    Returns:
+        {'text', 'segments'} 딕셔너리. 없거나 TTL이 지났으면 None
+    """
+    if not settings.TRANSCRIPT_CACHE_ENABLED:
+        return None
+
+    entry = TranscriptCache.objects.filter(key=key).only('id', 'text', 'segments', 'created_at').first()
+    if entry is None:
+        return None
+
+    if entry.created_at < timezone.now() - timedelta(seconds=settings.TRANSCRIPT_CACHE_TTL_SECONDS):
+        entry.delete()
+        return None
+
+    TranscriptCache.objects.filter(id=entry.id).update(
+        hit_count=F('hit_count') + 1,
+        last_hit_at=timezone.now(),
+    )
+    return {'text': entry.text, 'segments': entry.segments}
+
+
+def store_cached_transcript(key: str, content_hash: str, engine: str, model_name: str, stt_version: str, result: dict):
+    """전사 결과를 캐시에 저장하고 만료/초과 항목 정리"""
+    if not settings.TRANSCRIPT_CACHE_ENABLED:
+        return
+
+    try:
+        TranscriptCache.objects.update_or_create(
+            key=key,
+            defaults={
+                'content_hash': content_hash,
+                'engine': engine,
+                'model_name': model_name,
+                'stt_version': stt_version,
+                'text': result['text'],
+                'segments': result.get('segments', []),
+                'created_at': timezone.now(),
+                'last_hit_at': timezone.now(),
+            },
+        )
+        prune_transcript_cache()
+    except Exception as e:
+        # 캐시 저장 실패는 전사 결과에 영향을 주지 않음
+        print(f"전사본 캐시 저장 실패: {e}")
+
+
+def prune_transcript_cache():
+    """TTL이 지난 항목을 삭제하고, 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+    expire_before = timezone.now() - timedelta(seconds=settings.TRANSCRIPT_CACHE_TTL_SECONDS)
+    TranscriptCache.objects.filter(created_at__lt=expire_before).delete()
+
+    max_entries = settings.TRANSCRIPT_CACHE_MAX_ENTRIES
+    overflow = TranscriptCache.objects.count() - max_entries
+    if overflow > 0:
+        stale_ids = list(
+            TranscriptCache.objects.order_by('last_hit_at').values_list('id', flat=True)[:overflow]
+        )
+        TranscriptCache.objects.filter(id__in=stale_ids).delete()
@@ -0,0 +1,171 @@
+"""
+원본 파일 다운로드 응답 (스트리밍 + HTTP Range)
+
+파일 전체를 메모리에 올리지 않고 청크 단위로 전달하며,
+Range/If-None-Match 요청을 지원하여 동영상 탐색(seek)과 재다운로드 캐시가 동작합니다.
+"""
+import mimetypes
+import os
+import re
+
+import requests
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .storage import get_http_session
+
+
+# 원격 파일 요청에 그대로 전달할 조건부/부분 요청 헤더
+FORWARDED_REQUEST_HEADERS = ('Range', 'If-Range', 'If-None-Match', 'If-Modified-Since')
+# 원격 응답에서 클라이언트로 전달할 헤더
+FORWARDED_RESPONSE_HEADERS = ('Content-Length', 'Content-Range', 'Accept-Ranges', 'ETag', 'Last-Modified')
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range_header(header, size):
+    """
+    단일 바이트 범위 Range 헤더 파싱
+
+    Returns:
+        (시작, 끝) 바이트 위치 (끝 포함). 헤더가 없거나 지원하지 않는 형식이면 None,
+        범위가 파일 크기를 벗어나면 ValueError
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        # 여러 범위(bytes=0-1,5-6) 등은 지원하지 않으므로 전체 파일로 응답
+        return None
+
+    start, end = match.groups()
+    if start == '' and end == '':
+        return None
+    if start == '':
+        # 마지막 N바이트 (bytes=-500)
+        length = int(end)
+        if length == 0:
+            raise ValueError('빈 범위')
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError('파일 크기를 벗어난 범위')
+    return start, end
+
+
+def _attachment(response, file_name):
+    response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+    return response
+
+
+def _iter_file(file_obj, length, chunk_size):
+    """파일에서 length 바이트를 청크 단위로 읽음"""
+    try:
+        remaining = length
+        while remaining > 0:
+            chunk = file_obj.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def local_file_response(request, file_path, file_name):
+    """로컬 파일을 Range/ETag를 지원하는 스트리밍 응답으로 반환"""
+    stat = os.stat(file_path)
+    size = stat.st_size
+    etag = f'"{int(stat.st_mtime)}-{size}"'
+    content_type = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        return response
+
+    # If-Range의 ETag가 바뀌었으면 부분 요청 대신 전체 파일 전송
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range_header(range_header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file_obj = open(file_path, 'rb')
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        file_obj.seek(start)
+
+    length = end - start + 1 if size else 0
+    response = StreamingHttpResponse(
+        _iter_file(file_obj, length, settings.DOWNLOAD_CHUNK_SIZE),
+        status=status_code,
+        content_type=content_type,
+    )
+    response['Content-Length'] = str(length)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    if status_code == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return _attachment(response, file_name)
+
+
+def _iter_remote(upstream, chunk_size):
+    try:
+        yield from upstream.iter_content(chunk_size=chunk_size)
+    finally:
+        upstream.close()
+
+
+def remote_file_response(request, url, file_name):
+    """
+    원격(Supabase) 파일을 버퍼링 없이 그대로 전달
+
+    공유 HTTP 세션으로 연결을 재사용하고 Range/조건부 요청 헤더를 전달합니다.
+
+    Raises:
+        requests.RequestException: 원격 파일을 가져오지 못한 경우
+    """
+    headers = {
+        name: request.headers[name] for name in FORWARDED_REQUEST_HEADERS if name in request.headers
+    }
+    upstream = get_http_session().get(
+        url,
+        headers=headers,
+        stream=True,
+        timeout=(settings.SUPABASE_HTTP_CONNECT_TIMEOUT, settings.SUPABASE_HTTP_READ_TIMEOUT),
+    )
+
+    if upstream.status_code in (304, 416):
+        response = HttpResponse(status=upstream.status_code)
+        for name in ('ETag', 'Content-Range'):
+            if name in upstream.headers:
+                response[name] = upstream.headers[name]
+        upstream.close()
+        return response
+
+    try:
+        upstream.raise_for_status()
+    except requests.RequestException:
+        upstream.close()
+        raise
+
+    response = StreamingHttpResponse(
+        _iter_remote(upstream, settings.DOWNLOAD_CHUNK_SIZE),
+        status=upstream.status_code,
+        content_type=upstream.headers.get('Content-Type', 'application/octet-stream'),
+    )
+    for name in FORWARDED_RESPONSE_HEADERS:
+        if name in upstream.headers:
+            response[name] = upstream.headers[name]
+    return _attachment(response, file_name)
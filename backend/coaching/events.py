@@ -0,0 +1,51 @@
+"""
+상담 분석 진행 상황 이벤트 (Redis pub/sub)
+
+Celery 태스크가 상태가 바뀔 때마다 상담별 채널에 이벤트를 발행하고,
+SSE 엔드포인트는 DB를 폴링하는 대신 해당 채널을 구독하여 대기합니다.
+"""
+import json
+
+import redis
+from django.conf import settings
+
+
+_client = None
+
+# SSE로 전달하는 상태와 스트림을 종료하는 상태
+STREAM_STATUSES = ('processing', 'waiting_quota', 'completed', 'failed')
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+def get_redis():
+    """프로세스 단위로 공유하는 Redis 클라이언트 반환"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def consultation_channel(consultation_id) -> str:
+    """상담별 상태 이벤트 채널명"""
+    return f"consultation:{consultation_id}:status"
+
+
+def build_status_event(consultation) -> dict:
+    """SSE로 전송할 상태 이벤트 데이터 구성"""
+    return {
+        'type': consultation.status,
+        'consultation_id': consultation.id,
+        'status': consultation.status,
+        'analysis_result': consultation.analysis_result if consultation.analysis_result else None,
+    }
+
+
+def publish_status(consultation):
+    """상담 상태 변경 이벤트 발행 (실패해도 분석 흐름에는 영향 없음)"""
+    try:
+        get_redis().publish(
+            consultation_channel(consultation.id),
+            json.dumps(build_status_event(consultation)),
+        )
+    except redis.RedisError as e:
+        print(f"상태 이벤트 발행 실패 (consultation {consultation.id}): {e}")
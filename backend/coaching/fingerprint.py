@@ -0,0 +1,66 @@
+"""
+파일 내용 지문(content hash)
+
+파일을 BLOCK_SIZE 블록으로 나누어 블록마다 SHA-256을 구하고,
+블록 해시를 이어 붙인 값의 SHA-256을 최종 지문으로 사용합니다.
+블록 해시만 저장해 두면 여러 요청에 나누어 업로드되는 파일도
+다시 읽지 않고 스트리밍으로 같은 지문을 계산할 수 있습니다.
+"""
+import hashlib
+
+
+# 지문 계산 블록 크기 (분할 업로드 청크는 이 크기의 배수여야 함)
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class ContentHasher:
+    """
+    스트리밍 방식의 블록 단위 SHA-256 지문 계산기
+
+    Args:
+        block_hashes: 이전 요청까지 계산된 블록 해시들 (이어서 계산할 때)
+    """
+
+    def __init__(self, block_hashes: bytes = b''):
+        self._block_hashes = bytearray(block_hashes)
+        self._block = hashlib.sha256()
+        self._block_length = 0
+
+    def update(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            take = min(BLOCK_SIZE - self._block_length, len(view))
+            self._block.update(view[:take])
+            self._block_length += take
+            view = view[take:]
+            if self._block_length == BLOCK_SIZE:
+                self._finish_block()
+
+    def _finish_block(self):
+        self._block_hashes += self._block.digest()
+        self._block = hashlib.sha256()
+        self._block_length = 0
+
+    @property
+    def pending_bytes(self) -> int:
+        """아직 블록을 채우지 못해 해시에 반영되지 않은 바이트 수"""
+        return self._block_length
+
+    @property
+    def block_hashes(self) -> bytes:
+        """완성된 블록들의 해시 (다음 요청에서 이어서 계산할 때 사용)"""
+        return bytes(self._block_hashes)
+
+    def hexdigest(self) -> str:
+        """남은 마지막 블록까지 반영한 최종 지문"""
+        if self._block_length:
+            self._finish_block()
+        return hashlib.sha256(self._block_hashes).hexdigest()
+
+
+def file_content_hash(file_obj, chunk_size: int = BLOCK_SIZE) -> str:
+    """파일 객체 전체를 읽어 지문 계산"""
+    hasher = ContentHasher()
+    for chunk in iter(lambda: file_obj.read(chunk_size), b''):
+        hasher.update(chunk)
+    return hasher.hexdigest()
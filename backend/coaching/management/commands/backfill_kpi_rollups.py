@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from coaching.rollups import backfill_rollups
+
+
+class Command(BaseCommand):
+    help = '상담 원본 데이터로부터 KPI 일별 집계 테이블을 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', help='시작 날짜 (YYYY-MM-DD, 기본값: 첫 상담 생성일)')
+        parser.add_argument('--date-to', help='종료 날짜 (YYYY-MM-DD, 기본값: 오늘)')
+
+    def handle(self, *args, **options):
+        date_from = self._parse(options['date_from'])
+        date_to = self._parse(options['date_to'])
+
+        count = backfill_rollups(date_from, date_to)
+        self.stdout.write(self.style.SUCCESS(f'{count}일치 KPI 집계를 갱신했습니다.'))
+
+    def _parse(self, value):
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f'잘못된 날짜 형식입니다: {value}')
+        return parsed
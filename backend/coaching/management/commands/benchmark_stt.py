@@ -0,0 +1,123 @@
+import re
+import time
+import unicodedata
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from coaching.stt import SAMPLE_RATE, get_stt_model, load_audio, transcribe_audio
+from coaching.stt_engines import ENGINES
+
+
+def _normalize(text: str) -> str:
+    """오류율 계산용 정규화 (유니코드 NFC, 소문자, 문장 부호 제거, 공백 정리)"""
+    text = unicodedata.normalize('NFC', text).lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _edit_distance(reference: list, hypothesis: list) -> int:
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_token in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_token in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_token != hyp_token),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def error_rates(reference: str, hypothesis: str):
+    """
+    단어 오류율(WER)과 문자 오류율(CER) 계산
+
+    한국어는 어절 단위 WER이 조사 차이에도 크게 흔들리므로 공백을 제외한 CER을 함께 봅니다.
+    """
+    reference = _normalize(reference)
+    hypothesis = _normalize(hypothesis)
+    ref_words = reference.split()
+    ref_chars = list(reference.replace(' ', ''))
+    wer = _edit_distance(ref_words, hypothesis.split()) / max(len(ref_words), 1)
+    cer = _edit_distance(ref_chars, list(hypothesis.replace(' ', ''))) / max(len(ref_chars), 1)
+    return wer, cer
+
+
+class Command(BaseCommand):
+    help = (
+        '샘플 녹음으로 STT 엔진/모델별 실시간 배율(RTF)과 오류율(WER/CER)을 비교합니다. '
+        '정답 전사본은 녹음과 같은 이름의 .txt 파일(또는 --references 디렉터리)에서 읽습니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help='샘플 오디오/비디오 파일')
+        parser.add_argument('--engines', default=','.join(ENGINES), help='비교할 엔진 (쉼표 구분)')
+        parser.add_argument('--models', default='base', help='비교할 모델 (쉼표 구분)')
+        parser.add_argument('--references', help='정답 전사본(.txt) 디렉터리 (기본값: 오디오 파일과 같은 위치)')
+        parser.add_argument('--language', default='ko', help='전사 언어 (기본값: ko)')
+
+    def handle(self, *args, **options):
+        engines = [name.strip() for name in options['engines'].split(',') if name.strip()]
+        models = [name.strip() for name in options['models'].split(',') if name.strip()]
+        unknown = [name for name in engines if name not in ENGINES]
+        if unknown:
+            raise CommandError(f"지원하지 않는 STT 엔진입니다: {', '.join(unknown)}")
+
+        samples = []
+        for file_name in options['files']:
+            path = Path(file_name)
+            if not path.exists():
+                raise CommandError(f'파일을 찾을 수 없습니다: {path}')
+            reference_dir = Path(options['references']) if options['references'] else path.parent
+            reference_path = reference_dir / f'{path.stem}.txt'
+            reference = reference_path.read_text(encoding='utf-8') if reference_path.exists() else None
+            audio = load_audio(str(path))
+            if not audio.size:
+                # 길이가 0인 샘플은 실시간 배율을 계산할 수 없으므로 제외
+                self.stdout.write(self.style.WARNING(f'{path.name}: 오디오가 비어 있어 건너뜁니다'))
+                continue
+            samples.append((path.name, audio, reference))
+            self.stdout.write(f'{path.name}: {audio.size / SAMPLE_RATE:.1f}초, 정답 전사본 {"있음" if reference else "없음"}')
+
+        if not samples:
+            raise CommandError('벤치마크할 오디오가 없습니다.')
+
+        for engine_name in engines:
+            for model_name in models:
+                self._benchmark(engine_name, model_name, samples, options['language'])
+
+    def _benchmark(self, engine_name, model_name, samples, language):
+        label = f'{engine_name}:{model_name}'
+        try:
+            started = time.monotonic()
+            get_stt_model(model_name, engine_name)
+            load_seconds = time.monotonic() - started
+        except ImportError as e:
+            self.stdout.write(self.style.WARNING(f'[{label}] 엔진 패키지가 설치되지 않아 건너뜁니다: {e}'))
+            return
+
+        self.stdout.write(f'\n[{label}] 모델 로딩 {load_seconds:.1f}초')
+        total_audio = total_seconds = 0.0
+        wers, cers = [], []
+        for name, audio, reference in samples:
+            duration = audio.size / SAMPLE_RATE
+            started = time.monotonic()
+            result = transcribe_audio(audio, language=language, model_name=model_name, engine_name=engine_name)
+            elapsed = time.monotonic() - started
+            total_audio += duration
+            total_seconds += elapsed
+
+            line = f'  {name}: {elapsed:.1f}초, RTF {elapsed / duration:.3f}'
+            if reference:
+                wer, cer = error_rates(reference, result['text'])
+                wers.append(wer)
+                cers.append(cer)
+                line += f', WER {wer:.1%}, CER {cer:.1%}'
+            self.stdout.write(line)
+
+        summary = f'  합계: 오디오 {total_audio:.1f}초, 전사 {total_seconds:.1f}초, RTF {total_seconds / total_audio:.3f}'
+        if wers:
+            summary += f', 평균 WER {sum(wers) / len(wers):.1%}, 평균 CER {sum(cers) / len(cers):.1%}'
+        self.stdout.write(self.style.SUCCESS(summary))
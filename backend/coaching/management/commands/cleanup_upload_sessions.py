@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from coaching.uploads import delete_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'UPLOAD_SESSION_EXPIRE_HOURS 동안 완료되지 않은 분할 업로드 세션과 예약된 파일을 삭제합니다.'
+
+    def handle(self, *args, **options):
+        count = delete_expired_sessions()
+        self.stdout.write(self.style.SUCCESS(f'만료된 업로드 세션 {count}개를 삭제했습니다.'))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:16
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0004_consultation_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='캐시 키')),
+                ('model_name', models.CharField(max_length=100, verbose_name='모델명')),
+                ('prompt_version', models.CharField(max_length=20, verbose_name='프롬프트 버전')),
+                ('result', models.TextField(verbose_name='분석 결과')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='히트 수')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='생성일')),
+                ('last_hit_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='마지막 사용일')),
+            ],
+            options={
+                'verbose_name': '분석 캐시',
+                'verbose_name_plural': '분석 캐시들',
+            },
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='analysis_cache_hit',
+            field=models.BooleanField(blank=True, null=True, verbose_name='분석 캐시 사용 여부'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('coaching', '0005_analysiscache_consultation_analysis_cache_hit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyConsultationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='날짜')),
+                ('file_type', models.CharField(max_length=50, verbose_name='파일 타입')),
+                ('status', models.CharField(max_length=20, verbose_name='상태')),
+                ('consultation_count', models.PositiveIntegerField(default=0, verbose_name='상담 수')),
+                ('distinct_users', models.PositiveIntegerField(default=0, verbose_name='사용자 수')),
+                ('processed_count', models.PositiveIntegerField(default=0, verbose_name='처리 시간 집계 건수')),
+                ('processing_seconds_sum', models.FloatField(default=0, verbose_name='처리 시간 합계(초)')),
+                ('supabase_uploaded_count', models.PositiveIntegerField(default=0, verbose_name='Supabase 업로드 수')),
+                ('cache_lookup_count', models.PositiveIntegerField(default=0, verbose_name='분석 캐시 조회 수')),
+                ('cache_hit_count', models.PositiveIntegerField(default=0, verbose_name='분석 캐시 히트 수')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+            ],
+            options={
+                'verbose_name': '일별 상담 집계',
+                'verbose_name_plural': '일별 상담 집계들',
+                'ordering': ['-date'],
+                'unique_together': {('date', 'file_type', 'status')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyUserActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='날짜')),
+                ('consultation_count', models.PositiveIntegerField(default=0, verbose_name='상담 수')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activities', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': '일별 사용자 활동',
+                'verbose_name_plural': '일별 사용자 활동들',
+                'ordering': ['-date'],
+                'unique_together': {('date', 'user')},
+            },
+        ),
+    ]
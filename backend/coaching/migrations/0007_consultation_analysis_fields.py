@@ -0,0 +1,142 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:20
+
+import json
+
+from django.db import migrations, models
+
+
+# coaching.analysis.extract_analysis_fields의 이 시점 버전을 복사해 둔 것
+# (앱 코드가 바뀌어도 과거 마이그레이션의 결과가 달라지지 않도록 import하지 않음)
+CATEGORY_SCORE_FIELDS = {
+    'customer_service_attitude': 'attitude_score',
+    'problem_solving': 'problem_solving_score',
+    'communication_skills': 'communication_score',
+}
+
+RECOMMENDATION_PRIORITIES = ('high', 'medium', 'low')
+
+
+def _to_score(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_analysis_fields(parsed_result, analysis_text):
+    fields = {
+        'analysis_parsed': isinstance(parsed_result, dict),
+        'analysis_length': len(analysis_text) if analysis_text else None,
+        'overall_score': None,
+        'recommendation_high_count': None,
+        'recommendation_medium_count': None,
+        'recommendation_low_count': None,
+    }
+    for field_name in CATEGORY_SCORE_FIELDS.values():
+        fields[field_name] = None
+
+    if not isinstance(parsed_result, dict):
+        return fields
+
+    fields['overall_score'] = _to_score(parsed_result.get('overall_score'))
+    for key, field_name in CATEGORY_SCORE_FIELDS.items():
+        category = parsed_result.get(key)
+        if isinstance(category, dict):
+            fields[field_name] = _to_score(category.get('score'))
+
+    recommendations = parsed_result.get('improvement_recommendations')
+    if isinstance(recommendations, list):
+        counts = dict.fromkeys(RECOMMENDATION_PRIORITIES, 0)
+        for item in recommendations:
+            if isinstance(item, dict):
+                priority = str(item.get('priority', '')).strip().lower()
+                if priority in counts:
+                    counts[priority] += 1
+        for priority, count in counts.items():
+            fields[f'recommendation_{priority}_count'] = count
+
+    return fields
+
+
+def backfill_analysis_fields(apps, schema_editor):
+    """기존 완료 상담의 분석 결과 JSON에서 구조화 필드 채우기"""
+    Consultation = apps.get_model('coaching', 'Consultation')
+    queryset = Consultation.objects.filter(
+        status='completed', analysis_result__isnull=False
+    ).only('id', 'analysis_result')
+
+    batch = []
+    field_names = None
+    for consultation in queryset.iterator(chunk_size=500):
+        try:
+            parsed = json.loads(consultation.analysis_result)
+        except ValueError:
+            parsed = None
+        fields = extract_analysis_fields(parsed, consultation.analysis_result)
+        field_names = list(fields)
+        for name, value in fields.items():
+            setattr(consultation, name, value)
+        batch.append(consultation)
+        if len(batch) >= 500:
+            Consultation.objects.bulk_update(batch, field_names)
+            batch = []
+    if batch:
+        Consultation.objects.bulk_update(batch, field_names)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0006_dailyconsultationrollup_dailyuseractivity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultation',
+            name='analysis_length',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='분석 결과 길이'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='analysis_parsed',
+            field=models.BooleanField(default=False, verbose_name='분석 결과 JSON 파싱 여부'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='attitude_score',
+            field=models.FloatField(blank=True, null=True, verbose_name='응대 태도 점수'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='communication_score',
+            field=models.FloatField(blank=True, null=True, verbose_name='커뮤니케이션 점수'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='overall_score',
+            field=models.FloatField(blank=True, db_index=True, null=True, verbose_name='종합 점수'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='problem_solving_score',
+            field=models.FloatField(blank=True, null=True, verbose_name='문제 해결 점수'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='recommendation_high_count',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='개선 권고 수 (high)'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='recommendation_low_count',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='개선 권고 수 (low)'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='recommendation_medium_count',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='개선 권고 수 (medium)'),
+        ),
+        migrations.RunPython(backfill_analysis_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0007_consultation_analysis_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='consultation',
+            name='status',
+            field=models.CharField(choices=[('pending', '대기중'), ('processing', '처리중'), ('waiting_quota', '할당량 대기중'), ('completed', '완료'), ('failed', '실패')], default='pending', max_length=20, verbose_name='상태'),
+        ),
+    ]
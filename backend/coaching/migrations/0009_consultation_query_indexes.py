@@ -0,0 +1,29 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0008_consultation_waiting_quota_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='consultation_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['created_at'], name='consultation_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['status', 'created_at'], name='consultation_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(condition=models.Q(('completed_at__isnull', False), ('status', 'completed')), fields=['created_at'], include=('completed_at', 'file_type'), name='consultation_processed_idx'),
+        ),
+    ]
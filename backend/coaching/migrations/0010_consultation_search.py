@@ -0,0 +1,45 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def backfill_search_vector(apps, schema_editor):
+    """기존 상담의 전문 검색 벡터 채우기 (앱 코드를 import하지 않도록 검색 벡터 식을 그대로 사용)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Consultation = apps.get_model('coaching', 'Consultation')
+    config = settings.SEARCH_CONFIG
+    Consultation.objects.update(search_vector=(
+        SearchVector('title', weight='A', config=config)
+        + SearchVector('original_content', weight='B', config=config)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0009_consultation_query_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='consultation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True, verbose_name='검색 벡터'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='consultation_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='consultation_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
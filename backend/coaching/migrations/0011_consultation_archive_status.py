@@ -0,0 +1,43 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:37
+
+from django.db import migrations, models
+
+
+def backfill_archive_status(apps, schema_editor):
+    # 기존 상담은 분석 파이프라인 안에서 업로드가 이미 끝났으므로 결과에 맞춰 상태 지정
+    Consultation = apps.get_model('coaching', 'Consultation')
+    Consultation.objects.filter(supabase_file_url__isnull=False).update(archive_status='archived')
+    Consultation.objects.filter(supabase_file_url__isnull=True, status__in=['completed', 'failed']).update(
+        archive_status='skipped'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0010_consultation_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultation',
+            name='archive_attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='보관 시도 횟수'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='archive_error',
+            field=models.TextField(blank=True, null=True, verbose_name='보관 실패 사유'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='archive_status',
+            field=models.CharField(choices=[('pending', '대기중'), ('uploading', '업로드중'), ('archived', '보관 완료'), ('failed', '실패'), ('skipped', '건너뜀')], default='pending', max_length=20, verbose_name='보관 상태'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='보관 완료일'),
+        ),
+        migrations.RunPython(backfill_archive_status, migrations.RunPython.noop),
+    ]
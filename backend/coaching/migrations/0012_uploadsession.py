@@ -0,0 +1,41 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('coaching', '0011_consultation_archive_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200, verbose_name='제목')),
+                ('file_name', models.CharField(max_length=255, verbose_name='원본 파일명')),
+                ('file_type', models.CharField(max_length=50, verbose_name='파일 타입')),
+                ('file', models.FileField(upload_to='consultations/', verbose_name='파일')),
+                ('total_size', models.BigIntegerField(verbose_name='전체 크기')),
+                ('offset', models.BigIntegerField(default=0, verbose_name='수신한 크기')),
+                ('block_hashes', models.BinaryField(default=b'', verbose_name='블록 해시')),
+                ('content_hash', models.CharField(blank=True, max_length=64, null=True, verbose_name='내용 지문')),
+                ('status', models.CharField(choices=[('uploading', '업로드중'), ('completed', '완료')], default='uploading', max_length=20, verbose_name='상태')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('consultation', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_session', to='coaching.consultation', verbose_name='상담')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': '업로드 세션',
+                'verbose_name_plural': '업로드 세션들',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:42
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0012_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='캐시 키')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='내용 지문')),
+                ('model_name', models.CharField(max_length=100, verbose_name='STT 모델명')),
+                ('stt_version', models.CharField(max_length=20, verbose_name='STT 버전')),
+                ('text', models.TextField(verbose_name='전사본')),
+                ('segments', models.JSONField(default=list, verbose_name='타임스탬프 세그먼트')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='히트 수')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='생성일')),
+                ('last_hit_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='마지막 사용일')),
+            ],
+            options={
+                'verbose_name': '전사본 캐시',
+                'verbose_name_plural': '전사본 캐시들',
+            },
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True, verbose_name='내용 지문'),
+        ),
+    ]
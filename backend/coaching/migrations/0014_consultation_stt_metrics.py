@@ -0,0 +1,33 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0013_transcript_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultation',
+            name='media_duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='미디어 길이(초)'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='stt_model',
+            field=models.CharField(blank=True, max_length=50, null=True, verbose_name='STT 모델'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='stt_rtf',
+            field=models.FloatField(blank=True, null=True, verbose_name='STT 실시간 배율'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='stt_seconds',
+            field=models.FloatField(blank=True, null=True, verbose_name='전사 소요 시간(초)'),
+        ),
+    ]
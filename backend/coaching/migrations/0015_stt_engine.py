@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-17 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coaching', '0014_consultation_stt_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultation',
+            name='stt_engine',
+            field=models.CharField(blank=True, max_length=50, null=True, verbose_name='STT 엔진'),
+        ),
+        migrations.AddField(
+            model_name='transcriptcache',
+            name='engine',
+            field=models.CharField(default='whisper', max_length=50, verbose_name='STT 엔진'),
+        ),
+    ]
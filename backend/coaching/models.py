@@ -1,3 +1,7 @@
+import uuid
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
@@ -8,26 +12,194 @@ class Consultation(models.Model):
     STATUS_CHOICES = [
         ('pending', '대기중'),
         ('processing', '처리중'),
+        ('waiting_quota', '할당량 대기중'),
         ('completed', '완료'),
         ('failed', '실패'),
     ]
+    ARCHIVE_STATUS_CHOICES = [
+        ('pending', '대기중'),
+        ('uploading', '업로드중'),
+        ('archived', '보관 완료'),
+        ('failed', '실패'),
+        ('skipped', '건너뜀'),
+    ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='consultations', verbose_name='사용자', null=True, blank=True)
     title = models.CharField(max_length=200, verbose_name='제목')
     file = models.FileField(upload_to='consultations/', verbose_name='파일')
     file_type = models.CharField(max_length=50, verbose_name='파일 타입')  # text, audio, video
+    # 업로드 중에 계산한 원본 파일 내용 지문 (fingerprint.ContentHasher, 전사본 캐시 키)
+    content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True, verbose_name='내용 지문')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='상태')
     original_content = models.TextField(blank=True, null=True, verbose_name='원본 내용')
     analysis_result = models.TextField(blank=True, null=True, verbose_name='분석 결과')
     supabase_file_url = models.URLField(blank=True, null=True, verbose_name='Supabase 파일 URL')
+    # 원본 파일 보관(Supabase 업로드) 상태 - 분석 파이프라인과 별도로 진행
+    archive_status = models.CharField(max_length=20, choices=ARCHIVE_STATUS_CHOICES, default='pending', verbose_name='보관 상태')
+    archive_attempts = models.PositiveSmallIntegerField(default=0, verbose_name='보관 시도 횟수')
+    archive_error = models.TextField(blank=True, null=True, verbose_name='보관 실패 사유')
+    archived_at = models.DateTimeField(blank=True, null=True, verbose_name='보관 완료일')
+    analysis_cache_hit = models.BooleanField(blank=True, null=True, verbose_name='분석 캐시 사용 여부')
+    # STT 실행 정보 (엔진과 선택된 모델, 미디어 길이, 디코딩을 포함한 전사 소요 시간과 실시간 배율 = 소요 시간 / 길이)
+    stt_engine = models.CharField(max_length=50, blank=True, null=True, verbose_name='STT 엔진')
+    stt_model = models.CharField(max_length=50, blank=True, null=True, verbose_name='STT 모델')
+    media_duration = models.FloatField(blank=True, null=True, verbose_name='미디어 길이(초)')
+    stt_seconds = models.FloatField(blank=True, null=True, verbose_name='전사 소요 시간(초)')
+    stt_rtf = models.FloatField(blank=True, null=True, verbose_name='STT 실시간 배율')
+    # 분석 결과 JSON에서 추출한 구조화 필드 (KPI 집계용)
+    analysis_parsed = models.BooleanField(default=False, verbose_name='분석 결과 JSON 파싱 여부')
+    analysis_length = models.PositiveIntegerField(blank=True, null=True, verbose_name='분석 결과 길이')
+    overall_score = models.FloatField(blank=True, null=True, db_index=True, verbose_name='종합 점수')
+    attitude_score = models.FloatField(blank=True, null=True, verbose_name='응대 태도 점수')
+    problem_solving_score = models.FloatField(blank=True, null=True, verbose_name='문제 해결 점수')
+    communication_score = models.FloatField(blank=True, null=True, verbose_name='커뮤니케이션 점수')
+    recommendation_high_count = models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='개선 권고 수 (high)')
+    recommendation_medium_count = models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='개선 권고 수 (medium)')
+    recommendation_low_count = models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='개선 권고 수 (low)')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일')
     completed_at = models.DateTimeField(blank=True, null=True, verbose_name='완료일')
+    # 제목/전사본 전문 검색용 tsvector (저장 시 signals에서 갱신)
+    search_vector = SearchVectorField(blank=True, null=True, editable=False, verbose_name='검색 벡터')
     
     class Meta:
         verbose_name = '상담'
         verbose_name_plural = '상담들'
         ordering = ['-created_at']
+        indexes = [
+            # 사용자별 목록 조회 (커서 페이지네이션 순서와 동일)
+            models.Index(fields=['user', '-created_at', '-id'], name='consultation_user_idx'),
+            # KPI/일별 집계의 생성일 범위 조회
+            models.Index(fields=['created_at'], name='consultation_created_idx'),
+            # 상태별 생성일 범위 조회 (KPI 품질 지표, 상태 필터)
+            models.Index(fields=['status', 'created_at'], name='consultation_status_idx'),
+            # 처리 시간 분포 집계: 완료된 상담만 포함하는 부분 인덱스 (PostgreSQL에서는 index-only scan)
+            models.Index(
+                fields=['created_at'],
+                include=['completed_at', 'file_type'],
+                condition=models.Q(status='completed', completed_at__isnull=False),
+                name='consultation_processed_idx',
+            ),
+            # 전문 검색 (q 파라미터)
+            GinIndex(fields=['search_vector'], name='consultation_search_idx'),
+            # 제목 유사도/부분 일치 검색 (pg_trgm)
+            GinIndex(fields=['title'], opclasses=['gin_trgm_ops'], name='consultation_title_trgm_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
+
+
+class AnalysisCache(models.Model):
+    """LLM 분석 결과 캐시 (내용/모델/프롬프트 해시 기준)"""
+    key = models.CharField(max_length=64, unique=True, verbose_name='캐시 키')
+    model_name = models.CharField(max_length=100, verbose_name='모델명')
+    prompt_version = models.CharField(max_length=20, verbose_name='프롬프트 버전')
+    result = models.TextField(verbose_name='분석 결과')
+    hit_count = models.PositiveIntegerField(default=0, verbose_name='히트 수')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='생성일')
+    last_hit_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='마지막 사용일')
+    
+    class Meta:
+        verbose_name = '분석 캐시'
+        verbose_name_plural = '분석 캐시들'
+    
+    def __str__(self):
+        return f"{self.model_name} ({self.key[:12]})"
+
+
+class TranscriptCache(models.Model):
+    """STT 전사 결과 캐시 (원본 파일 지문 + STT 엔진/모델/버전 기준)"""
+    key = models.CharField(max_length=64, unique=True, verbose_name='캐시 키')
+    content_hash = models.CharField(max_length=64, verbose_name='내용 지문')
+    engine = models.CharField(max_length=50, default='whisper', verbose_name='STT 엔진')
+    model_name = models.CharField(max_length=100, verbose_name='STT 모델명')
+    stt_version = models.CharField(max_length=20, verbose_name='STT 버전')
+    text = models.TextField(verbose_name='전사본')
+    segments = models.JSONField(default=list, verbose_name='타임스탬프 세그먼트')
+    hit_count = models.PositiveIntegerField(default=0, verbose_name='히트 수')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='생성일')
+    last_hit_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='마지막 사용일')
+    
+    class Meta:
+        verbose_name = '전사본 캐시'
+        verbose_name_plural = '전사본 캐시들'
+    
+    def __str__(self):
+        return f"{self.model_name} ({self.content_hash[:12]})"
+
+
+class DailyConsultationRollup(models.Model):
+    """일별 x 파일 타입 x 상태 KPI 집계 (상담 상태 변경 시 갱신)"""
+    date = models.DateField(verbose_name='날짜')
+    file_type = models.CharField(max_length=50, verbose_name='파일 타입')
+    status = models.CharField(max_length=20, verbose_name='상태')
+    consultation_count = models.PositiveIntegerField(default=0, verbose_name='상담 수')
+    distinct_users = models.PositiveIntegerField(default=0, verbose_name='사용자 수')
+    processed_count = models.PositiveIntegerField(default=0, verbose_name='처리 시간 집계 건수')
+    processing_seconds_sum = models.FloatField(default=0, verbose_name='처리 시간 합계(초)')
+    supabase_uploaded_count = models.PositiveIntegerField(default=0, verbose_name='Supabase 업로드 수')
+    cache_lookup_count = models.PositiveIntegerField(default=0, verbose_name='분석 캐시 조회 수')
+    cache_hit_count = models.PositiveIntegerField(default=0, verbose_name='분석 캐시 히트 수')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일')
+    
+    class Meta:
+        verbose_name = '일별 상담 집계'
+        verbose_name_plural = '일별 상담 집계들'
+        ordering = ['-date']
+        unique_together = [('date', 'file_type', 'status')]
+    
+    def __str__(self):
+        return f"{self.date} {self.file_type} {self.status}: {self.consultation_count}"
+
+
+class DailyUserActivity(models.Model):
+    """일별 사용자 업로드 활동 (DAU/WAU, 재방문율 계산용)"""
+    date = models.DateField(verbose_name='날짜')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_activities', verbose_name='사용자')
+    consultation_count = models.PositiveIntegerField(default=0, verbose_name='상담 수')
+    
+    class Meta:
+        verbose_name = '일별 사용자 활동'
+        verbose_name_plural = '일별 사용자 활동들'
+        ordering = ['-date']
+        unique_together = [('date', 'user')]
+    
+    def __str__(self):
+        return f"{self.date} {self.user_id}: {self.consultation_count}"
+
+
+class UploadSession(models.Model):
+    """분할(재개 가능) 업로드 세션 - 청크를 오프셋 순서대로 받아 완료 시 상담 생성"""
+    STATUS_CHOICES = [
+        ('uploading', '업로드중'),
+        ('completed', '완료'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions', verbose_name='사용자')
+    title = models.CharField(max_length=200, verbose_name='제목')
+    file_name = models.CharField(max_length=255, verbose_name='원본 파일명')
+    file_type = models.CharField(max_length=50, verbose_name='파일 타입')  # text, audio, video
+    # 청크를 바로 기록하는 최종 저장 위치 (세션 생성 시 빈 파일로 예약)
+    file = models.FileField(upload_to='consultations/', verbose_name='파일')
+    total_size = models.BigIntegerField(verbose_name='전체 크기')
+    offset = models.BigIntegerField(default=0, verbose_name='수신한 크기')
+    # 지금까지 받은 블록들의 SHA-256 (fingerprint.ContentHasher 상태)
+    block_hashes = models.BinaryField(default=b'', editable=False, verbose_name='블록 해시')
+    content_hash = models.CharField(max_length=64, blank=True, null=True, verbose_name='내용 지문')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading', verbose_name='상태')
+    consultation = models.OneToOneField(
+        Consultation, on_delete=models.SET_NULL, related_name='upload_session',
+        null=True, blank=True, verbose_name='상담',
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일')
+    
+    class Meta:
+        verbose_name = '업로드 세션'
+        verbose_name_plural = '업로드 세션들'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.file_name} ({self.offset}/{self.total_size})"
@@ -0,0 +1,152 @@
+"""
+상담 목록 페이지네이션
+
+OFFSET/COUNT(*) 기반 페이지 번호 방식은 페이지가 깊어질수록 느려지므로
+(created_at, id) 순서의 커서(keyset) 방식으로 어느 위치에서든 같은 비용으로 조회합니다.
+커서에는 페이지 경계 행의 (created_at, id)를 그대로 담으므로 생성 시각이 같은 행이 많거나
+페이지 사이에 새 상담이 추가되어도 행이 건너뛰어지거나 중복되지 않습니다.
+"""
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    쿼리 결과 행 수를 PostgreSQL 실행 계획의 추정치로 계산
+
+    추정치가 작으면 정확한 COUNT(*)도 충분히 빠르므로 정확한 값을 사용합니다.
+    PostgreSQL이 아니면 정확한 COUNT(*)를 사용합니다.
+
+    Returns:
+        (행 수, 추정치 여부)
+    """
+    queryset = queryset.order_by()
+    if connection.vendor != 'postgresql':
+        return queryset.count(), False
+
+    plan = json.loads(queryset.explain(format='json'))
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    if estimate < settings.CONSULTATION_EXACT_COUNT_THRESHOLD:
+        return queryset.count(), False
+    return estimate, True
+
+
+class ConsultationCursorPagination(CursorPagination):
+    """
+    상담 목록 커서 페이지네이션
+
+    - page_size 쿼리 파라미터로 페이지 크기 지정 (최대 CONSULTATION_MAX_PAGE_SIZE)
+    - count=true를 지정하면 전체 개수(대략적인 값)를 함께 반환
+    """
+    ordering = ('-created_at', '-id')
+    page_size = settings.CONSULTATION_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.CONSULTATION_MAX_PAGE_SIZE
+    count_query_param = 'count'
+
+    invalid_cursor_message = '잘못된 커서입니다.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        self.count_is_estimate = False
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.count, self.count_is_estimate = estimate_count(queryset)
+
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            created_at = pk = None
+            reverse = False
+        else:
+            created_at, pk, reverse = cursor
+
+        # (created_at, id) 튜플 비교: 다음 페이지는 경계 행보다 작은 행, 이전 페이지는 큰 행
+        if cursor is None:
+            queryset = queryset.order_by('-created_at', '-id')
+        elif not reverse:
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            ).order_by('-created_at', '-id')
+        else:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            ).order_by('created_at', 'id')
+
+        # 한 건을 더 읽어 다음(또는 이전) 페이지가 있는지 확인
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def encode_cursor(self, row, reverse):
+        """경계 행의 (created_at, id)와 방향을 커서 문자열로 인코딩"""
+        raw = f"{row.created_at.isoformat()}|{row.pk}|{int(reverse)}"
+        return replace_query_param(self.base_url, self.cursor_query_param, b64encode(raw.encode()).decode())
+
+    def decode_cursor(self, request):
+        """
+        커서 파라미터 해석
+
+        Returns:
+            (created_at, id, reverse) 또는 커서가 없으면 None
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk, reverse = b64decode(encoded.encode(), validate=True).decode().split('|')
+            return datetime.fromisoformat(created_at), int(pk), reverse == '1'
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        # 전체 개수는 첫 페이지에서만 계산 (다음 페이지 요청에서 다시 세지 않도록)
+        return remove_query_param(self.encode_cursor(self.page[-1], reverse=False), self.count_query_param)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return remove_query_param(self.encode_cursor(self.page[0], reverse=True), self.count_query_param)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.count is not None:
+            response['count'] = self.count
+            response['count_is_estimate'] = self.count_is_estimate
+        response['results'] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        paginated_schema = super().get_paginated_response_schema(schema)
+        paginated_schema['properties']['count'] = {
+            'type': 'integer',
+            'nullable': True,
+            'description': 'count=true일 때만 포함되는 전체 개수',
+        }
+        paginated_schema['properties']['count_is_estimate'] = {
+            'type': 'boolean',
+            'description': 'count가 실행 계획 기반 추정치인지 여부',
+        }
+        return paginated_schema
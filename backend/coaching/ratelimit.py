@@ -0,0 +1,123 @@
+"""
+Gemini API 호출용 클러스터 공용 토큰 버킷 (Redis)
+
+모든 워커가 같은 Redis 버킷에서 모델별 분당 요청 수(RPM)와 분당 토큰 수(TPM)를
+차감하므로, 할당량 초과 에러가 난 뒤에 대응하는 대신 호출 전에 용량을 확보하고
+용량이 없으면 필요한 대기 시간을 돌려주어 호출한 태스크가 워커를 점유하지 않고 다시 예약되도록 합니다.
+"""
+import math
+
+import redis
+from django.conf import settings
+
+from .events import get_redis
+
+
+# 두 버킷(RPM, TPM)을 원자적으로 확인/차감
+# KEYS[1]: RPM 버킷, KEYS[2]: TPM 버킷
+# ARGV[1]: RPM 용량, ARGV[2]: TPM 용량, ARGV[3]: 요청 토큰 수
+# 반환값: 0이면 확보 성공, 그 외에는 필요한 대기 시간(ms)
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local wait = 0
+local levels = {}
+local costs = {1, tonumber(ARGV[3])}
+
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[i])
+    if capacity > 0 then
+        local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+        local level = tonumber(state[1]) or capacity
+        local ts = tonumber(state[2]) or now
+        local rate = capacity / 60000.0
+        level = math.min(capacity, level + (now - ts) * rate)
+        levels[i] = level
+        local cost = math.min(costs[i], capacity)
+        if level < cost then
+            wait = math.max(wait, math.ceil((cost - level) / rate))
+        end
+    end
+end
+
+if wait > 0 then
+    return wait
+end
+
+for i = 1, 2 do
+    local capacity = tonumber(ARGV[i])
+    if capacity > 0 then
+        local cost = math.min(costs[i], capacity)
+        redis.call('HSET', KEYS[i], 'level', levels[i] - cost, 'ts', now)
+        redis.call('PEXPIRE', KEYS[i], 120000)
+    end
+end
+return 0
+"""
+
+# 실제 사용 토큰 수로 TPM 버킷 보정 (추정보다 많이 쓰면 추가 차감, 적게 쓰면 환급)
+# KEYS[1]: TPM 버킷, ARGV[1]: TPM 용량, ARGV[2]: 보정값 (실제 - 추정)
+_ADJUST_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local level = tonumber(redis.call('HGET', KEYS[1], 'level'))
+if level == nil then
+    return 0
+end
+level = math.min(capacity, level - tonumber(ARGV[2]))
+redis.call('HSET', KEYS[1], 'level', level)
+return 0
+"""
+
+
+def _bucket_keys(model_name: str):
+    return (
+        f"ratelimit:gemini:{model_name}:rpm",
+        f"ratelimit:gemini:{model_name}:tpm",
+    )
+
+
+def estimate_tokens(prompt, responses: int = 1) -> int:
+    """
+    프롬프트 길이로 입력 토큰 수를 추정하고 예상 출력 토큰 수를 더함
+
+    Args:
+        prompt: 프롬프트 문자열 또는 [프롬프트, 파일] 리스트
+        responses: 한 번의 호출로 받을 분석 결과 수 (일괄 분석 시 출력 토큰이 그만큼 늘어남)
+    """
+    text = prompt if isinstance(prompt, str) else ''.join(p for p in prompt if isinstance(p, str))
+    return (
+        math.ceil(len(text) / settings.GEMINI_CHARS_PER_TOKEN)
+        + settings.GEMINI_OUTPUT_TOKEN_ESTIMATE * max(1, responses)
+    )
+
+
+def try_acquire(model_name: str, tokens: int) -> float:
+    """
+    호출 용량 확보 시도 (대기하지 않음)
+
+    Returns:
+        0이면 확보 성공, 그 외에는 다시 시도하기까지 기다려야 하는 시간(초)
+    """
+    rpm = settings.GEMINI_RPM_LIMIT
+    tpm = settings.GEMINI_TPM_LIMIT
+    if rpm <= 0 and tpm <= 0:
+        return 0
+
+    try:
+        wait_ms = get_redis().eval(_ACQUIRE_SCRIPT, 2, *_bucket_keys(model_name), rpm, tpm, tokens)
+    except redis.RedisError as e:
+        # Redis 장애 시에는 제한 없이 진행 (할당량 초과 시 기존 재시도 로직이 처리)
+        print(f"Gemini 호출 속도 제한 확인 실패, 제한 없이 진행합니다: {e}")
+        return 0
+    return int(wait_ms) / 1000
+
+
+def record_usage(model_name: str, estimated_tokens: int, actual_tokens: int):
+    """응답의 실제 토큰 사용량으로 TPM 버킷 보정"""
+    tpm = settings.GEMINI_TPM_LIMIT
+    if tpm <= 0 or actual_tokens is None:
+        return
+    try:
+        get_redis().eval(_ADJUST_SCRIPT, 1, _bucket_keys(model_name)[1], tpm, actual_tokens - estimated_tokens)
+    except redis.RedisError as e:
+        print(f"Gemini 토큰 사용량 보정 실패: {e}")
@@ -0,0 +1,129 @@
+"""
+KPI 일별 집계(rollup) 갱신
+
+상담이 생성되거나 상태가 바뀔 때 해당 날짜의 집계만 다시 계산하므로
+KPI 조회는 원본 상담 행 수와 무관하게 집계 테이블만 읽으면 됩니다.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from .models import Consultation, DailyConsultationRollup, DailyUserActivity
+
+
+logger = logging.getLogger(__name__)
+
+# 집계 값에 영향을 주는 상담 필드 (이 필드가 저장될 때만 집계를 다시 계산)
+ROLLUP_SOURCE_FIELDS = ('status', 'completed_at', 'supabase_file_url', 'analysis_cache_hit')
+
+# 날짜별 집계 갱신을 직렬화하는 PostgreSQL advisory lock 네임스페이스
+ROLLUP_LOCK_NAMESPACE = 7001
+
+def local_date(value):
+    """datetime을 서버 시간대(TIME_ZONE) 기준 날짜로 변환"""
+    return timezone.localdate(value)
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _lock_day(day):
+    """
+    같은 날짜의 집계 갱신을 트랜잭션 끝까지 직렬화
+
+    동시에 갱신하면 두 트랜잭션이 모두 삭제 후 삽입하여 unique 제약을 위반하므로
+    PostgreSQL에서는 날짜별 advisory lock을 잡습니다 (SQLite는 쓰기가 이미 직렬화됨).
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [ROLLUP_LOCK_NAMESPACE, day.toordinal()])
+
+
+def refresh_daily_rollups(day):
+    """지정한 날짜(생성일 기준)의 집계를 원본 상담 데이터로부터 다시 계산"""
+    with transaction.atomic():
+        # 잠금을 잡은 뒤 집계해야 앞선 갱신이 커밋한 최신 상태를 기준으로 계산됨
+        _lock_day(day)
+        _refresh_daily_rollups(day)
+
+
+def _refresh_daily_rollups(day):
+    start, end = _day_bounds(day)
+    consultations = Consultation.objects.filter(created_at__gte=start, created_at__lt=end)
+
+    processing_time = ExpressionWrapper(F('completed_at') - F('created_at'), output_field=DurationField())
+    rows = consultations.values('file_type', 'status').annotate(
+        consultation_count=Count('id'),
+        distinct_users=Count('user', distinct=True),
+        processed_count=Count('id', filter=Q(status='completed', completed_at__isnull=False)),
+        processing_time_sum=Sum(processing_time, filter=Q(status='completed', completed_at__isnull=False)),
+        supabase_uploaded_count=Count('id', filter=Q(supabase_file_url__isnull=False)),
+        cache_lookup_count=Count('id', filter=Q(analysis_cache_hit__isnull=False)),
+        cache_hit_count=Count('id', filter=Q(analysis_cache_hit=True)),
+    )
+    rollups = [
+        DailyConsultationRollup(
+            date=day,
+            file_type=row['file_type'],
+            status=row['status'],
+            consultation_count=row['consultation_count'],
+            distinct_users=row['distinct_users'],
+            processed_count=row['processed_count'],
+            processing_seconds_sum=row['processing_time_sum'].total_seconds() if row['processing_time_sum'] else 0,
+            supabase_uploaded_count=row['supabase_uploaded_count'],
+            cache_lookup_count=row['cache_lookup_count'],
+            cache_hit_count=row['cache_hit_count'],
+        )
+        for row in rows
+    ]
+
+    activities = [
+        DailyUserActivity(date=day, user_id=row['user'], consultation_count=row['consultation_count'])
+        for row in consultations.filter(user__isnull=False).values('user').annotate(consultation_count=Count('id'))
+    ]
+
+    DailyConsultationRollup.objects.filter(date=day).delete()
+    DailyConsultationRollup.objects.bulk_create(rollups)
+    DailyUserActivity.objects.filter(date=day).delete()
+    DailyUserActivity.objects.bulk_create(activities)
+
+
+def schedule_rollup_refresh(day):
+    """현재 트랜잭션이 커밋된 뒤 해당 날짜 집계 갱신"""
+    def refresh():
+        try:
+            refresh_daily_rollups(day)
+        except Exception:
+            # 집계 갱신 실패가 상담 처리 흐름을 막지 않도록 함 (backfill 명령으로 복구 가능)
+            logger.exception("KPI 집계 갱신 실패 (%s)", day)
+
+    transaction.on_commit(refresh)
+
+
+def backfill_rollups(date_from=None, date_to=None):
+    """
+    기간 내 모든 날짜의 집계를 다시 계산
+
+    Returns:
+        갱신한 날짜 수
+    """
+    if date_from is None:
+        first = Consultation.objects.order_by('created_at').values_list('created_at', flat=True).first()
+        if first is None:
+            return 0
+        date_from = local_date(first)
+    if date_to is None:
+        date_to = timezone.localdate()
+
+    day = date_from
+    count = 0
+    while day <= date_to:
+        refresh_daily_rollups(day)
+        day += timedelta(days=1)
+        count += 1
+    return count
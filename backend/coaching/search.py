@@ -0,0 +1,86 @@
+"""
+상담 전문 검색 (PostgreSQL full-text search + pg_trgm)
+
+제목/전사본으로 만든 tsvector(search_vector)를 GIN 인덱스로 조회하고,
+오타나 부분 일치가 있는 제목은 trigram 유사도로 함께 찾습니다.
+한국어 형태소 사전이 없으므로 'simple' 설정으로 토큰화하고 검색어는 접두사로 일치시킵니다
+('환불'로 '환불을', '환불해' 등을 찾음).
+"""
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import F, Q
+
+
+# 검색 벡터에 반영되는 필드 (이 필드가 바뀔 때만 다시 계산)
+SEARCH_SOURCE_FIELDS = ('title', 'original_content')
+
+
+def search_vector_expression():
+    """제목(가중치 A)과 전사본(가중치 B)으로 tsvector 생성"""
+    config = settings.SEARCH_CONFIG
+    return (
+        SearchVector('title', weight='A', config=config)
+        + SearchVector('original_content', weight='B', config=config)
+    )
+
+
+def update_search_vector(queryset):
+    """상담들의 검색 벡터 갱신 (PostgreSQL에서만)"""
+    if connection.vendor != 'postgresql':
+        return
+    queryset.update(search_vector=search_vector_expression())
+
+
+def build_search_query(text):
+    """
+    사용자 입력을 접두사 일치 tsquery로 변환
+
+    특수 문자는 제거하고 모든 단어를 포함하는(AND) 상담을 찾습니다.
+    검색할 단어가 없으면 None
+    """
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    raw_query = ' & '.join(f"{term}:*" for term in terms)
+    return SearchQuery(raw_query, config=settings.SEARCH_CONFIG, search_type='raw')
+
+
+def search_consultations(queryset, text):
+    """
+    검색어와 일치하는 상담을 관련도 순으로 반환
+
+    전문 검색 일치 또는 제목 trigram 유사도가 임계값 이상인 상담을 찾고,
+    관련도(search_rank)와 전사본에서 검색어를 강조한 발췌(search_headline)를 함께 제공합니다.
+    """
+    text = text.strip()
+    query = build_search_query(text)
+    condition = Q(title__trigram_similar=text)
+    if query is not None:
+        condition |= Q(search_vector=query)
+
+    queryset = queryset.annotate(title_similarity=TrigramSimilarity('title', text)).filter(condition)
+    if query is None:
+        return queryset.annotate(search_rank=F('title_similarity')).order_by('-title_similarity', '-created_at')
+
+    return queryset.annotate(
+        search_rank=SearchRank(F('search_vector'), query) + F('title_similarity'),
+        search_headline=SearchHeadline(
+            'original_content',
+            query,
+            config=settings.SEARCH_CONFIG,
+            start_sel='<mark>',
+            stop_sel='</mark>',
+            max_fragments=2,
+            max_words=20,
+            min_words=5,
+        ),
+    ).order_by('-search_rank', '-created_at')
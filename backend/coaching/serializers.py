@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
-from .models import Consultation
+from django.conf import settings
+from .models import Consultation, UploadSession
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -47,10 +48,46 @@ class ConsultationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Consultation
         fields = ['id', 'user', 'title', 'file', 'file_type', 'status', 'status_display', 
-                  'original_content', 'analysis_result', 'supabase_file_url',
+                  'original_content', 'analysis_result', 'overall_score', 'supabase_file_url',
+                  'archive_status', 'stt_engine', 'stt_model', 'media_duration', 'stt_rtf',
                   'created_at', 'updated_at', 'completed_at']
-        read_only_fields = ['user', 'status', 'original_content', 'analysis_result', 
-                          'supabase_file_url', 'created_at', 'updated_at', 'completed_at']
+        read_only_fields = ['user', 'status', 'original_content', 'analysis_result', 'overall_score',
+                          'supabase_file_url', 'archive_status', 'stt_engine', 'stt_model', 'media_duration', 'stt_rtf',
+                          'created_at', 'updated_at', 'completed_at']
+
+
+class ConsultationListSerializer(serializers.ModelSerializer):
+    """
+    상담 목록용 시리얼라이저 (요약 필드만 반환)
+
+    전사본/분석 결과 같은 큰 텍스트는 기본적으로 제외하고,
+    include 쿼리 파라미터로 요청한 필드만 포함합니다.
+    """
+    INCLUDABLE_FIELDS = ('original_content', 'analysis_result')
+    SEARCH_FIELDS = ('search_rank', 'search_headline')
+    
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    user = UserSerializer(read_only=True)
+    search_rank = serializers.FloatField(read_only=True)
+    search_headline = serializers.CharField(read_only=True, default=None)
+    
+    class Meta:
+        model = Consultation
+        fields = ['id', 'user', 'title', 'file_type', 'status', 'status_display', 'overall_score',
+                  'created_at', 'updated_at', 'completed_at', 'original_content', 'analysis_result',
+                  'search_rank', 'search_headline']
+        read_only_fields = fields
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        include = self.context.get('include', ())
+        for field_name in self.INCLUDABLE_FIELDS:
+            if field_name not in include:
+                self.fields.pop(field_name)
+        # 검색 관련도/강조 발췌는 q 검색 결과에만 포함
+        if not self.context.get('search'):
+            for field_name in self.SEARCH_FIELDS:
+                self.fields.pop(field_name)
 
 
 class ConsultationCreateSerializer(serializers.ModelSerializer):
@@ -58,3 +95,32 @@ class ConsultationCreateSerializer(serializers.ModelSerializer):
         model = Consultation
         fields = ['title', 'file', 'file_type']
 
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """분할 업로드 세션 시리얼라이저 (생성 시 제목/파일명/파일 타입/전체 크기 지정)"""
+    FILE_TYPES = ('text', 'audio', 'video')
+    
+    chunk_size = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'title', 'file_name', 'file_type', 'total_size', 'offset', 'chunk_size',
+                  'status', 'content_hash', 'consultation', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'offset', 'chunk_size', 'status', 'content_hash', 'consultation',
+                            'created_at', 'updated_at']
+    
+    def get_chunk_size(self, obj):
+        """클라이언트가 사용할 청크 크기 (마지막 청크 제외)"""
+        return settings.UPLOAD_CHUNK_SIZE
+    
+    def validate_file_type(self, value):
+        if value not in self.FILE_TYPES:
+            raise serializers.ValidationError(f"지원하지 않는 파일 타입입니다: {value}")
+        return value
+    
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("파일 크기는 0보다 커야 합니다.")
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"파일 크기는 최대 {settings.UPLOAD_MAX_SIZE} 바이트까지 업로드할 수 있습니다.")
+        return value
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Consultation
+from .rollups import ROLLUP_SOURCE_FIELDS, local_date, schedule_rollup_refresh
+from .search import SEARCH_SOURCE_FIELDS, update_search_vector
+
+
+@receiver(post_save, sender=Consultation)
+@receiver(post_delete, sender=Consultation)
+def refresh_consultation_rollups(sender, instance, update_fields=None, **kwargs):
+    """
+    상담 생성/상태 변경/삭제 시 해당 날짜의 KPI 집계 갱신
+
+    보관 상태, 내용 지문, STT 지표처럼 집계와 무관한 필드만 저장한 경우에는 다시 계산하지 않습니다.
+    """
+    if update_fields is not None and not set(ROLLUP_SOURCE_FIELDS) & set(update_fields):
+        return
+    if instance.created_at:
+        schedule_rollup_refresh(local_date(instance.created_at))
+
+
+@receiver(post_save, sender=Consultation)
+def refresh_consultation_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    """제목이나 전사본이 저장되면 전문 검색 벡터 갱신"""
+    if not created and update_fields is not None and not set(SEARCH_SOURCE_FIELDS) & set(update_fields):
+        return
+    update_search_vector(Consultation.objects.filter(pk=instance.pk))
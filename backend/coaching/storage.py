@@ -1,15 +1,227 @@
 """
 Supabase Storage를 사용한 파일 업로드 유틸리티
+
+Supabase 클라이언트와 HTTP 세션은 프로세스마다 한 번만 만들고 재사용하여
+업로드/다운로드마다 연결을 새로 맺지 않습니다.
 """
 from supabase import create_client, Client
 from django.conf import settings
+from urllib.parse import unquote, urljoin, urlparse
+import base64
+import mimetypes
 import os
+import threading
+import time
 from pathlib import Path
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# 프로세스 단위로 공유하는 HTTP 세션 (요청마다 TCP/TLS 연결을 새로 맺지 않음)
+_http_session = None
+_http_session_lock = threading.Lock()
+
+# 프로세스 단위로 공유하는 Supabase 클라이언트
+_client = None
+_client_lock = threading.Lock()
+
+# TUS(재개 가능 업로드) 프로토콜 버전
+TUS_VERSION = '1.0.0'
+
+# 업로드 처리량 통계 (프로세스 단위)
+_upload_stats_lock = threading.Lock()
+_upload_stats = {
+    'uploads': 0,
+    'resumable_uploads': 0,
+    'failures': 0,
+    'bytes_total': 0,
+    'seconds_total': 0.0,
+    'last_bytes': None,
+    'last_seconds': None,
+    'last_mbps': None,
+}
+
+
+def get_http_session() -> requests.Session:
+    """Supabase 파일 요청용 연결 풀 세션 반환"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.SUPABASE_HTTP_POOL_SIZE,
+                pool_maxsize=settings.SUPABASE_HTTP_POOL_SIZE,
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
+
+
+def get_supabase_client() -> Client:
+    """프로세스 단위로 공유하는 Supabase 클라이언트 반환"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        return _client
+
+
+def get_upload_stats() -> dict:
+    """업로드 횟수, 전송량, 평균/최근 처리량(MB/s) 통계 반환"""
+    with _upload_stats_lock:
+        stats = dict(_upload_stats)
+    seconds = stats['seconds_total']
+    stats['seconds_total'] = round(seconds, 3)
+    stats['average_mbps'] = round(stats['bytes_total'] / seconds / 1024 / 1024, 2) if seconds > 0 else None
+    return stats
+
+
+def _record_upload(size: int, elapsed: float, resumable: bool):
+    with _upload_stats_lock:
+        _upload_stats['uploads'] += 1
+        if resumable:
+            _upload_stats['resumable_uploads'] += 1
+        _upload_stats['bytes_total'] += size
+        _upload_stats['seconds_total'] += elapsed
+        _upload_stats['last_bytes'] = size
+        _upload_stats['last_seconds'] = round(elapsed, 3)
+        _upload_stats['last_mbps'] = round(size / elapsed / 1024 / 1024, 2) if elapsed > 0 else None
+
+
+def storage_path_from_url(public_url: str):
+    """
+    Supabase 공개 URL에서 버킷 내 파일 경로 추출
+
+    예: https://x.supabase.co/storage/v1/object/public/consultations/a.mp4 -> a.mp4
+    """
+    prefix = f"/storage/v1/object/public/{settings.SUPABASE_STORAGE_BUCKET}/"
+    path = urlparse(public_url).path
+    if prefix not in path:
+        return None
+    return unquote(path.split(prefix, 1)[1])
+
+
+def create_signed_url(public_url: str, file_name: str, expires_in: int = None) -> str:
+    """
+    공개 URL에 해당하는 파일의 짧은 유효기간 서명 URL 생성 (다운로드용)
+
+    Returns:
+        서명 URL. Supabase 설정이 없거나 생성에 실패하면 None
+    """
+    if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
+        return None
+    path = storage_path_from_url(public_url)
+    if not path:
+        return None
+    expires_in = expires_in or settings.DOWNLOAD_SIGNED_URL_EXPIRES
+    try:
+        result = get_supabase_client().storage.from_(settings.SUPABASE_STORAGE_BUCKET).create_signed_url(
+            path, expires_in, options={'download': file_name}
+        )
+    except Exception as e:
+        print(f"Supabase 서명 URL 생성 실패: {e}")
+        return None
+    return result.get('signedURL') or result.get('signedUrl')
+
+
+def _upload_streaming(file_path: str, file_name: str, mime_type: str):
+    """
+    단일 요청 업로드 (작은 파일)
+
+    파일 객체를 그대로 넘겨 전체를 메모리로 읽지 않고 스트리밍하며,
+    upsert로 같은 이름의 파일을 덮어써서 삭제 요청을 따로 보내지 않습니다.
+    """
+    bucket = get_supabase_client().storage.from_(settings.SUPABASE_STORAGE_BUCKET)
+    with open(file_path, 'rb') as f:
+        bucket.upload(
+            file_name,
+            f,
+            file_options={"content-type": mime_type, "upsert": "true"},
+        )
+
+
+def _tus_headers(**extra) -> dict:
+    headers = {
+        'Authorization': f'Bearer {settings.SUPABASE_KEY}',
+        'apikey': settings.SUPABASE_KEY,
+        'Tus-Resumable': TUS_VERSION,
+    }
+    headers.update(extra)
+    return headers
+
+
+def _tus_metadata(**values) -> str:
+    return ','.join(
+        f"{key} {base64.b64encode(str(value).encode()).decode()}" for key, value in values.items()
+    )
+
+
+def _upload_resumable(file_path: str, file_name: str, mime_type: str, size: int):
+    """
+    TUS 프로토콜로 청크 단위 재개 가능 업로드 (큰 파일)
+
+    청크 전송이 실패하면 서버에 저장된 오프셋을 다시 조회하여
+    이미 올라간 부분은 건너뛰고 이어서 전송합니다.
+    """
+    session = get_http_session()
+    timeout = (settings.SUPABASE_HTTP_CONNECT_TIMEOUT, settings.SUPABASE_HTTP_READ_TIMEOUT)
+    endpoint = f"{settings.SUPABASE_URL.rstrip('/')}/storage/v1/upload/resumable"
+
+    response = session.post(
+        endpoint,
+        headers=_tus_headers(**{
+            'Upload-Length': str(size),
+            'Upload-Metadata': _tus_metadata(
+                bucketName=settings.SUPABASE_STORAGE_BUCKET,
+                objectName=file_name,
+                contentType=mime_type,
+            ),
+            'x-upsert': 'true',
+        }),
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    upload_url = urljoin(endpoint, response.headers['Location'])
+
+    chunk_size = settings.SUPABASE_UPLOAD_CHUNK_SIZE
+    offset = 0
+    failures = 0
+    with open(file_path, 'rb') as f:
+        while offset < size:
+            f.seek(offset)
+            chunk = f.read(chunk_size)
+            try:
+                response = session.patch(
+                    upload_url,
+                    data=chunk,
+                    headers=_tus_headers(**{
+                        'Upload-Offset': str(offset),
+                        'Content-Type': 'application/offset+octet-stream',
+                    }),
+                    timeout=timeout,
+                )
+                response.raise_for_status()
+                offset = int(response.headers['Upload-Offset'])
+                failures = 0
+            except requests.RequestException as e:
+                failures += 1
+                if failures > settings.SUPABASE_UPLOAD_MAX_RETRIES:
+                    raise
+                print(f"청크 업로드 실패 ({offset}/{size} bytes), 재시도 {failures}회: {e}")
+                time.sleep(min(2 ** failures, 30))
+                # 서버에 실제로 반영된 오프셋부터 이어서 전송
+                head = session.head(upload_url, headers=_tus_headers(), timeout=timeout)
+                head.raise_for_status()
+                offset = int(head.headers['Upload-Offset'])
 
 
 def upload_to_supabase(file_path: str, file_name: str) -> str:
     """
     파일을 Supabase Storage에 업로드하고 공개 URL 반환
+
+    SUPABASE_RESUMABLE_UPLOAD_THRESHOLD 이상인 파일은 TUS 재개 가능 업로드로,
+    그보다 작은 파일은 단일 요청 스트리밍 업로드로 전송합니다.
     
     Args:
         file_path: 로컬 파일 경로
@@ -25,46 +237,31 @@ def upload_to_supabase(file_path: str, file_name: str) -> str:
         return None
     
     try:
-        print(f"Supabase 클라이언트 생성 중... URL: {settings.SUPABASE_URL}, Bucket: {settings.SUPABASE_STORAGE_BUCKET}")
-        supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-        
-        # 파일 읽기
-        with open(file_path, 'rb') as f:
-            file_data = f.read()
-        
-        # MIME 타입 추정
-        import mimetypes
+        size = os.path.getsize(file_path)
         mime_type, _ = mimetypes.guess_type(file_path)
         if not mime_type:
             mime_type = "application/octet-stream"
-        
-        # Supabase Storage에 업로드
-        print(f"파일 업로드 중: {file_name} ({len(file_data)} bytes)")
-        
-        # 파일이 이미 존재할 수 있으므로 먼저 삭제 시도
-        try:
-            supabase.storage.from_(settings.SUPABASE_STORAGE_BUCKET).remove([file_name])
-            print(f"기존 파일 삭제: {file_name}")
-        except Exception:
-            # 파일이 없어도 계속 진행
-            pass
-        
-        # 파일 업로드
-        response = supabase.storage.from_(settings.SUPABASE_STORAGE_BUCKET).upload(
-            file_name,
-            file_data,
-            file_options={"content-type": mime_type}
-        )
-        print(f"Supabase 업로드 응답: {response}")
+
+        resumable = size >= settings.SUPABASE_RESUMABLE_UPLOAD_THRESHOLD
+        print(f"파일 업로드 중: {file_name} ({size} bytes, {'재개 가능 업로드' if resumable else '단일 요청 업로드'})")
+        started = time.monotonic()
+        if resumable:
+            _upload_resumable(file_path, file_name, mime_type, size)
+        else:
+            _upload_streaming(file_path, file_name, mime_type)
+        elapsed = time.monotonic() - started
+        _record_upload(size, elapsed, resumable)
         
         # 공개 URL 생성
-        public_url = supabase.storage.from_(settings.SUPABASE_STORAGE_BUCKET).get_public_url(file_name)
+        public_url = get_supabase_client().storage.from_(settings.SUPABASE_STORAGE_BUCKET).get_public_url(file_name)
         
-        print(f"Supabase 업로드 성공: {public_url}")
+        print(f"Supabase 업로드 성공: {public_url} ({elapsed:.1f}초)")
+        print(f"Supabase 업로드 통계: {get_upload_stats()}")
         return public_url
     except Exception as e:
+        with _upload_stats_lock:
+            _upload_stats['failures'] += 1
         print(f"Supabase 업로드 실패: {e}")
         import traceback
         traceback.print_exc()
         return None
-
@@ -0,0 +1,168 @@
+"""
+비동기(ASGI) 분석 진행 상황 스트림
+
+스레드를 점유하지 않고 Redis pub/sub 이벤트를 기다리므로
+하나의 ASGI 프로세스에서 수천 개의 SSE 연결을 유지할 수 있습니다.
+"""
+import asyncio
+import json
+import re
+
+import redis
+import redis.asyncio as aioredis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .events import STREAM_STATUSES, TERMINAL_STATUSES, build_status_event, consultation_channel
+from .models import Consultation
+
+# 클라이언트 연결 종료를 감지해야 하는 스트림 경로
+STREAM_PATH_PATTERN = re.compile(r'^/api/consultations/\d+/events/$')
+
+
+@sync_to_async
+def _authenticate(request):
+    """JWT 인증 (DB 조회가 있으므로 스레드에서 실행)"""
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+    return result[0] if result else None
+
+
+def _format_event(consultation) -> str:
+    return f"data: {json.dumps(build_status_event(consultation))}\n\n"
+
+
+async def _event_stream(consultation):
+    """상태 이벤트를 기다리며 SSE 데이터와 하트비트를 전송하는 비동기 제너레이터"""
+    client = aioredis.Redis.from_url(settings.REDIS_URL)
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    try:
+        # 구독 후 현재 상태를 확인해야 그 사이의 이벤트를 놓치지 않음
+        try:
+            await pubsub.subscribe(consultation_channel(consultation.id))
+        except redis.RedisError as e:
+            print(f"상태 이벤트 구독 실패, DB 확인으로 대체합니다: {e}")
+            pubsub = None
+
+        await consultation.arefresh_from_db()
+        if consultation.status in STREAM_STATUSES:
+            yield _format_event(consultation)
+        if consultation.status in TERMINAL_STATUSES:
+            return
+
+        loop = asyncio.get_running_loop()
+        last_heartbeat = last_db_check = loop.time()
+        wait = min(settings.SSE_HEARTBEAT_INTERVAL, settings.SSE_DB_FALLBACK_INTERVAL)
+        while True:
+            message = None
+            if pubsub is not None:
+                try:
+                    message = await pubsub.get_message(timeout=wait)
+                except redis.RedisError as e:
+                    print(f"상태 이벤트 수신 실패, DB 확인으로 대체합니다: {e}")
+                    await pubsub.aclose()
+                    pubsub = None
+            else:
+                await asyncio.sleep(wait)
+
+            now = loop.time()
+            if message and message['type'] == 'message':
+                data = message['data']
+                if isinstance(data, bytes):
+                    data = data.decode('utf-8')
+                yield f"data: {data}\n\n"
+                last_heartbeat = now
+                if json.loads(data).get('status') in TERMINAL_STATUSES:
+                    return
+                continue
+
+            # 프록시가 유휴 연결을 끊지 않도록 SSE 주석으로 하트비트 전송
+            if now - last_heartbeat >= settings.SSE_HEARTBEAT_INTERVAL:
+                yield ": heartbeat\n\n"
+                last_heartbeat = now
+
+            # 이벤트 유실 대비 낮은 빈도의 DB 상태 확인
+            if now - last_db_check >= settings.SSE_DB_FALLBACK_INTERVAL:
+                last_db_check = now
+                await consultation.arefresh_from_db()
+                if consultation.status in STREAM_STATUSES:
+                    yield _format_event(consultation)
+                if consultation.status in TERMINAL_STATUSES:
+                    return
+    finally:
+        # 정상 종료, 클라이언트 연결 종료(태스크 취소) 모두에서 구독 해제
+        if pubsub is not None:
+            try:
+                await pubsub.aclose()
+            except redis.RedisError:
+                pass
+        await client.aclose()
+
+
+async def consultation_events(request, pk):
+    """SSE 스트림으로 분석 진행 상황 전송 (비동기 버전)"""
+    user = await _authenticate(request)
+    if user is None:
+        return JsonResponse({'detail': '인증이 필요합니다.'}, status=401)
+
+    consultation = await Consultation.objects.filter(pk=pk, user=user).afirst()
+    if consultation is None:
+        return JsonResponse({'detail': '찾을 수 없습니다.'}, status=404)
+
+    response = StreamingHttpResponse(_event_stream(consultation), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class StreamDisconnectMiddleware:
+    """
+    SSE 스트림 요청에서 클라이언트 연결 종료를 감지하는 ASGI 미들웨어
+
+    Django 4.2의 ASGI 핸들러는 스트리밍 응답 중 http.disconnect를 확인하지 않으므로,
+    요청 본문을 모두 읽은 뒤 연결 종료 메시지를 기다렸다가 응답 태스크를 취소합니다.
+    취소되면 _event_stream의 finally 블록에서 Redis 구독이 정리됩니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not STREAM_PATH_PATTERN.match(scope['path']):
+            return await self.app(scope, receive, send)
+
+        body_received = asyncio.Event()
+
+        async def receive_wrapper():
+            message = await receive()
+            if message['type'] != 'http.request' or not message.get('more_body', False):
+                body_received.set()
+            return message
+
+        async def wait_for_disconnect():
+            await body_received.wait()
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+
+        app_task = asyncio.ensure_future(self.app(scope, receive_wrapper, send))
+        disconnect_task = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            done, _ = await asyncio.wait({app_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+            if app_task not in done:
+                app_task.cancel()
+                try:
+                    await app_task
+                except asyncio.CancelledError:
+                    pass
+            else:
+                app_task.result()
+        finally:
+            disconnect_task.cancel()
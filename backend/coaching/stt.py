@@ -0,0 +1,341 @@
+"""
+로컬 STT(Whisper) 유틸리티
+
+Whisper 모델은 로딩에 수 초가 걸리고 메모리도 많이 차지하므로
+워커 프로세스마다 한 번만 로드하고 이후 작업에서는 재사용합니다.
+모델 로드/전사는 STT_ENGINE 설정에 따른 엔진(stt_engines)이 담당합니다.
+"""
+import multiprocessing
+import os
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .stt_engines import get_engine
+
+
+# Whisper가 입력으로 기대하는 샘플레이트 (16kHz 모노)
+SAMPLE_RATE = 16000
+
+# 디코딩/분할/후처리 방식을 바꿔 같은 모델이라도 전사 결과가 달라지면 올려서
+# 이전 전사본 캐시가 재사용되지 않도록 합니다.
+STT_VERSION = '1'
+
+# 분할 전사용 프로세스 풀 (워커 프로세스마다 지연 생성 후 재사용)
+_executor = None
+_executor_lock = threading.Lock()
+
+# 분할 전사 프로세스에서 모델이 사용할 CPU 스레드 수 (_init_chunk_worker에서 지정)
+_worker_threads = None
+
+# 프로세스 단위 모델 캐시 ((엔진, 모델 이름) -> 로드된 모델, LRU 순서 유지)
+_models = OrderedDict()
+_lock = threading.Lock()
+_stats = {
+    'hits': 0,
+    'misses': 0,
+    'evictions': 0,
+    'load_count': 0,
+    'load_seconds_total': 0.0,
+    'last_load_seconds': None,
+}
+
+
+def get_stt_model(name: str = None, engine_name: str = None):
+    """
+    STT 모델을 반환 (캐시에 없으면 로드 후 캐시)
+
+    Args:
+        name: 모델 크기/이름 (tiny, base, small, medium, large 등). 없으면 WHISPER_MODEL 설정값
+        engine_name: STT 엔진 이름. 없으면 STT_ENGINE 설정값
+
+    Returns:
+        해당 엔진으로 로드된 모델
+    """
+    name = name or settings.WHISPER_MODEL
+    engine = get_engine(engine_name)
+    key = (engine.name, name)
+
+    with _lock:
+        model = _models.get(key)
+        if model is not None:
+            _models.move_to_end(key)
+            _stats['hits'] += 1
+            return model
+
+        _stats['misses'] += 1
+
+        print(f"STT 모델 로딩 중: {name} ({engine.name})")
+        started = time.monotonic()
+        model = engine.load(name, threads=_worker_threads)
+        elapsed = time.monotonic() - started
+
+        _stats['load_count'] += 1
+        _stats['load_seconds_total'] += elapsed
+        _stats['last_load_seconds'] = elapsed
+        print(f"STT 모델 로딩 완료: {name} ({engine.name}, {elapsed:.1f}초)")
+
+        _models[key] = model
+        # 캐시 상한을 넘으면 가장 오래 사용하지 않은 모델부터 제거
+        max_models = max(1, settings.WHISPER_MODEL_CACHE_SIZE)
+        while len(_models) > max_models:
+            evicted_key, _ = _models.popitem(last=False)
+            _stats['evictions'] += 1
+            print(f"STT 모델 캐시에서 제거: {evicted_key[1]} ({evicted_key[0]})")
+
+        return model
+
+
+def preload_whisper_models(names=None):
+    """워커 초기화 시 지정된 모델들을 미리 로드"""
+    names = names if names is not None else settings.WHISPER_PRELOAD_MODELS
+    for name in names:
+        try:
+            get_stt_model(name)
+        except ImportError:
+            print(f"STT 엔진({settings.STT_ENGINE}) 패키지가 설치되지 않아 모델을 미리 로드하지 않습니다.")
+            return
+        except Exception as e:
+            print(f"Whisper 모델 사전 로딩 실패 ({name}): {e}")
+
+
+def get_model_registry_stats() -> dict:
+    """모델 캐시 히트/미스 및 로딩 시간 통계 반환"""
+    with _lock:
+        stats = dict(_stats)
+        stats['loaded_models'] = [f"{engine_name}:{name}" for engine_name, name in _models.keys()]
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups > 0 else None
+    return stats
+
+
+def clear_model_registry():
+    """캐시된 모델을 모두 제거 (메모리 회수용)"""
+    with _lock:
+        _models.clear()
+
+
+def load_audio(file_path: str, sample_rate: int = SAMPLE_RATE):
+    """
+    ffmpeg로 오디오/비디오 파일을 디코딩하여 16kHz 모노 PCM을 메모리로 읽어옴
+
+    임시 파일을 만들거나 손실 압축으로 재인코딩하지 않고
+    ffmpeg 표준 출력을 바로 NumPy 버퍼로 받아 STT 엔진에 전달합니다.
+
+    Args:
+        file_path: 원본 오디오/비디오 파일 경로
+        sample_rate: 출력 샘플레이트
+
+    Returns:
+        -1.0 ~ 1.0 범위의 float32 NumPy 배열
+    """
+    import numpy as np
+
+    cmd = [
+        'ffmpeg', '-nostdin', '-threads', '0',
+        '-i', file_path,
+        '-vn',
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ac', '1', '-ar', str(sample_rate),
+        '-',
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        error_msg = e.stderr.decode('utf-8', errors='ignore') if e.stderr else str(e)
+        raise Exception(f"오디오 디코딩 실패: {error_msg}")
+    except FileNotFoundError:
+        raise Exception("ffmpeg가 설치되지 않았습니다. 오디오/비디오 처리를 위해 ffmpeg를 설치해주세요.")
+
+    audio = np.frombuffer(result.stdout, np.int16).flatten().astype(np.float32) / 32768.0
+    if audio.size == 0:
+        raise Exception("오디오 디코딩 결과가 비어있습니다. 파일에 오디오 트랙이 없을 수 있습니다.")
+    return audio
+
+
+def probe_duration(file_path: str):
+    """
+    ffprobe로 오디오/비디오 파일 길이(초)를 디코딩 없이 조회
+
+    Returns:
+        길이(초). ffprobe가 없거나 길이를 알 수 없으면 None
+    """
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        file_path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=True, timeout=30)
+        return float(result.stdout.decode().strip())
+    except (subprocess.SubprocessError, FileNotFoundError, ValueError) as e:
+        print(f"ffprobe로 길이를 확인하지 못했습니다: {e}")
+        return None
+
+
+def split_on_silence(audio, sample_rate: int = SAMPLE_RATE, chunk_seconds: float = None,
+                     search_seconds: float = None, frame_ms: int = 30):
+    """
+    오디오를 무음 구간 경계에서 분할
+
+    목표 길이(chunk_seconds)마다 전후 search_seconds 범위에서 에너지(RMS)가
+    가장 낮은 프레임을 찾아 자르므로 발화 중간이 잘리는 것을 최소화합니다.
+
+    Returns:
+        (시작 샘플, 끝 샘플) 튜플 리스트
+    """
+    import numpy as np
+
+    chunk_seconds = chunk_seconds or settings.STT_CHUNK_SECONDS
+    search_seconds = search_seconds if search_seconds is not None else settings.STT_SILENCE_SEARCH_SECONDS
+
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    total = audio.size
+    n_frames = total // frame_len
+    if n_frames == 0:
+        return [(0, total)]
+
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+
+    chunk_frames = max(1, int(chunk_seconds * 1000 / frame_ms))
+    search_frames = int(search_seconds * 1000 / frame_ms)
+
+    boundaries = [0]
+    cursor = 0
+    while n_frames - cursor > chunk_frames + search_frames:
+        target = cursor + chunk_frames
+        lo = max(cursor + 1, target - search_frames)
+        hi = min(n_frames, target + search_frames + 1)
+        cut = lo + int(np.argmin(rms[lo:hi]))
+        boundaries.append(cut)
+        cursor = cut
+
+    chunks = []
+    for i, start_frame in enumerate(boundaries):
+        start = start_frame * frame_len
+        end = boundaries[i + 1] * frame_len if i + 1 < len(boundaries) else total
+        chunks.append((start, end))
+    return chunks
+
+
+def _init_chunk_worker(torch_threads: int):
+    """분할 전사 프로세스 초기화 (코어 과점유 방지를 위해 torch/CTranslate2 스레드 수 제한)"""
+    global _worker_threads
+    _worker_threads = torch_threads
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+
+def _transcribe_chunk(model_name: str, audio, language: str, engine_name: str = None) -> dict:
+    """프로세스 풀에서 실행되는 청크 단위 전사"""
+    engine = get_engine(engine_name)
+    model = get_stt_model(model_name, engine.name)
+    return engine.transcribe(model, audio, language)
+
+
+def _parallel_workers() -> int:
+    """분할 전사 프로세스 수 (STT_PARALLEL_WORKERS, 0이면 코어 수)"""
+    return settings.STT_PARALLEL_WORKERS or os.cpu_count() or 1
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    분할 전사용 프로세스 풀 반환
+
+    풀 크기는 첫 파일의 청크 수가 아니라 설정값으로 정하므로, 청크가 적은 파일이 먼저 와도
+    이후 파일들이 작은 풀에 묶이지 않습니다. 청크 수가 풀보다 적으면 일부 프로세스만 사용됩니다.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = _parallel_workers()
+            torch_threads = max(1, (os.cpu_count() or 1) // workers)
+            # fork는 torch 스레드와 함께 교착 상태를 일으킬 수 있으므로 spawn 사용
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_chunk_worker,
+                initargs=(torch_threads,),
+            )
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def transcribe_audio(audio, language: str = 'ko', model_name: str = None,
+                     sample_rate: int = SAMPLE_RATE, engine_name: str = None) -> dict:
+    """
+    PCM 오디오를 전사하여 텍스트와 타임스탬프 세그먼트를 반환
+
+    STT_CHUNK_MIN_DURATION 이상인 긴 오디오는 무음 경계에서 분할하여
+    코어 수만큼의 프로세스에서 동시에 전사한 뒤 순서대로 이어붙입니다.
+
+    Returns:
+        {'text': 전체 텍스트, 'segments': [{'start', 'end', 'text'}, ...]}
+    """
+    model_name = model_name or settings.WHISPER_MODEL
+    engine_name = engine_name or settings.STT_ENGINE
+    duration = audio.size / sample_rate
+    workers = _parallel_workers()
+
+    if workers > 1 and duration >= settings.STT_CHUNK_MIN_DURATION:
+        chunks = split_on_silence(audio, sample_rate)
+        if len(chunks) > 1:
+            try:
+                return _transcribe_chunked(audio, chunks, language, model_name, engine_name, sample_rate)
+            except (AssertionError, BrokenProcessPool, OSError) as e:
+                # Celery prefork 자식 프로세스(daemon)에서는 하위 프로세스를 만들 수 없음
+                print(f"병렬 전사를 사용할 수 없어 단일 프로세스로 전사합니다: {e}")
+                _reset_executor()
+
+    return _transcribe_chunk(model_name, audio, language, engine_name)
+
+
+def _transcribe_chunked(audio, chunks, language, model_name, engine_name, sample_rate) -> dict:
+    print(f"병렬 분할 전사: {len(chunks)}개 청크, {min(len(chunks), _parallel_workers())}개 프로세스 사용")
+    executor = _get_executor()
+    futures = [
+        executor.submit(_transcribe_chunk, model_name, audio[start:end], language, engine_name)
+        for start, end in chunks
+    ]
+    return merge_chunk_results(chunks, [future.result() for future in futures], sample_rate)
+
+
+def merge_chunk_results(chunks, parts, sample_rate: int = SAMPLE_RATE) -> dict:
+    """
+    청크별 전사 결과를 순서대로 이어붙이고 세그먼트 시각을 원본 오디오 기준으로 보정
+
+    Args:
+        chunks: split_on_silence가 반환한 (시작 샘플, 끝 샘플) 리스트
+        parts: 청크와 같은 순서의 전사 결과 리스트
+    """
+    texts = []
+    segments = []
+    for (start, _), part in zip(chunks, parts):
+        offset = start / sample_rate
+        if part['text']:
+            texts.append(part['text'])
+        for seg in part['segments']:
+            segments.append({
+                'start': round(seg['start'] + offset, 2),
+                'end': round(seg['end'] + offset, 2),
+                'text': seg['text'],
+            })
+
+    return {'text': ' '.join(texts), 'segments': segments}
@@ -0,0 +1,97 @@
+"""
+STT 엔진
+
+엔진마다 모델 로드와 전사 방식이 다르므로 공통 인터페이스로 감싸고,
+전사 결과는 모두 {'text', 'segments': [{'start', 'end', 'text'}]} 형식으로 반환합니다.
+사용할 엔진은 STT_ENGINE 설정으로 선택합니다.
+
+- whisper: openai-whisper (PyTorch 참조 구현)
+- faster-whisper: CTranslate2 기반 구현, CPU에서 int8 양자화 모델 사용 (STT_COMPUTE_TYPE)
+"""
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+
+
+class STTEngine(ABC):
+    """STT 엔진 공통 인터페이스 (load/transcribe를 모두 구현해야 인스턴스 생성 가능)"""
+    name = None
+
+    @abstractmethod
+    def load(self, model_name: str, threads: int = None):
+        """
+        모델 로드
+
+        Args:
+            model_name: 모델 크기/이름 (tiny, base, small, medium, large 등)
+            threads: 사용할 CPU 스레드 수 (분할 전사 프로세스에서 지정, 없으면 엔진 기본값)
+        """
+
+    @abstractmethod
+    def transcribe(self, model, audio, language: str) -> dict:
+        """16kHz 모노 float32 PCM을 전사하여 텍스트와 세그먼트 반환"""
+
+
+class WhisperEngine(STTEngine):
+    """openai-whisper (PyTorch)"""
+    name = 'whisper'
+
+    def load(self, model_name, threads=None):
+        import whisper
+        return whisper.load_model(model_name)
+
+    def transcribe(self, model, audio, language):
+        result = model.transcribe(audio, language=language)
+        return {
+            'text': result['text'].strip(),
+            'segments': [
+                {'start': seg['start'], 'end': seg['end'], 'text': seg['text'].strip()}
+                for seg in result.get('segments', [])
+            ],
+        }
+
+
+class FasterWhisperEngine(STTEngine):
+    """faster-whisper (CTranslate2, CPU int8 양자화)"""
+    name = 'faster-whisper'
+
+    def load(self, model_name, threads=None):
+        from faster_whisper import WhisperModel
+        return WhisperModel(
+            model_name,
+            device='cpu',
+            compute_type=settings.STT_COMPUTE_TYPE,
+            cpu_threads=threads or settings.STT_CPU_THREADS,
+        )
+
+    def transcribe(self, model, audio, language):
+        # segments는 제너레이터이므로 순회해야 실제 전사가 진행됨
+        segments, _ = model.transcribe(audio, language=language)
+        segments = [
+            {'start': round(seg.start, 2), 'end': round(seg.end, 2), 'text': seg.text.strip()}
+            for seg in segments
+        ]
+        return {
+            'text': ' '.join(seg['text'] for seg in segments if seg['text']),
+            'segments': segments,
+        }
+
+
+ENGINES = {engine.name: engine for engine in (WhisperEngine, FasterWhisperEngine)}
+
+
+def get_engine(name: str = None) -> STTEngine:
+    """
+    이름으로 STT 엔진 반환
+
+    Args:
+        name: 엔진 이름. 없으면 STT_ENGINE 설정값
+
+    Raises:
+        ValueError: 지원하지 않는 엔진 이름
+    """
+    name = name or settings.STT_ENGINE
+    try:
+        return ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"지원하지 않는 STT 엔진입니다: {name} (사용 가능: {', '.join(ENGINES)})")
@@ -0,0 +1,82 @@
+"""
+STT 모델 선택 정책
+
+파일 길이와 stt 큐 대기 작업 수를 보고, 작업당 지연 시간 예산(STT_LATENCY_BUDGET_SECONDS) 안에
+전사를 끝낼 수 있는 가장 큰 Whisper 모델을 선택합니다.
+대기 작업이 쌓이면 뒤 작업들도 같은 워커를 기다리므로 작업당 예산을 (대기 수 + 1)로 나누어
+작은 모델로 내려가고, 큐가 비어 있으면 예산 전체를 써서 큰 모델을 사용합니다.
+"""
+import redis
+from django.conf import settings
+
+
+STT_QUEUE = 'stt'
+
+_broker = None
+
+
+def get_stt_queue_depth() -> int:
+    """
+    stt 큐에서 대기 중인 작업 수 (Celery Redis 브로커의 큐 리스트 길이)
+
+    브로커에 연결할 수 없으면 0 (대기 없음)으로 간주합니다.
+    """
+    global _broker
+    try:
+        if _broker is None:
+            _broker = redis.Redis.from_url(settings.CELERY_BROKER_URL)
+        return int(_broker.llen(STT_QUEUE))
+    except redis.RedisError as e:
+        print(f"stt 큐 길이 조회 실패: {e}")
+        return 0
+
+
+def estimate_stt_seconds(model_name: str, duration: float) -> float:
+    """모델의 예상 실시간 배율(STT_MODEL_RTF)로 전사 소요 시간(초) 추정"""
+    return duration * settings.STT_MODEL_RTF.get(model_name, 1.0)
+
+
+def select_stt_model(duration, queue_depth: int = None) -> str:
+    """
+    파일 길이와 큐 대기 수로 사용할 Whisper 모델 선택
+
+    Args:
+        duration: 오디오 길이(초). 알 수 없으면 None
+        queue_depth: stt 큐 대기 작업 수. 없으면 브로커에서 조회
+
+    Returns:
+        모델 이름. 정책을 사용하지 않거나 길이를 모르면 WHISPER_MODEL
+    """
+    tiers = settings.STT_MODEL_TIERS
+    if not settings.STT_MODEL_POLICY_ENABLED or not tiers or not duration:
+        return settings.WHISPER_MODEL
+
+    if queue_depth is None:
+        queue_depth = get_stt_queue_depth()
+    budget = settings.STT_LATENCY_BUDGET_SECONDS / (queue_depth + 1)
+
+    # 큰 모델부터 예산 안에 끝낼 수 있는 모델을 찾고, 없으면 가장 작은 모델 사용
+    for model_name in tiers:
+        if estimate_stt_seconds(model_name, duration) <= budget:
+            chosen = model_name
+            break
+    else:
+        chosen = tiers[-1]
+
+    print(
+        f"STT 모델 선택: {chosen} (길이 {duration:.1f}초, 대기 작업 {queue_depth}개, "
+        f"작업당 예산 {budget:.1f}초, 예상 {estimate_stt_seconds(chosen, duration):.1f}초)"
+    )
+    return chosen
+
+
+def cache_candidate_models(model_name: str) -> list:
+    """
+    전사본 캐시에서 찾아볼 모델들 (선택한 모델과 그보다 큰 모델, 큰 모델 우선)
+
+    부하에 따라 선택되는 모델이 달라져도 같은 파일을 더 큰 모델로 전사한 결과가 있으면 재사용합니다.
+    """
+    tiers = settings.STT_MODEL_TIERS
+    if model_name not in tiers:
+        return [model_name]
+    return tiers[:tiers.index(model_name) + 1]
@@ -1,47 +1,49 @@
-from celery import shared_task
+from celery import chain, shared_task
+from celery.exceptions import Ignore
+from celery.signals import worker_process_init
 from django.utils import timezone
 from django.conf import settings
 from .models import Consultation
+from .events import publish_status
+from . import batching
+from .analysis import extract_analysis_fields
+from .cache import (
+    get_cached_analysis,
+    get_cached_transcript,
+    make_analysis_cache_key,
+    make_transcript_cache_key,
+    store_cached_analysis,
+    store_cached_transcript,
+)
+from .fingerprint import file_content_hash
+from .stt_policy import cache_candidate_models, select_stt_model
+from .ratelimit import estimate_tokens, record_usage, try_acquire as try_acquire_rate_limit
 from .storage import upload_to_supabase
+from .stt import (
+    SAMPLE_RATE,
+    STT_VERSION,
+    get_model_registry_stats,
+    load_audio,
+    preload_whisper_models,
+    probe_duration,
+    transcribe_audio,
+)
 import google.generativeai as genai
+import redis
 from google.api_core import exceptions as google_exceptions
-import os
-import mimetypes
-import time
-import subprocess
-import tempfile
+import random
+import re
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 
-@shared_task
-def analyze_consultation(consultation_id):
-    """상담 내용을 분석하는 Celery 태스크"""
-    try:
-        consultation = Consultation.objects.get(id=consultation_id)
-        consultation.status = 'processing'
-        consultation.save()
-        
-        # Gemini API 설정
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        # 모델 이름이 'models/' 접두사 없이 제공되면 자동으로 추가됨
-        model_name = settings.GEMINI_MODEL
-        if not model_name.startswith('models/'):
-            model_name = f'models/{model_name}'
-        
-        # JSON 응답을 강제하기 위한 generation_config 설정
-        generation_config = {
-            "response_mime_type": "application/json",
-            "temperature": 0.3,  # 일관성을 위해 낮은 temperature 사용
-        }
-        model = genai.GenerativeModel(model_name, generation_config=generation_config)
-        
-        file_path = consultation.file.path
-        file_type = consultation.file_type
-        
-        # 프롬프트 구성
-        system_prompt = "당신은 고객 상담 품질을 분석하는 전문가입니다. 항상 지정된 JSON 형식으로만 응답해야 합니다."
-        user_prompt = """다음 상담 내용을 분석하여 개선이 필요한 사항들을 도출해주세요.
+# 분석 프롬프트
+# 프롬프트나 응답 스키마를 변경하면 ANALYSIS_PROMPT_VERSION을 올려 이전 캐시 결과가 재사용되지 않도록 합니다.
+ANALYSIS_PROMPT_VERSION = '1'
+ANALYSIS_SYSTEM_PROMPT = "당신은 고객 상담 품질을 분석하는 전문가입니다. 항상 지정된 JSON 형식으로만 응답해야 합니다."
+ANALYSIS_USER_PROMPT = """다음 상담 내용을 분석하여 개선이 필요한 사항들을 도출해주세요.
 
 다음 항목들을 중심으로 분석해주세요:
 1. 고객 응대 태도
@@ -82,241 +84,905 @@ def analyze_consultation(consultation_id):
   "overall_score": 1-10 점수,
   "overall_feedback": "종합 피드백 (3-5문장)"
 }"""
+
+# 분석 결과 JSON의 필수 필드
+ANALYSIS_REQUIRED_FIELDS = (
+    'summary', 'customer_service_attitude', 'problem_solving', 'communication_skills',
+    'improvement_recommendations', 'overall_score', 'overall_feedback',
+)
+
+# 긴 상담 내용의 구간별 분석(map) 프롬프트
+# 구간 결과는 종합(reduce) 단계의 입력으로만 쓰이며, 변경 시 ANALYSIS_MAP_PROMPT_VERSION을 올립니다.
+ANALYSIS_MAP_PROMPT_VERSION = 'map-1'
+ANALYSIS_MAP_PROMPT = """다음은 긴 상담 내용을 여러 구간으로 나눈 것 중 한 구간입니다. 구간은 대화 중간에서 시작하거나 끝날 수 있습니다.
+이 구간에서 실제로 관찰되는 내용만 근거로 상담원의 응대를 정리해주세요.
+나중에 모든 구간의 결과를 종합하여 최종 분석을 작성하므로, 근거가 되는 발화를 구체적으로 적어주세요.
+
+**중요: 반드시 아래 JSON 형식으로만 응답해주세요. 다른 텍스트나 설명은 포함하지 마세요.**
+
+{
+  "summary": "이 구간의 내용 요약 (1-2문장)",
+  "customer_service_attitude": {
+    "score": 1-10 점수,
+    "strengths": ["강점1"],
+    "weaknesses": ["개선점1"],
+    "notes": "관찰 내용"
+  },
+  "problem_solving": {
+    "score": 1-10 점수,
+    "strengths": ["강점1"],
+    "weaknesses": ["개선점1"],
+    "notes": "관찰 내용"
+  },
+  "communication_skills": {
+    "score": 1-10 점수,
+    "strengths": ["강점1"],
+    "weaknesses": ["개선점1"],
+    "notes": "관찰 내용"
+  },
+  "issues": [
+    {
+      "category": "카테고리명",
+      "issue": "문제점 설명",
+      "evidence": "근거가 되는 발화"
+    }
+  ]
+}"""
+
+# JSON 응답을 강제하기 위한 generation_config 설정
+GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "temperature": 0.3,  # 일관성을 위해 낮은 temperature 사용
+}
+
+
+@worker_process_init.connect
+def preload_stt_models(**kwargs):
+    """워커 프로세스 시작 시 Whisper 모델을 미리 로드"""
+    preload_whisper_models()
+
+
+def get_gemini_model():
+    """
+    Gemini 모델 객체 생성
+
+    Returns:
+        (GenerativeModel, 'models/' 접두사가 붙은 모델 이름)
+    """
+    genai.configure(api_key=settings.GEMINI_API_KEY)
+    # 모델 이름이 'models/' 접두사 없이 제공되면 자동으로 추가됨
+    model_name = settings.GEMINI_MODEL
+    if not model_name.startswith('models/'):
+        model_name = f'models/{model_name}'
+    return genai.GenerativeModel(model_name, generation_config=GENERATION_CONFIG), model_name
+
+
+class QuotaWait(Exception):
+    """
+    Gemini 호출 용량이 없어 나중에 다시 시도해야 함
+
+    Attributes:
+        retry_after: 다시 시도하기까지 기다려야 하는 시간(초). 알 수 없으면 None
+        quota_exceeded: True면 API가 할당량 초과(ResourceExhausted)를 반환한 경우,
+            False면 공용 토큰 버킷에서 용량을 확보하지 못한 경우
+    """
+
+    def __init__(self, message, retry_after=None, quota_exceeded=False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.quota_exceeded = quota_exceeded
+
+
+def call_gemini(model, prompt_or_content, responses=1):
+    """
+    Gemini API 호출 (대기하지 않음)
+
+    호출 용량이 없거나 할당량 초과 에러가 나면 워커에서 sleep하지 않고
+    QuotaWait을 발생시켜 호출한 태스크가 countdown으로 다시 예약하도록 합니다.
+
+    Args:
+        model: GenerativeModel 객체
+        prompt_or_content: 프롬프트 문자열 또는 [프롬프트, 파일] 리스트
+        responses: 한 번의 호출로 받을 분석 결과 수 (토큰 사용량 추정용)
+    """
+    # 클러스터 공용 토큰 버킷에서 호출 용량을 먼저 확보 (RPM/TPM 초과 전에 양보)
+    estimated_tokens = estimate_tokens(prompt_or_content, responses)
+    wait = try_acquire_rate_limit(model.model_name, estimated_tokens)
+    if wait > 0:
+        raise QuotaWait(f"Gemini 호출 속도 제한 ({wait:.1f}초 후 가능)", retry_after=wait)
+
+    try:
+        response = model.generate_content(prompt_or_content)
+    except google_exceptions.ResourceExhausted as e:
+        error_msg = str(e)
+        # "Please retry in 33.487629633s" 형식에서 재시도 가능 시간 추출
+        retry_after = None
+        match = re.search(r'Please retry in ([\d.]+)s', error_msg)
+        if match:
+            retry_after = float(match.group(1))
+        raise QuotaWait(error_msg, retry_after=retry_after, quota_exceeded=True)
+
+    usage = getattr(response, 'usage_metadata', None)
+    record_usage(model.model_name, estimated_tokens, getattr(usage, 'total_token_count', None))
+    return response.text
+
+
+def quota_exhausted_error(error_msg):
+    """재시도 횟수를 모두 쓴 할당량 초과 에러"""
+    return Exception(
+        f"Gemini API 할당량 초과: 무료 티어 할당량을 모두 사용했습니다.\n\n"
+        f"해결 방법:\n"
+        f"1. 잠시 후 다시 시도하세요 (보통 몇 분 후 재사용 가능)\n"
+        f"2. Google AI Studio에서 할당량 확인: https://ai.dev/usage?tab=rate-limit\n"
+        f"3. 유료 플랜으로 업그레이드 고려\n"
+        f"4. 더 작은 모델 사용 (gemini-2.0-flash-lite 등)\n\n"
+        f"원본 에러: {error_msg}"
+    )
+
+
+def build_analysis_prompt(file_type, content):
+    """상담 내용으로 분석 프롬프트 구성"""
+    label = "상담 내용" if file_type == 'text' else "상담 내용 (전사본)"
+    return f"""{ANALYSIS_USER_PROMPT}
+
+{label}:
+{content}"""
+
+
+def split_transcript_windows(content, max_tokens):
+    """
+    긴 상담 내용을 토큰 수 상한(추정치) 이하의 구간들로 분할
+
+    줄 단위로 묶되, 한 줄이 상한을 넘으면(한 줄로 이어진 전사본 등) 문장 단위로,
+    문장도 넘으면 글자 수로 자릅니다.
+
+    Returns:
+        구간 문자열 리스트 (순서 유지)
+    """
+    max_chars = max(1, int(max_tokens * settings.GEMINI_CHARS_PER_TOKEN))
+    units = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) <= max_chars:
+            units.append(line)
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', line):
+            while len(sentence) > max_chars:
+                units.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            if sentence:
+                units.append(sentence)
+    
+    windows = []
+    current, size = [], 0
+    for unit in units:
+        if current and size + len(unit) > max_chars:
+            windows.append('\n'.join(current))
+            current, size = [], 0
+        current.append(unit)
+        size += len(unit) + 1
+    if current:
+        windows.append('\n'.join(current))
+    return windows
+
+
+def build_map_prompt(window):
+    """긴 상담 내용의 한 구간을 분석하는 프롬프트 구성"""
+    return f"""{ANALYSIS_MAP_PROMPT}
+
+상담 내용 (구간):
+{window}"""
+
+
+def build_reduce_prompt(file_type, partials):
+    """
+    구간별 분석 결과를 하나의 분석 결과(기존 JSON 형식)로 종합하는 프롬프트 구성
+
+    Args:
+        partials: 구간 순서대로 정렬된 구간별 분석 결과 문자열 리스트
+    """
+    label = "상담 내용" if file_type == 'text' else "상담 내용 (전사본)"
+    sections = '\n\n'.join(
+        f"### 구간 {index}/{len(partials)}\n{_compact_partial(partial)}"
+        for index, partial in enumerate(partials, 1)
+    )
+    return f"""{ANALYSIS_USER_PROMPT}
+
+아래는 하나의 긴 {label}을 {len(partials)}개 구간으로 나누어 순서대로 분석한 중간 결과입니다.
+구간별 결과를 종합하여 상담 전체에 대한 하나의 분석 결과를 위 JSON 형식으로 작성해주세요.
+여러 구간에 반복되는 문제는 하나의 개선 사항으로 합치고, 점수는 구간 점수의 평균이 아니라 상담 전체를 기준으로 매겨주세요.
+
+{sections}"""
+
+
+def _strip_code_block(text):
+    """응답에 마크다운 코드 블록(```json ... ```)이 있으면 제거"""
+    json_text = text.strip()
+    if json_text.startswith('```'):
+        lines = json_text.split('\n')
+        json_text = '\n'.join(lines[1:-1]) if lines[-1].strip() == '```' else '\n'.join(lines[1:])
+    return json_text
+
+
+def _parse_json_object(text):
+    """응답을 JSON 객체로 파싱. 실패하면 None"""
+    try:
+        parsed = json.loads(_strip_code_block(text))
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _compact_partial(partial):
+    """종합 프롬프트에 넣을 구간 결과 (JSON이면 공백 없이 직렬화하여 토큰 절약)"""
+    parsed = _parse_json_object(partial)
+    if parsed is None:
+        return partial.strip()
+    return json.dumps(parsed, ensure_ascii=False, separators=(',', ':'))
+
+
+def build_batch_analysis_prompt(items):
+    """
+    여러 상담을 한 번에 분석하는 프롬프트 구성 (분석 지침은 한 번만 포함)
+
+    Args:
+        items: (상담 ID, 상담 내용) 튜플 리스트
+    """
+    sections = '\n\n'.join(
+        f"### consultation_id: {consultation_id}\n{content}" for consultation_id, content in items
+    )
+    return f"""{ANALYSIS_USER_PROMPT}
+
+아래에는 서로 독립적인 상담 {len(items)}건이 있습니다. 각 상담을 위 형식으로 따로 분석하고,
+각 객체에 해당 상담 번호를 "consultation_id" 필드(정수)로 추가하여 모든 객체를 하나의 JSON 배열로만 응답해주세요.
+배열에는 상담마다 정확히 하나의 객체가 있어야 합니다.
+
+{sections}"""
+
+
+def split_batch_analysis_response(response_text, consultation_ids):
+    """
+    일괄 분석 응답(JSON 배열)을 상담별 분석 결과로 분리
+
+    Returns:
+        {상담 ID: 분석 결과 JSON 문자열}. 응답을 해석할 수 없거나 결과가 없는 상담은 포함하지 않음
+    """
+    try:
+        parsed = json.loads(_strip_code_block(response_text))
+    except json.JSONDecodeError as e:
+        print(f"경고: 일괄 분석 응답 JSON 파싱 실패: {e}")
+        return {}
+    if not isinstance(parsed, list):
+        print("경고: 일괄 분석 응답이 JSON 배열이 아닙니다")
+        return {}
+    
+    expected = set(consultation_ids)
+    results = {}
+    for item in parsed:
+        if not isinstance(item, dict):
+            continue
+        try:
+            consultation_id = int(item.pop('consultation_id'))
+        except (KeyError, TypeError, ValueError):
+            continue
+        # 요청하지 않은 ID이거나 같은 ID가 중복되면 해당 상담은 단건 분석으로 처리
+        if consultation_id not in expected or consultation_id in results:
+            results.pop(consultation_id, None)
+            expected.discard(consultation_id)
+            continue
+        # 분석 필드가 하나도 없는 객체는 결과로 보지 않고 단건 분석으로 처리
+        if not any(field in item for field in ANALYSIS_REQUIRED_FIELDS):
+            continue
+        results[consultation_id] = json.dumps(item, ensure_ascii=False)
+    return results
+
+
+def parse_analysis_response(analysis_result):
+    """
+    LLM 응답을 JSON으로 파싱 및 검증
+
+    Returns:
+        (저장할 분석 결과 문자열, 파싱된 dict 또는 파싱 실패 시 None)
+    """
+    try:
+        # JSON 파싱 시도 (응답에 마크다운 코드 블록이 있을 수 있으므로 처리)
+        json_text = _strip_code_block(analysis_result)
         
-        # 원본 내용 저장을 위한 변수
-        original_content = None
+        parsed_result = json.loads(json_text)
+        if not isinstance(parsed_result, dict):
+            raise json.JSONDecodeError("분석 결과가 JSON 객체가 아닙니다", json_text, 0)
         
-        # Gemini API 호출 헬퍼 함수 (재시도 로직 포함)
-        def call_gemini_with_retry(prompt_or_content, max_retries=3, initial_delay=1):
-            """
-            Gemini API를 호출하고 할당량 초과 시 재시도
-            
-            Args:
-                prompt_or_content: 프롬프트 문자열 또는 [프롬프트, 파일] 리스트
-                max_retries: 최대 재시도 횟수
-                initial_delay: 초기 재시도 대기 시간 (초)
-            """
-            for attempt in range(max_retries):
-                try:
-                    response = model.generate_content(prompt_or_content)
-                    return response.text
-                except google_exceptions.ResourceExhausted as e:
-                    error_msg = str(e)
-                    # 재시도 가능 시간 추출
-                    retry_after = None
-                    if "Please retry in" in error_msg:
-                        try:
-                            # "Please retry in 33.487629633s" 형식에서 숫자 추출
-                            import re
-                            match = re.search(r'Please retry in ([\d.]+)s', error_msg)
-                            if match:
-                                retry_after = float(match.group(1))
-                        except:
-                            pass
-                    
-                    if attempt < max_retries - 1:
-                        wait_time = retry_after if retry_after else (initial_delay * (2 ** attempt))
-                        print(f"할당량 초과. {wait_time:.1f}초 후 재시도 ({attempt + 1}/{max_retries})...")
-                        time.sleep(wait_time)
-                    else:
-                        # 최대 재시도 횟수 초과
-                        raise Exception(
-                            f"Gemini API 할당량 초과: 무료 티어 할당량을 모두 사용했습니다.\n\n"
-                            f"해결 방법:\n"
-                            f"1. 잠시 후 다시 시도하세요 (보통 몇 분 후 재사용 가능)\n"
-                            f"2. Google AI Studio에서 할당량 확인: https://ai.dev/usage?tab=rate-limit\n"
-                            f"3. 유료 플랜으로 업그레이드 고려\n"
-                            f"4. 더 작은 모델 사용 (gemini-2.0-flash-lite 등)\n\n"
-                            f"원본 에러: {error_msg}"
-                        )
-                except Exception as e:
-                    # 다른 에러는 즉시 재발생
-                    raise
-            
-            # 이 코드는 실행되지 않아야 하지만 안전을 위해
-            raise Exception("최대 재시도 횟수 초과")
+        # 필수 필드 검증
+        missing_fields = [field for field in ANALYSIS_REQUIRED_FIELDS if field not in parsed_result]
         
-        # 파일 타입에 따라 처리
-        if file_type == 'text':
-            # 텍스트 파일: 내용 읽기
-            with open(file_path, 'r', encoding='utf-8') as f:
-                file_content = f.read()
-            
-            # 원본 내용 저장
-            original_content = file_content
-            
-            full_prompt = f"""{user_prompt}
+        if missing_fields:
+            print(f"경고: JSON 응답에 필수 필드가 누락되었습니다: {missing_fields}")
+            # 누락된 필드가 있어도 계속 진행 (부분적 결과라도 저장)
+        
+        # 파싱된 JSON을 다시 문자열로 변환하여 저장 (일관된 포맷)
+        print("JSON 파싱 성공")
+        return json.dumps(parsed_result, ensure_ascii=False, indent=2), parsed_result
+        
+    except json.JSONDecodeError as e:
+        print(f"경고: JSON 파싱 실패. 원본 응답을 그대로 저장합니다. 에러: {e}")
+        print(f"원본 응답 (처음 500자): {analysis_result[:500]}")
+        # JSON 파싱 실패 시 원본 응답을 그대로 저장
+        # (사용자가 확인할 수 있도록)
+        return analysis_result, None
 
-상담 내용:
-{file_content}"""
-            
-            analysis_result = call_gemini_with_retry(full_prompt)
-            
-        elif file_type in ['audio', 'video']:
-            # 오디오/비디오 파일: 로컬에서 STT로 전사 후 텍스트만 LLM에 전송
-            print(f"로컬 STT 시작: {file_path}")
-            
-            # 비디오 파일인 경우 오디오 추출
-            audio_path = file_path
-            temp_audio_file = None
-            temp_audio_path = None
-            
-            if file_type == 'video':
-                # ffmpeg를 사용하여 비디오에서 오디오 추출
-                print("비디오에서 오디오 추출 중...")
-                temp_audio_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-                temp_audio_path = temp_audio_file.name
-                temp_audio_file.close()
-                
-                try:
-                    # ffmpeg로 오디오 추출 (mp3 형식으로, Whisper가 잘 읽을 수 있도록)
-                    result = subprocess.run(
-                        ['ffmpeg', '-i', file_path, '-vn', '-acodec', 'libmp3lame', '-ab', '192k', '-ar', '44100', '-ac', '2', '-y', temp_audio_path],
-                        check=True,
-                        capture_output=True,
-                        text=True
-                    )
-                    if not os.path.exists(temp_audio_path) or os.path.getsize(temp_audio_path) == 0:
-                        raise Exception("오디오 파일 추출 실패: 파일이 생성되지 않았거나 비어있습니다.")
-                    audio_path = temp_audio_path
-                    print(f"오디오 추출 완료: {audio_path} ({os.path.getsize(audio_path)} bytes)")
-                except subprocess.CalledProcessError as e:
-                    error_msg = e.stderr.decode('utf-8', errors='ignore') if e.stderr else str(e)
-                    raise Exception(f"비디오에서 오디오 추출 실패: {error_msg}")
-                except FileNotFoundError:
-                    raise Exception("ffmpeg가 설치되지 않았습니다. 비디오 처리를 위해 ffmpeg를 설치해주세요.")
-            
-            # Whisper를 사용하여 로컬에서 STT 수행
-            try:
-                import whisper
-                print("Whisper 모델 로딩 중...")
-                # base 모델 사용 (더 빠르고 가벼움, 필요시 medium, large로 변경 가능)
-                whisper_model = whisper.load_model("base")
-                print(f"오디오 전사 중: {audio_path}")
-                
-                # 파일 존재 및 크기 확인
-                if not os.path.exists(audio_path):
-                    raise Exception(f"오디오 파일이 존재하지 않습니다: {audio_path}")
-                if os.path.getsize(audio_path) == 0:
-                    raise Exception(f"오디오 파일이 비어있습니다: {audio_path}")
-                
-                result = whisper_model.transcribe(audio_path, language="ko")
-                original_content = result["text"].strip()
-                
-                if not original_content:
-                    raise Exception("전사 결과가 비어있습니다. 오디오에 음성이 없거나 인식할 수 없습니다.")
-                
-                print(f"전사 완료: {len(original_content)}자")
-            except ImportError:
-                raise Exception("openai-whisper가 설치되지 않았습니다. 'pip install openai-whisper'를 실행해주세요.")
-            except Exception as e:
-                raise Exception(f"STT 전사 실패: {str(e)}")
-            finally:
-                # 임시 오디오 파일 정리
-                if temp_audio_path and os.path.exists(temp_audio_path):
-                    try:
-                        os.unlink(temp_audio_path)
-                        print(f"임시 파일 삭제: {temp_audio_path}")
-                    except Exception as e:
-                        print(f"임시 파일 삭제 실패: {e}")
-            
-            # 전사된 텍스트로 분석 수행
-            full_prompt = f"""{user_prompt}
 
-상담 내용 (전사본):
-{original_content}"""
-            
-            analysis_result = call_gemini_with_retry(full_prompt)
-            
-        else:
-            raise ValueError(f"지원하지 않는 파일 형식: {file_type}")
+def fail_consultation(consultation_id, error):
+    """상담을 실패 상태로 저장하고 사용자에게 보여줄 에러 메시지 기록"""
+    consultation = Consultation.objects.get(id=consultation_id)
+    consultation.status = 'failed'
+    
+    # 에러 메시지를 analysis_result에 저장 (사용자가 확인할 수 있도록)
+    error_message = str(error)
+    if "할당량 초과" in error_message or "quota" in error_message.lower() or "ResourceExhausted" in error_message:
+        consultation.analysis_result = (
+            "❌ **Gemini API 할당량 초과**\n\n"
+            "무료 티어 할당량을 모두 사용했습니다.\n\n"
+            "**해결 방법:**\n"
+            "1. 잠시 후 다시 시도하세요 (보통 몇 분 후 재사용 가능)\n"
+            "2. Google AI Studio에서 할당량 확인: https://ai.dev/usage?tab=rate-limit\n"
+            "3. 유료 플랜으로 업그레이드 고려\n"
+            "4. 더 작은 모델 사용 (gemini-2.0-flash-lite 등)\n\n"
+            f"상세 에러: {error_message}"
+        )
+    else:
+        consultation.analysis_result = f"❌ **분석 실패**\n\n에러: {error_message}"
+    
+    consultation.save(update_fields=['status', 'analysis_result', 'updated_at'])
+    publish_status(consultation)
+    print(f"Consultation {consultation_id} 분석 실패: {error_message}")
+    return f"Analysis failed for consultation {consultation_id}: {error_message}"
+
+
+def _abort_pipeline(consultation_id, error):
+    """
+    상담을 실패 처리하고 이후 단계(chain)를 중단
+
+    Celery 태스크는 실패로 표시하지 않음 (사용자가 UI에서 에러 메시지를 확인할 수 있도록)
+    """
+    fail_consultation(consultation_id, error)
+    raise Ignore()
+
+
+def _get_active_consultation(consultation_id):
+    """
+    파이프라인 단계에서 처리할 상담 조회
+
+    상담이 삭제되었거나 이전 단계에서 이미 실패 처리된 경우 이후 단계를 건너뜀
+    """
+    consultation = Consultation.objects.filter(id=consultation_id).first()
+    if consultation is None or consultation.status == 'failed':
+        raise Ignore()
+    return consultation
+
+
+def start_consultation_processing(consultation_id):
+    """새 상담의 분석 파이프라인과 원본 파일 보관을 동시에 시작"""
+    analyze_consultation.delay(consultation_id)
+    archive_consultation.delay(consultation_id)
+
+
+@shared_task
+def analyze_consultation(consultation_id):
+    """
+    상담 분석 파이프라인 시작
+
+    단계별 태스크를 전용 큐로 체이닝합니다.
+    - stt: 오디오/비디오 전사 (CPU 사용량이 큼)
+    - llm: Gemini 분석 및 완료 처리 (네트워크 대기가 대부분)
+
+    원본 파일 보관(Supabase 업로드)은 상담 생성 시 archive_consultation으로 따로 시작되며
+    이 파이프라인의 완료를 기다리게 하지 않습니다.
+    """
+    try:
+        consultation = Consultation.objects.get(id=consultation_id)
+    except Consultation.DoesNotExist:
+        return f"Consultation {consultation_id} not found"
+    
+    consultation.status = 'processing'
+    consultation.save(update_fields=['status', 'updated_at'])
+    publish_status(consultation)
+    
+    if batching.is_batchable(consultation):
+        # 짧은 텍스트 상담은 대기열에 모아 한 번의 요청으로 분석
+        queued = batching.enqueue(consultation_id)
+        if queued is not None:
+            if queued >= settings.ANALYSIS_BATCH_MAX_ITEMS:
+                flush_analysis_batch.delay()
+            else:
+                # 추가할 때마다 지연 flush를 예약하여, 앞서 예약한 flush가 유실되어도
+                # 상담이 대기열에 남지 않도록 함 (대기열이 비어 있으면 flush는 바로 종료)
+                flush_analysis_batch.apply_async(countdown=settings.ANALYSIS_BATCH_MAX_WAIT_MS / 1000)
+            return f"Consultation {consultation_id} queued for batch analysis"
+    
+    if consultation.file_type == 'text':
+        stages = [analyze_transcript.si(consultation_id)]
+    elif consultation.file_type in ['audio', 'video']:
+        stages = [transcribe_consultation.si(consultation_id), analyze_transcript.si(consultation_id)]
+    else:
+        return fail_consultation(consultation_id, ValueError(f"지원하지 않는 파일 형식: {consultation.file_type}"))
+    
+    chain(*stages).apply_async()
+    return f"Analysis pipeline started for consultation {consultation_id}"
+
+
+def _ensure_content_hash(consultation):
+    """업로드 시 지문이 계산되지 않은 상담(이전 데이터 등)은 파일을 읽어 계산 후 저장"""
+    if not consultation.content_hash:
+        with consultation.file.open('rb') as f:
+            consultation.content_hash = file_content_hash(f)
+        consultation.save(update_fields=['content_hash', 'updated_at'])
+    return consultation.content_hash
+
+
+def _find_cached_transcript(content_hash, engine_name, model_name, language):
+    """
+    선택한 모델 또는 그보다 큰 모델로 전사한 캐시 결과 조회 (같은 엔진)
+
+    Returns:
+        (전사 결과, 캐시된 결과의 모델 이름). 없으면 (None, None)
+    """
+    for candidate in cache_candidate_models(model_name):
+        result = get_cached_transcript(
+            make_transcript_cache_key(content_hash, engine_name, candidate, STT_VERSION, language)
+        )
+        if result is not None:
+            return result, candidate
+    return None, None
+
+
+@shared_task
+def transcribe_consultation(consultation_id):
+    """
+    오디오/비디오 파일을 로컬 STT로 전사하여 original_content에 저장 (stt 큐)
+
+    ffprobe로 길이를 먼저 확인하여 지연 시간 예산과 stt 큐 대기 수에 맞는 Whisper 모델을 고르고,
+    같은 파일(내용 지문)을 해당 모델 이상으로 전사한 결과가 캐시에 있으면
+    ffmpeg 디코딩과 Whisper 전사를 생략합니다.
+    사용한 모델, 길이, 전사 소요 시간과 실시간 배율(RTF)을 상담에 기록합니다.
+    """
+    consultation = _get_active_consultation(consultation_id)
+    
+    file_path = consultation.file.path
+    engine_name = settings.STT_ENGINE
+    language = "ko"
+    stt_seconds = None
+    print(f"로컬 STT 시작: {file_path}")
+    
+    # Whisper를 사용하여 로컬에서 STT 수행
+    try:
+        duration = probe_duration(file_path)
+        model_name = select_stt_model(duration)
         
-        # JSON 응답 파싱 및 검증
-        try:
-            # JSON 파싱 시도 (응답에 마크다운 코드 블록이 있을 수 있으므로 처리)
-            json_text = analysis_result.strip()
-            # 마크다운 코드 블록 제거 (```json ... ``` 형식)
-            if json_text.startswith('```'):
-                lines = json_text.split('\n')
-                json_text = '\n'.join(lines[1:-1]) if lines[-1].strip() == '```' else '\n'.join(lines[1:])
-            
-            parsed_result = json.loads(json_text)
-            
-            # 필수 필드 검증
-            required_fields = ['summary', 'customer_service_attitude', 'problem_solving', 
-                             'communication_skills', 'improvement_recommendations', 
-                             'overall_score', 'overall_feedback']
-            missing_fields = [field for field in required_fields if field not in parsed_result]
-            
-            if missing_fields:
-                print(f"경고: JSON 응답에 필수 필드가 누락되었습니다: {missing_fields}")
-                # 누락된 필드가 있어도 계속 진행 (부분적 결과라도 저장)
-            
-            # 파싱된 JSON을 다시 문자열로 변환하여 저장 (일관된 포맷)
-            analysis_result = json.dumps(parsed_result, ensure_ascii=False, indent=2)
-            print("JSON 파싱 성공")
+        content_hash = _ensure_content_hash(consultation)
+        result, cached_model = _find_cached_transcript(content_hash, engine_name, model_name, language)
+        cache_hit = result is not None
+        if cache_hit:
+            model_name = cached_model
+            print(f"전사본 캐시 히트: {content_hash[:12]} ({model_name})")
+        else:
+            # ffmpeg로 16kHz 모노 PCM을 메모리로 디코딩 (비디오는 오디오 트랙만 추출)
+            print("오디오 디코딩 중...")
+            started = time.monotonic()
+            audio = load_audio(file_path)
+            duration = audio.size / SAMPLE_RATE
+            print(f"오디오 디코딩 완료: {duration:.1f}초 분량")
             
-        except json.JSONDecodeError as e:
-            print(f"경고: JSON 파싱 실패. 원본 응답을 그대로 저장합니다. 에러: {e}")
-            print(f"원본 응답 (처음 500자): {analysis_result[:500]}")
-            # JSON 파싱 실패 시 원본 응답을 그대로 저장
-            # (사용자가 확인할 수 있도록)
+            # 워커 프로세스에 캐시된 모델 재사용
+            # 긴 오디오는 무음 경계로 분할하여 병렬 전사
+            print(f"오디오 전사 중: {file_path} ({engine_name}:{model_name})")
+            result = transcribe_audio(audio, language=language, model_name=model_name, engine_name=engine_name)
+            stt_seconds = time.monotonic() - started
+            print(f"STT 모델 캐시 통계: {get_model_registry_stats()}")
+        original_content = result["text"].strip()
         
-        # Supabase Storage에 파일 업로드 (선택사항)
-        supabase_url = None
-        if settings.SUPABASE_URL and settings.SUPABASE_KEY:
-            try:
-                file_name = f"consultation_{consultation_id}_{Path(file_path).name}"
-                print(f"Supabase 업로드 시도: {file_name}")
-                supabase_url = upload_to_supabase(file_path, file_name)
-                if supabase_url:
-                    print(f"Supabase 업로드 성공, URL: {supabase_url}")
-                else:
-                    print("Supabase 업로드 실패 (None 반환)")
-            except Exception as e:
-                print(f"Supabase 업로드 중 예외 발생: {e}")
-                import traceback
-                traceback.print_exc()
-                # 업로드 실패해도 분석은 계속 진행
-                supabase_url = None
+        if not original_content:
+            raise Exception("전사 결과가 비어있습니다. 오디오에 음성이 없거나 인식할 수 없습니다.")
         
-        # 결과 저장
-        consultation.original_content = original_content
-        consultation.analysis_result = analysis_result
-        consultation.supabase_file_url = supabase_url
-        consultation.status = 'completed'
-        consultation.completed_at = timezone.now()
-        consultation.save()
+        print(f"전사 완료: {len(original_content)}자")
+    except ImportError:
+        _abort_pipeline(consultation_id, Exception(
+            f"STT 엔진({engine_name}) 패키지가 설치되지 않았습니다. "
+            "'pip install openai-whisper' 또는 'pip install faster-whisper'를 실행해주세요."
+        ))
+    except Exception as e:
+        _abort_pipeline(consultation_id, Exception(f"STT 전사 실패: {str(e)}"))
+    
+    if not cache_hit:
+        store_cached_transcript(
+            make_transcript_cache_key(content_hash, engine_name, model_name, STT_VERSION, language),
+            content_hash, engine_name, model_name, STT_VERSION, result,
+        )
+    
+    # 전사본은 바로 저장하여 이후 단계에서 재사용
+    # 캐시 히트는 실제 전사 시간이 아니므로 소요 시간/RTF를 기록하지 않음
+    consultation.original_content = original_content
+    consultation.stt_engine = engine_name
+    consultation.stt_model = model_name
+    consultation.media_duration = duration
+    consultation.stt_seconds = stt_seconds
+    consultation.stt_rtf = stt_seconds / duration if stt_seconds is not None and duration else None
+    consultation.save(update_fields=[
+        'original_content', 'stt_engine', 'stt_model', 'media_duration', 'stt_seconds', 'stt_rtf', 'updated_at',
+    ])
+    if stt_seconds is not None:
+        print(f"STT 소요 시간: {stt_seconds:.1f}초 (RTF {consultation.stt_rtf:.2f}, {engine_name}:{model_name})")
+    return f"Transcription completed for consultation {consultation_id}"
+
+
+def _quota_retry_countdown(exc, quota_retries):
+    """할당량 초과 후 다시 예약할 때까지의 대기 시간(초) 계산"""
+    if exc.retry_after:
+        delay = exc.retry_after
+    else:
+        delay = settings.GEMINI_RETRY_BASE_DELAY * (2 ** (quota_retries - 1))
+    return _jittered_countdown(min(delay, settings.GEMINI_RETRY_MAX_DELAY))
+
+
+def _jittered_countdown(delay):
+    """여러 상담이 같은 시각에 몰려 다시 실패하지 않도록 대기 시간에 최대 10% 지터 추가"""
+    return max(1.0, delay + random.uniform(0, delay * 0.1))
+
+
+def _set_status(consultation, status):
+    """상태가 바뀐 경우에만 저장하고 이벤트 발행"""
+    if consultation.status != status:
+        consultation.status = status
+        consultation.save(update_fields=['status', 'updated_at'])
+        publish_status(consultation)
+
+
+def _retry_on_quota(task, exc, consultations, quota_retries, rate_limit_waited, args=None):
+    """
+    할당량이 부족할 때 워커에서 대기하지 않고 LLM 단계를 countdown으로 다시 예약
+
+    API 할당량 초과 재시도 횟수(GEMINI_MAX_RETRIES)를 모두 쓰면 상담들을 실패 처리하고 이후 단계를 중단합니다.
+    공용 토큰 버킷 대기는 GEMINI_RATE_LIMIT_TIMEOUT을 지정하지 않으면 실패 없이 계속 다시 예약합니다.
+
+    Args:
+        args: 재시도할 태스크 인자. None이면 현재 태스크 인자를 그대로 사용
+    """
+    if exc.quota_exceeded:
+        quota_retries += 1
+        if quota_retries > settings.GEMINI_MAX_RETRIES:
+            error = quota_exhausted_error(str(exc))
+        else:
+            error = None
+            countdown = _quota_retry_countdown(exc, quota_retries)
+            print(f"할당량 초과. {countdown:.1f}초 후 재시도 ({quota_retries}/{settings.GEMINI_MAX_RETRIES})...")
+    else:
+        # 공용 토큰 버킷이 가득 찬 것은 API 에러가 아니므로 대기열처럼 계속 다시 예약
+        # (GEMINI_RATE_LIMIT_TIMEOUT을 지정한 경우에만 누적 대기 시간으로 실패 처리)
+        countdown = _jittered_countdown(exc.retry_after or 1.0)
+        rate_limit_waited += countdown
+        timeout = settings.GEMINI_RATE_LIMIT_TIMEOUT
+        if timeout > 0 and rate_limit_waited > timeout:
+            error = quota_exhausted_error(f"Gemini 호출 할당량을 {timeout:.0f}초 안에 확보하지 못했습니다")
+        else:
+            error = None
+            print(f"Gemini 호출 속도 제한으로 {countdown:.1f}초 후 다시 예약 (누적 대기 {rate_limit_waited:.0f}초)")
+    
+    if error is not None:
+        for consultation in consultations:
+            fail_consultation(consultation.id, error)
+        raise Ignore()
+    
+    # 할당량 대기 상태를 알리고 워커 슬롯을 비운 채 다시 예약
+    for consultation in consultations:
+        _set_status(consultation, 'waiting_quota')
+    raise task.retry(
+        args=args,
+        countdown=countdown,
+        kwargs={'quota_retries': quota_retries, 'rate_limit_waited': rate_limit_waited},
+    )
+
+
+def _analysis_cache_key(content, model_name):
+    return make_analysis_cache_key(content, model_name, ANALYSIS_PROMPT_VERSION, GENERATION_CONFIG)
+
+
+def _save_analysis(consultation, raw_result, cache_key, cache_hit, model_name):
+    """
+    LLM 응답(또는 캐시된 결과)을 파싱하여 상담에 저장하고 완료 처리
+
+    원본 파일 보관 여부와 관계없이 분석 결과가 준비되는 즉시 completed로 전환합니다.
+    """
+    analysis_result, parsed_result = parse_analysis_response(raw_result)
+    
+    # 정상 파싱된 결과만 캐시에 저장
+    if parsed_result is not None and not cache_hit:
+        store_cached_analysis(cache_key, model_name, ANALYSIS_PROMPT_VERSION, analysis_result)
+    
+    consultation.analysis_result = analysis_result
+    consultation.analysis_cache_hit = cache_hit
+    analysis_fields = extract_analysis_fields(parsed_result, analysis_result)
+    for field_name, value in analysis_fields.items():
+        setattr(consultation, field_name, value)
+    consultation.status = 'completed'
+    consultation.completed_at = timezone.now()
+    consultation.save(update_fields=[
+        'original_content', 'analysis_result', 'analysis_cache_hit', 'status', 'completed_at', 'updated_at',
+        *analysis_fields,
+    ])
+    publish_status(consultation)
+
+
+def _read_text_content(consultation):
+    """텍스트 파일 상담의 내용을 읽어 original_content에 채움"""
+    with open(consultation.file.path, 'r', encoding='utf-8') as f:
+        consultation.original_content = f.read()
+
+
+def _map_cache_key(window, model_name):
+    return make_analysis_cache_key(window, model_name, ANALYSIS_MAP_PROMPT_VERSION, GENERATION_CONFIG)
+
+
+def _analyze_windows(model, model_name, windows):
+    """
+    구간별 분석(map)을 ANALYSIS_MAP_CONCURRENCY개까지 동시에 호출
+
+    구간 결과는 분석 캐시에 저장하므로, 일부 구간이 할당량 부족(QuotaWait)으로 실패해
+    태스크가 다시 예약되어도 이미 분석한 구간은 다시 호출하지 않습니다.
+    캐시 조회/저장은 DB 연결을 스레드에 넘기지 않도록 호출 스레드에서만 수행합니다.
+
+    Returns:
+        구간 순서대로 정렬된 구간별 분석 결과 문자열 리스트
+    """
+    cache_keys = [_map_cache_key(window, model_name) for window in windows]
+    partials = [get_cached_analysis(cache_key) for cache_key in cache_keys]
+    pending = [index for index, partial in enumerate(partials) if partial is None]
+    if len(pending) < len(windows):
+        print(f"구간 분석 캐시 히트: {len(windows) - len(pending)}/{len(windows)}개 구간")
+    
+    quota_wait = None
+    workers = max(1, min(settings.ANALYSIS_MAP_CONCURRENCY, len(pending)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(call_gemini, model, build_map_prompt(windows[index])): index
+            for index in pending
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                partials[index] = future.result()
+            except QuotaWait as e:
+                # 나머지 구간은 계속 받아 캐시에 저장한 뒤 태스크를 다시 예약
+                if quota_wait is None or (e.retry_after or 0) > (quota_wait.retry_after or 0):
+                    quota_wait = e
+                continue
+            # 정상 파싱된 구간 결과만 캐시에 저장
+            if _parse_json_object(partials[index]) is not None:
+                store_cached_analysis(cache_keys[index], model_name, ANALYSIS_MAP_PROMPT_VERSION, partials[index])
+    
+    if quota_wait is not None:
+        raise quota_wait
+    return partials
+
+
+def _analyze_long_transcript(model, model_name, file_type, content):
+    """
+    한 번의 프롬프트로 보내기에 긴 상담 내용을 map-reduce 방식으로 분석
+
+    ANALYSIS_WINDOW_TOKENS 이하의 구간으로 나누어 동시에 분석(map)한 뒤,
+    구간별 결과를 한 번 더 호출하여 기존 분석 JSON 형식으로 종합(reduce)합니다.
+    요청 하나의 크기와 지연 시간이 상담 길이와 관계없이 구간 크기로 제한됩니다.
+
+    Returns:
+        종합된 분석 결과 (LLM 응답 문자열)
+    """
+    windows = split_transcript_windows(content, settings.ANALYSIS_WINDOW_TOKENS)
+    if len(windows) < 2:
+        return call_gemini(model, build_analysis_prompt(file_type, content))
+    
+    print(f"긴 상담 내용: {len(content)}자를 {len(windows)}개 구간으로 나누어 분석합니다")
+    partials = _analyze_windows(model, model_name, windows)
+    return call_gemini(model, build_reduce_prompt(file_type, partials))
+
+
+@shared_task(bind=True, max_retries=None)
+def analyze_transcript(self, consultation_id, quota_retries=0, rate_limit_waited=0):
+    """
+    상담 내용(텍스트 또는 전사본)을 Gemini로 분석하여 저장 (llm 큐)
+
+    할당량이 부족하면 워커에서 대기하지 않고 이 단계만 countdown으로 다시 예약합니다.
+    전사본은 이미 저장되어 있으므로 재시도 시 STT를 다시 수행하지 않습니다.
+    프롬프트가 ANALYSIS_LONG_TRANSCRIPT_TOKENS를 넘는 긴 상담은 구간별로 나누어 분석한 뒤 종합합니다.
+
+    Args:
+        quota_retries: 지금까지 할당량 초과 에러로 재시도한 횟수 (GEMINI_MAX_RETRIES까지)
+        rate_limit_waited: 공용 토큰 버킷 때문에 지금까지 기다린 시간(초, GEMINI_RATE_LIMIT_TIMEOUT을 지정한 경우 그 값까지)
+    """
+    consultation = _get_active_consultation(consultation_id)
+    if consultation.status == 'waiting_quota':
+        _set_status(consultation, 'processing')
+    
+    try:
+        if consultation.file_type == 'text':
+            _read_text_content(consultation)
         
-        return f"Analysis completed for consultation {consultation_id}"
+        original_content = consultation.original_content
+        if not original_content:
+            raise Exception("분석할 상담 내용이 없습니다.")
         
-    except Consultation.DoesNotExist:
-        return f"Consultation {consultation_id} not found"
-    except Exception as e:
-        consultation = Consultation.objects.get(id=consultation_id)
-        consultation.status = 'failed'
+        model, model_name = get_gemini_model()
         
-        # 에러 메시지를 analysis_result에 저장 (사용자가 확인할 수 있도록)
-        error_message = str(e)
-        if "할당량 초과" in error_message or "quota" in error_message.lower() or "ResourceExhausted" in error_message:
-            consultation.analysis_result = (
-                "❌ **Gemini API 할당량 초과**\n\n"
-                "무료 티어 할당량을 모두 사용했습니다.\n\n"
-                "**해결 방법:**\n"
-                "1. 잠시 후 다시 시도하세요 (보통 몇 분 후 재사용 가능)\n"
-                "2. Google AI Studio에서 할당량 확인: https://ai.dev/usage?tab=rate-limit\n"
-                "3. 유료 플랜으로 업그레이드 고려\n"
-                "4. 더 작은 모델 사용 (gemini-2.0-flash-lite 등)\n\n"
-                f"상세 에러: {error_message}"
-            )
+        # 동일한 내용/모델/프롬프트로 분석한 결과가 캐시에 있으면 LLM 호출 생략
+        cache_key = _analysis_cache_key(original_content, model_name)
+        analysis_result = get_cached_analysis(cache_key)
+        cache_hit = analysis_result is not None
+        if cache_hit:
+            print(f"분석 결과 캐시 히트: {cache_key[:12]}")
         else:
-            consultation.analysis_result = f"❌ **분석 실패**\n\n에러: {error_message}"
+            full_prompt = build_analysis_prompt(consultation.file_type, original_content)
+            if estimate_tokens(full_prompt) > settings.ANALYSIS_LONG_TRANSCRIPT_TOKENS:
+                analysis_result = _analyze_long_transcript(
+                    model, model_name, consultation.file_type, original_content,
+                )
+            else:
+                analysis_result = call_gemini(model, full_prompt)
         
-        consultation.save()
-        print(f"Consultation {consultation_id} 분석 실패: {error_message}")
-        # Celery 태스크는 실패로 표시하되 예외를 다시 발생시키지 않음
-        # (사용자가 UI에서 에러 메시지를 확인할 수 있도록)
-        return f"Analysis failed for consultation {consultation_id}: {error_message}"
+        _save_analysis(consultation, analysis_result, cache_key, cache_hit, model_name)
+    except QuotaWait as e:
+        _retry_on_quota(self, e, [consultation], quota_retries, rate_limit_waited)
+    except Exception as e:
+        _abort_pipeline(consultation_id, e)
+    
+    return f"Analysis completed for consultation {consultation_id}"
+
+
+def _analyze_individually(consultation_ids):
+    """일괄 분석할 수 없는 상담들을 단건 분석 파이프라인으로 처리"""
+    for consultation_id in consultation_ids:
+        analyze_transcript.delay(consultation_id)
+
+
+@shared_task
+def flush_analysis_batch():
+    """일괄 분석 대기열에서 최대 ANALYSIS_BATCH_MAX_ITEMS건을 꺼내 분석 태스크로 전달 (llm 큐)"""
+    try:
+        consultation_ids = batching.pop_batch()
+        remaining = batching.pending_count()
+    except redis.RedisError as e:
+        print(f"일괄 분석 대기열 조회 실패: {e}")
+        return "Batch flush failed"
+    
+    if consultation_ids:
+        analyze_batch.delay(consultation_ids)
+    # 대기열이 비지 않았으면 남은 상담도 이어서 처리
+    if remaining:
+        flush_analysis_batch.delay()
+    return f"Flushed {len(consultation_ids)} consultations for batch analysis"
+
+
+@shared_task(bind=True, max_retries=None)
+def analyze_batch(self, consultation_ids, quota_retries=0, rate_limit_waited=0):
+    """
+    짧은 텍스트 상담 여러 건을 한 번의 Gemini 요청으로 분석 (llm 큐)
+
+    분석 지침은 한 번만 보내고 상담 ID를 키로 하는 JSON 배열 응답을 상담별로 나눠 저장합니다.
+    응답에서 결과를 찾을 수 없는 상담은 단건 분석으로 다시 처리합니다.
+    """
+    consultations = []
+    for consultation in Consultation.objects.filter(id__in=consultation_ids).exclude(status='failed'):
+        if consultation.status == 'waiting_quota':
+            _set_status(consultation, 'processing')
+        consultations.append(consultation)
+    if not consultations:
+        return "No consultations to analyze"
+    
+    model, model_name = get_gemini_model()
+    
+    pending = []
+    for consultation in consultations:
+        try:
+            _read_text_content(consultation)
+            if not consultation.original_content:
+                raise Exception("분석할 상담 내용이 없습니다.")
+            cache_key = _analysis_cache_key(consultation.original_content, model_name)
+            cached = get_cached_analysis(cache_key)
+            if cached is not None:
+                print(f"분석 결과 캐시 히트: {cache_key[:12]}")
+                _save_analysis(consultation, cached, cache_key, True, model_name)
+            else:
+                pending.append((consultation, cache_key))
+        except Exception as e:
+            fail_consultation(consultation.id, e)
+    
+    if len(pending) < 2:
+        _analyze_individually([consultation.id for consultation, _ in pending])
+        return f"Batch analysis skipped for {len(pending)} consultations"
+    
+    prompt = build_batch_analysis_prompt(
+        [(consultation.id, consultation.original_content) for consultation, _ in pending]
+    )
+    try:
+        response_text = call_gemini(model, prompt, responses=len(pending))
+    except QuotaWait as e:
+        # 캐시 히트나 실패로 이미 처리된 상담은 빼고 다시 예약
+        _retry_on_quota(
+            self, e, [consultation for consultation, _ in pending], quota_retries, rate_limit_waited,
+            args=([consultation.id for consultation, _ in pending],),
+        )
+    except Exception as e:
+        print(f"일괄 분석 실패, 단건 분석으로 처리합니다: {e}")
+        _analyze_individually([consultation.id for consultation, _ in pending])
+        return f"Batch analysis failed for {len(pending)} consultations"
+    
+    results = split_batch_analysis_response(response_text, [consultation.id for consultation, _ in pending])
+    fallback = []
+    for consultation, cache_key in pending:
+        if consultation.id not in results:
+            fallback.append(consultation.id)
+            continue
+        _save_analysis(consultation, results[consultation.id], cache_key, False, model_name)
+    
+    if fallback:
+        print(f"일괄 분석 응답에서 결과를 찾지 못한 상담 {fallback}은 단건 분석으로 처리합니다")
+        _analyze_individually(fallback)
+    return f"Batch analysis stored for {len(results)}/{len(pending)} consultations"
+
+
+def _set_archive_status(consultation, archive_status, **fields):
+    """보관 상태만 저장 (분석 단계가 같은 상담을 동시에 저장하므로 다른 필드는 덮어쓰지 않음)"""
+    consultation.archive_status = archive_status
+    for name, value in fields.items():
+        setattr(consultation, name, value)
+    consultation.save(update_fields=['archive_status', *fields, 'updated_at'])
 
 
+@shared_task(bind=True, max_retries=None)
+def archive_consultation(self, consultation_id):
+    """
+    원본 파일을 Supabase Storage에 업로드 (storage 큐)
 
+    상담 생성 직후 분석 파이프라인과 별도로 시작되어 STT/LLM 단계와 동시에 진행되며,
+    상담의 분석 상태(status)는 변경하지 않습니다.
+    업로드에 실패하면 ARCHIVE_MAX_RETRIES까지 지수 백오프로 다시 시도합니다.
+    """
+    consultation = Consultation.objects.filter(id=consultation_id).first()
+    if consultation is None:
+        raise Ignore()
+    if consultation.archive_status == 'archived':
+        return f"Consultation {consultation_id} already archived"
+    
+    if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
+        _set_archive_status(consultation, 'skipped')
+        return f"Archive skipped for consultation {consultation_id} (Supabase not configured)"
+    
+    attempts = consultation.archive_attempts + 1
+    _set_archive_status(consultation, 'uploading', archive_attempts=attempts)
+    
+    file_path = consultation.file.path
+    file_name = f"consultation_{consultation_id}_{Path(file_path).name}"
+    print(f"Supabase 업로드 시도 ({attempts}회차): {file_name}")
+    supabase_url = upload_to_supabase(file_path, file_name)
+    
+    if supabase_url:
+        _set_archive_status(
+            consultation,
+            'archived',
+            supabase_file_url=supabase_url,
+            archive_error=None,
+            archived_at=timezone.now(),
+        )
+        return f"Archive completed for consultation {consultation_id}"
+    
+    error_message = "Supabase 업로드 실패"
+    if attempts > settings.ARCHIVE_MAX_RETRIES:
+        _set_archive_status(consultation, 'failed', archive_error=error_message)
+        print(f"Consultation {consultation_id} 원본 파일 보관 실패 ({attempts}회 시도)")
+        return f"Archive failed for consultation {consultation_id}"
+    
+    _set_archive_status(consultation, 'pending', archive_error=error_message)
+    countdown = min(
+        settings.ARCHIVE_RETRY_BASE_DELAY * (2 ** (attempts - 1)),
+        settings.ARCHIVE_RETRY_MAX_DELAY,
+    )
+    print(f"Consultation {consultation_id} 원본 파일 보관 {countdown}초 후 재시도")
+    raise self.retry(countdown=countdown)
@@ -1,3 +1,664 @@
-from django.test import TestCase
+import io
+import json
+import unittest
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from celery.exceptions import Ignore, Retry
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework.test import APIClient, APITestCase
+
+from .analysis import extract_analysis_fields
+from .fingerprint import BLOCK_SIZE, file_content_hash
+from .models import Consultation, DailyConsultationRollup, UploadSession
+from .pagination import ConsultationCursorPagination
+from .rollups import local_date
+from .search import search_consultations
+from .stt import _get_executor, _reset_executor, merge_chunk_results, split_on_silence
+from .stt_engines import STTEngine
+from .stt_policy import cache_candidate_models, select_stt_model
+from .tasks import (
+    QuotaWait,
+    _retry_on_quota,
+    _analyze_long_transcript,
+    analyze_consultation,
+    split_batch_analysis_response,
+    split_transcript_windows,
+)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN 결과 확인은 PostgreSQL에서만 수행')
+class ConsultationIndexTests(TestCase):
+    """주요 조회 쿼리가 의도한 인덱스를 사용하는지 실행 계획으로 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='index-test', password='password')
+        now = timezone.now()
+        Consultation.objects.bulk_create([
+            Consultation(
+                user=cls.user,
+                title=f'상담 {i}',
+                file='consultations/test.txt',
+                file_type='text',
+                status='completed' if i % 2 else 'failed',
+                completed_at=now if i % 2 else None,
+            )
+            for i in range(20)
+        ])
+        cls.since = now - timedelta(days=7)
+
+    def setUp(self):
+        # 테스트 데이터가 적으면 순차 스캔이 더 싸므로 인덱스 선택 여부만 확인하도록 비활성화
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_user_list_uses_user_created_index(self):
+        queryset = Consultation.objects.filter(user=self.user).order_by('-created_at', '-id')[:11]
+        self.assertUsesIndex(queryset, 'consultation_user_idx')
+
+    def test_status_range_uses_status_created_index(self):
+        queryset = Consultation.objects.filter(status='failed', created_at__gte=self.since)
+        self.assertUsesIndex(queryset, 'consultation_status_idx')
+
+    def test_created_range_uses_created_index(self):
+        queryset = Consultation.objects.filter(
+            created_at__gte=self.since, created_at__lt=timezone.now()
+        ).values('file_type', 'status')
+        self.assertUsesIndex(queryset, 'consultation_created_idx')
+
+    def test_processing_time_uses_partial_index(self):
+        queryset = Consultation.objects.filter(
+            status='completed', completed_at__isnull=False, created_at__gte=self.since
+        ).values('file_type', 'created_at', 'completed_at')
+        self.assertUsesIndex(queryset, 'consultation_processed_idx')
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', '전문 검색은 PostgreSQL에서만 지원')
+class ConsultationSearchTests(TestCase):
+    """q 검색이 제목/전사본을 찾고 관련도 순으로 정렬되는지 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='search-test', password='password')
+        cls.refund = Consultation.objects.create(
+            user=cls.user, title='환불 문의', file='consultations/a.txt', file_type='text',
+            original_content='고객이 배송 지연으로 환불을 요청했습니다.',
+        )
+        cls.delivery = Consultation.objects.create(
+            user=cls.user, title='배송 조회', file='consultations/b.txt', file_type='text',
+            original_content='고객이 배송 상태를 문의했습니다.',
+        )
+
+    def test_prefix_match_in_transcript(self):
+        results = list(search_consultations(Consultation.objects.all(), '환불'))
+        self.assertEqual(results[0], self.refund)
+        self.assertIn('<mark>', results[0].search_headline)
+
+    def test_search_vector_updated_on_save(self):
+        self.delivery.original_content = '고객이 교환을 요청했습니다.'
+        self.delivery.save(update_fields=['original_content'])
+        results = search_consultations(Consultation.objects.all(), '교환')
+        self.assertEqual(list(results), [self.delivery])
+
+
+class AnalysisFieldExtractionTests(unittest.TestCase):
+    """LLM 분석 JSON에서 KPI용 구조화 필드 추출: 누락/잘못된 키와 타입은 None 또는 0으로 처리"""
+
+    def test_well_formed_result(self):
+        parsed = {
+            'overall_score': 8,
+            'customer_service_attitude': {'score': '7.5'},
+            'problem_solving': {'score': 6},
+            'communication_skills': {'score': 9.0},
+            'improvement_recommendations': [
+                {'priority': 'high'}, {'priority': ' HIGH '}, {'priority': 'low'},
+            ],
+        }
+        fields = extract_analysis_fields(parsed, '{"x": 1}')
+        self.assertEqual(fields, {
+            'analysis_parsed': True,
+            'analysis_length': 8,
+            'overall_score': 8.0,
+            'attitude_score': 7.5,
+            'problem_solving_score': 6.0,
+            'communication_score': 9.0,
+            'recommendation_high_count': 2,
+            'recommendation_medium_count': 0,
+            'recommendation_low_count': 1,
+        })
+
+    def test_unparsed_result_keeps_only_length(self):
+        for parsed in (None, ['not', 'a', 'dict'], 'text'):
+            with self.subTest(parsed=parsed):
+                fields = extract_analysis_fields(parsed, '분석 실패 원문')
+                self.assertFalse(fields['analysis_parsed'])
+                self.assertEqual(fields['analysis_length'], 8)
+                self.assertTrue(all(value is None for name, value in fields.items()
+                                    if name not in ('analysis_parsed', 'analysis_length')))
+
+    def test_missing_keys_are_none(self):
+        fields = extract_analysis_fields({'summary': '요약'}, '')
+        self.assertTrue(fields['analysis_parsed'])
+        self.assertIsNone(fields['analysis_length'])
+        for name in ('overall_score', 'attitude_score', 'problem_solving_score', 'communication_score',
+                     'recommendation_high_count', 'recommendation_medium_count', 'recommendation_low_count'):
+            self.assertIsNone(fields[name], name)
+
+    def test_wrong_types_are_ignored(self):
+        parsed = {
+            'overall_score': '8점',
+            'customer_service_attitude': 7,
+            'problem_solving': {'score': True},
+            'communication_skills': {'score': None},
+            'improvement_recommendations': [{'priority': 'urgent'}, 'high', {'priority': None}, {}],
+        }
+        fields = extract_analysis_fields(parsed, '{}')
+        self.assertIsNone(fields['overall_score'])
+        self.assertIsNone(fields['attitude_score'])
+        self.assertIsNone(fields['problem_solving_score'])
+        self.assertIsNone(fields['communication_score'])
+        # 목록은 있지만 인식할 수 있는 우선순위가 없으면 0건
+        self.assertEqual(
+            [fields[f'recommendation_{p}_count'] for p in ('high', 'medium', 'low')], [0, 0, 0],
+        )
+
+    def test_recommendations_not_a_list(self):
+        fields = extract_analysis_fields({'improvement_recommendations': {'priority': 'high'}}, '{}')
+        self.assertIsNone(fields['recommendation_high_count'])
+
+
+class ConsultationListTests(TestCase):
+    """상담 목록: 요약 필드만 조회하고 커서 페이지네이션으로 순회"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='list-test', password='password')
+        Consultation.objects.bulk_create([
+            Consultation(user=cls.user, title=f'상담 {i}', file='consultations/a.txt', file_type='text')
+            for i in range(5)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_does_not_select_large_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/consultations/')
+        self.assertEqual(response.status_code, 200)
+        list_sql = next(query['sql'] for query in queries if 'coaching_consultation' in query['sql'])
+        for column in ('search_vector', 'original_content', 'analysis_result'):
+            self.assertNotIn(f'"{column}"', list_sql)
+
+    def page_through(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_cursor_is_stable_for_equal_created_at(self):
+        # 모든 상담의 생성 시각이 같아도 id 순서로 중복/누락 없이 순회
+        Consultation.objects.filter(user=self.user).update(created_at=timezone.now())
+        expected = list(
+            Consultation.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(self.page_through('/api/consultations/?page_size=2'), expected)
+
+    def test_rows_inserted_between_pages_are_not_duplicated(self):
+        Consultation.objects.filter(user=self.user).update(created_at=timezone.now() - timedelta(minutes=1))
+        first = self.client.get('/api/consultations/?page_size=2').data
+        # 첫 페이지를 받은 뒤 새 상담이 추가되어도 다음 페이지는 경계 행 뒤에서 이어짐
+        Consultation.objects.create(user=self.user, title='새 상담', file='consultations/b.txt', file_type='text')
+        ids = [item['id'] for item in first['results']] + self.page_through(first['next'])
+        expected = list(
+            Consultation.objects.filter(user=self.user).exclude(title='새 상담')
+            .order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_preceding_page(self):
+        first = self.client.get('/api/consultations/?page_size=2').data
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previous'])
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/consultations/?cursor=garbage').status_code, 404)
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(ConsultationCursorPagination, 'max_page_size', 3):
+            response = self.client.get('/api/consultations/?page_size=1000')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_count_only_on_first_page(self):
+        response = self.client.get('/api/consultations/?page_size=2&count=true')
+        self.assertEqual((response.data['count'], response.data['count_is_estimate']), (5, False))
+        self.assertNotIn('count=', response.data['next'])
+        self.assertNotIn('count', self.client.get(response.data['next']).data)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', '실행 계획 기반 추정치는 PostgreSQL에서만 사용')
+    @override_settings(CONSULTATION_EXACT_COUNT_THRESHOLD=0)
+    def test_count_uses_plan_estimate_above_threshold(self):
+        response = self.client.get('/api/consultations/?count=true')
+        self.assertTrue(response.data['count_is_estimate'])
+        self.assertIsInstance(response.data['count'], int)
+
+
+class RollupRefreshTests(TestCase):
+    """KPI 집계는 집계 값에 영향을 주는 필드가 저장될 때만 다시 계산"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rollup-test', password='password')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.consultation = Consultation.objects.create(
+                user=self.user, title='집계', file='consultations/a.txt', file_type='text',
+            )
+
+    def test_status_change_refreshes_day(self):
+        self.consultation.status = 'completed'
+        self.consultation.completed_at = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.consultation.save(update_fields=['status', 'completed_at', 'updated_at'])
+        rollup = DailyConsultationRollup.objects.get(date=local_date(self.consultation.created_at))
+        self.assertEqual((rollup.status, rollup.processed_count), ('completed', 1))
+
+    def test_unrelated_field_save_skips_refresh(self):
+        self.consultation.archive_status = 'archived'
+        with mock.patch('coaching.signals.schedule_rollup_refresh') as schedule:
+            self.consultation.save(update_fields=['archive_status', 'updated_at'])
+        schedule.assert_not_called()
+
+
+@override_settings(MEDIA_ROOT='/tmp/coaching-test-media')
+class UploadSessionTests(TestCase):
+    """분할 업로드: 오프셋 검증, 이어서 전송, 지문 계산, 완료 시 상담 생성"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='upload-test', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = bytes(range(256)) * (BLOCK_SIZE // 256) + b'tail'
+        response = self.client.post('/api/uploads/', {
+            'title': '긴 녹음', 'file_name': 'call.wav', 'file_type': 'audio', 'total_size': len(self.data),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.session_id = response.data['id']
+
+    def tearDown(self):
+        for session in UploadSession.objects.all():
+            session.file.delete(save=False)
+
+    def put_chunk(self, offset, body):
+        return self.client.generic(
+            'PUT', f'/api/uploads/{self.session_id}/', body,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_chunks_resume_from_server_offset_and_finalize(self):
+        self.assertEqual(self.put_chunk(0, self.data[:BLOCK_SIZE]).data['offset'], BLOCK_SIZE)
+
+        # 이미 받은 청크를 다시 보내면 현재 오프셋과 함께 거절
+        response = self.put_chunk(0, self.data[:BLOCK_SIZE])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], BLOCK_SIZE)
+
+        self.assertEqual(self.put_chunk(BLOCK_SIZE, self.data[BLOCK_SIZE:]).status_code, 200)
+        with mock.patch('coaching.views.start_consultation_processing') as start:
+            response = self.client.post(f'/api/uploads/{self.session_id}/finalize/')
+        self.assertEqual(response.status_code, 201)
+        start.assert_called_once_with(response.data['id'])
+
+        session = UploadSession.objects.get(id=self.session_id)
+        with session.consultation.file.open('rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(session.content_hash, file_content_hash(io.BytesIO(self.data)))
+
+    def test_wrong_offset_is_rejected_before_reading_body(self):
+        response = self.put_chunk(BLOCK_SIZE, self.data[BLOCK_SIZE:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 0)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_truncated_chunk_is_client_error(self):
+        # Content-Length만큼 받기 전에 본문이 끝나면 400, 오프셋과 파일은 그대로
+        with mock.patch('django.core.handlers.wsgi.LimitedStream.read', side_effect=[self.data[:100], b'']):
+            response = self.put_chunk(0, self.data[:BLOCK_SIZE])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['offset'], 0)
+        session = UploadSession.objects.get(id=self.session_id)
+        self.assertEqual((session.offset, session.file.size), (0, 0))
+
+    def test_disconnect_while_reading_is_client_error(self):
+        from django.http import UnreadablePostError
+        with mock.patch('django.core.handlers.wsgi.LimitedStream.read', side_effect=UnreadablePostError('reset')):
+            response = self.put_chunk(0, self.data[:BLOCK_SIZE])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get(id=self.session_id).offset, 0)
+
+    def test_finalize_requires_all_chunks(self):
+        self.put_chunk(0, self.data[:BLOCK_SIZE])
+        response = self.client.post(f'/api/uploads/{self.session_id}/finalize/')
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Consultation.objects.exists())
+
+
+class ChunkedTranscriptionTests(TestCase):
+    """분할 전사: 무음 경계 분할, 청크 최대 길이, 세그먼트 시각 보정, 프로세스 풀 크기"""
+
+    sample_rate = 1000
+
+    def make_audio(self, seconds, silences):
+        """seconds 길이의 발화(큰 진폭) 오디오에서 silences 시각(초)마다 1초 무음 삽입"""
+        import numpy as np
+        audio = np.full(seconds * self.sample_rate, 0.5, dtype=np.float32)
+        audio[::2] = -0.5
+        for at in silences:
+            audio[int(at * self.sample_rate):int((at + 1) * self.sample_rate)] = 0
+        return audio
+
+    def test_cuts_fall_inside_silence(self):
+        audio = self.make_audio(60, silences=[18, 41])
+        chunks = split_on_silence(audio, self.sample_rate, chunk_seconds=20, search_seconds=5, frame_ms=100)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0][0], 0)
+        self.assertEqual(chunks[-1][1], audio.size)
+        for (_, end), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(float(abs(audio[start:start + 100]).max()), 0.0)
+
+    def test_chunks_respect_max_length(self):
+        # 무음이 없으면 목표 길이 + 탐색 범위를 넘지 않는 위치에서 자름
+        audio = self.make_audio(300, silences=[])
+        chunks = split_on_silence(audio, self.sample_rate, chunk_seconds=20, search_seconds=5, frame_ms=100)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(end - start <= 25 * self.sample_rate for start, end in chunks))
+        self.assertEqual(sum(end - start for start, end in chunks), audio.size)
+
+    def test_short_audio_is_single_chunk(self):
+        audio = self.make_audio(10, silences=[])
+        self.assertEqual(split_on_silence(audio, self.sample_rate, chunk_seconds=20, search_seconds=5), [(0, audio.size)])
+
+    def test_segment_timestamps_are_offset_by_chunk_start(self):
+        chunks = [(0, 20000), (20000, 45000), (45000, 50000)]
+        parts = [
+            {'text': '안녕하세요', 'segments': [{'start': 0.0, 'end': 1.5, 'text': '안녕하세요'}]},
+            {'text': '', 'segments': []},
+            {'text': '감사합니다', 'segments': [{'start': 0.25, 'end': 2.0, 'text': '감사합니다'}]},
+        ]
+        result = merge_chunk_results(chunks, parts, self.sample_rate)
+        self.assertEqual(result['text'], '안녕하세요 감사합니다')
+        self.assertEqual(
+            [(seg['start'], seg['end']) for seg in result['segments']],
+            [(0.0, 1.5), (45.25, 47.0)],
+        )
+
+    @override_settings(STT_PARALLEL_WORKERS=3)
+    def test_pool_is_sized_from_setting(self):
+        _reset_executor()
+        with mock.patch('coaching.stt.ProcessPoolExecutor') as pool:
+            _get_executor()
+        _reset_executor()
+        self.assertEqual(pool.call_args.kwargs['max_workers'], 3)
+
+
+@override_settings(
+    STT_MODEL_POLICY_ENABLED=True,
+    STT_MODEL_TIERS=['small', 'base', 'tiny'],
+    STT_MODEL_RTF={'small': 0.5, 'base': 0.2, 'tiny': 0.1},
+    STT_LATENCY_BUDGET_SECONDS=300,
+    WHISPER_MODEL='base',
+)
+class STTModelPolicyTests(TestCase):
+    """STT 모델 선택: 작업당 예산 = 지연 예산 / (대기 작업 수 + 1) 안에 끝나는 가장 큰 모델"""
+
+    def test_empty_queue_uses_full_budget(self):
+        # 600초 파일: small 300초 <= 300초
+        self.assertEqual(select_stt_model(600, queue_depth=0), 'small')
+
+    def test_queue_depth_divides_budget(self):
+        # 대기 1건이면 작업당 150초: small 300초 초과, base 120초
+        self.assertEqual(select_stt_model(600, queue_depth=1), 'base')
+        # 대기 3건이면 작업당 75초: base 120초 초과, tiny 60초
+        self.assertEqual(select_stt_model(600, queue_depth=3), 'tiny')
+
+    def test_falls_back_to_smallest_tier(self):
+        self.assertEqual(select_stt_model(600, queue_depth=100), 'tiny')
+
+    def test_unknown_duration_or_disabled_policy_uses_default_model(self):
+        self.assertEqual(select_stt_model(None, queue_depth=0), 'base')
+        with override_settings(STT_MODEL_POLICY_ENABLED=False):
+            self.assertEqual(select_stt_model(600, queue_depth=0), 'base')
+
+    def test_queue_depth_is_read_from_broker_when_not_given(self):
+        with mock.patch('coaching.stt_policy.get_stt_queue_depth', return_value=1) as depth:
+            self.assertEqual(select_stt_model(600), 'base')
+        depth.assert_called_once()
+
+    def test_cache_candidates_are_chosen_and_larger_models(self):
+        self.assertEqual(cache_candidate_models('tiny'), ['small', 'base', 'tiny'])
+        self.assertEqual(cache_candidate_models('base'), ['small', 'base'])
+        self.assertEqual(cache_candidate_models('small'), ['small'])
+        self.assertEqual(cache_candidate_models('large'), ['large'])
+
+
+class STTEngineTests(TestCase):
+    """STT 엔진 인터페이스와 벤치마크 명령"""
+
+    def test_partial_engine_cannot_be_instantiated(self):
+        class LoadOnlyEngine(STTEngine):
+            name = 'load-only'
+
+            def load(self, model_name, threads=None):
+                return object()
+
+        with self.assertRaises(TypeError):
+            LoadOnlyEngine()
+
+    def test_benchmark_skips_empty_samples(self):
+        import numpy as np
+        with mock.patch('coaching.management.commands.benchmark_stt.load_audio', return_value=np.zeros(0)), \
+                mock.patch('coaching.management.commands.benchmark_stt.Path.exists', return_value=True), \
+                mock.patch('coaching.management.commands.benchmark_stt.Path.read_text', return_value=''):
+            with self.assertRaisesMessage(CommandError, '벤치마크할 오디오가 없습니다'):
+                call_command('benchmark_stt', 'empty.wav', stdout=io.StringIO())
+
+
+class QuotaRetryTests(TestCase):
+    """할당량 대기: 공용 토큰 버킷 대기는 실패 없이 지터를 더해 다시 예약"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='quota-test', password='password')
+        self.consultation = Consultation.objects.create(
+            user=user, title='대기', file='consultations/a.txt', file_type='text', status='processing',
+        )
+        self.task = mock.Mock()
+        self.task.retry.return_value = Retry()
+
+    def test_rate_limited_task_is_requeued_not_failed(self):
+        # 누적 대기 시간이 길어도 토큰 버킷 대기는 실패로 처리하지 않음
+        with self.assertRaises(Retry):
+            _retry_on_quota(self.task, QuotaWait('rate limited', retry_after=20), [self.consultation], 0, 10_000)
+
+        self.consultation.refresh_from_db()
+        self.assertEqual(self.consultation.status, 'waiting_quota')
+        kwargs = self.task.retry.call_args.kwargs
+        self.assertTrue(20 <= kwargs['countdown'] <= 22)
+        self.assertEqual(kwargs['kwargs']['quota_retries'], 0)
+
+    def test_api_quota_exhaustion_fails_after_max_retries(self):
+        with override_settings(GEMINI_MAX_RETRIES=1), self.assertRaises(Ignore):
+            _retry_on_quota(
+                self.task, QuotaWait('exhausted', quota_exceeded=True), [self.consultation], 1, 0,
+            )
+        self.consultation.refresh_from_db()
+        self.assertEqual(self.consultation.status, 'failed')
+        self.task.retry.assert_not_called()
+
+
+class BatchAnalysisTests(TestCase):
+    """일괄 분석: 지연 flush 예약, 결과를 찾을 수 없는 상담은 단건 분석으로 처리"""
+
+    @override_settings(ANALYSIS_BATCH_MAX_ITEMS=5, ANALYSIS_BATCH_MAX_WAIT_MS=2000)
+    def test_every_enqueue_schedules_delayed_flush(self):
+        user = User.objects.create_user(username='batch-test', password='password')
+        consultation = Consultation.objects.create(
+            user=user, title='짧은 상담', file='consultations/a.txt', file_type='text',
+        )
+        # 첫 번째가 아닌 상담도 지연 flush를 예약해야 앞선 예약이 유실되어도 처리됨
+        with mock.patch('coaching.tasks.batching.is_batchable', return_value=True), \
+                mock.patch('coaching.tasks.batching.enqueue', return_value=3), \
+                mock.patch('coaching.tasks.flush_analysis_batch') as flush:
+            analyze_consultation(consultation.id)
+        flush.apply_async.assert_called_once_with(countdown=2.0)
+
+    def test_results_are_split_by_consultation_id(self):
+        response = '```json\n[{"consultation_id": 2, "summary": "b"}, {"consultation_id": "1", "summary": "a"}]\n```'
+        results = split_batch_analysis_response(response, [1, 2])
+        self.assertEqual(set(results), {1, 2})
+        self.assertEqual(json.loads(results[1]), {'summary': 'a'})
+
+    def test_mismatched_items_fall_back(self):
+        response = json.dumps([
+            {'consultation_id': 1, 'summary': 'a'},
+            {'consultation_id': 1, 'summary': 'duplicate'},
+            {'consultation_id': 2},
+            {'consultation_id': 9, 'summary': 'unknown'},
+            {'summary': 'no id'},
+        ])
+        self.assertEqual(split_batch_analysis_response(response, [1, 2, 3]), {})
+
+    def test_non_array_response_falls_back(self):
+        self.assertEqual(split_batch_analysis_response('{"summary": "a"}', [1, 2]), {})
+        self.assertEqual(split_batch_analysis_response('not json', [1, 2]), {})
+
+
+@override_settings(GEMINI_CHARS_PER_TOKEN=1, ANALYSIS_WINDOW_TOKENS=50, ANALYSIS_MAP_CONCURRENCY=2)
+class LongTranscriptAnalysisTests(TestCase):
+    """긴 상담 내용: 토큰 상한 구간 분할, 구간 동시 분석 후 종합, 할당량 재시도 시 구간 결과 재사용"""
+
+    content = ' '.join(f'상담원 응대 문장 {i}번입니다.' for i in range(20))
+
+    def test_windows_respect_token_limit_and_keep_order(self):
+        windows = split_transcript_windows(self.content, 50)
+        self.assertGreater(len(windows), 1)
+        self.assertTrue(all(len(window) <= 50 for window in windows))
+        self.assertEqual(' '.join(windows).replace('\n', ' '), self.content)
+
+    def test_map_results_are_reused_after_quota_wait(self):
+        model = mock.Mock(model_name='models/test')
+        windows = split_transcript_windows(self.content, 50)
+        failing_window = windows[-1]
+
+        def first_call(_, prompt):
+            if failing_window in prompt:
+                raise QuotaWait('rate limited', retry_after=1)
+            return '{"summary": "구간"}'
+
+        with mock.patch('coaching.tasks.call_gemini', side_effect=first_call) as call:
+            with self.assertRaises(QuotaWait):
+                _analyze_long_transcript(model, 'models/test', 'text', self.content)
+        self.assertEqual(call.call_count, len(windows))
+
+        with mock.patch('coaching.tasks.call_gemini', return_value='{"summary": "종합"}') as call:
+            result = _analyze_long_transcript(model, 'models/test', 'text', self.content)
+        # 실패한 구간 하나와 종합(reduce) 호출만 다시 수행
+        self.assertEqual(result, '{"summary": "종합"}')
+        self.assertEqual(call.call_count, 2)
+        self.assertIn(f'구간 {len(windows)}/{len(windows)}', call.call_args_list[-1].args[1])
+
+
+@override_settings(MEDIA_ROOT='/tmp/coaching-test-media', DOWNLOAD_CHUNK_SIZE=16)
+class ConsultationDownloadTests(APITestCase):
+    """로컬 원본 파일 다운로드: Range(206/416), 여러 범위 요청, ETag 조건부 요청(304)"""
+
+    data = bytes(range(100))
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='download-test', password='password')
+        self.client.force_authenticate(self.user)
+        self.consultation = Consultation(user=self.user, title='다운로드', file_type='audio')
+        self.consultation.file.save('download.wav', ContentFile(self.data), save=False)
+        self.consultation.save()
+        self.url = f'/api/consultations/{self.consultation.id}/download/'
+
+    def tearDown(self):
+        self.consultation.file.delete(save=False)
+
+    def get(self, **headers):
+        return self.client.get(self.url, **{f'HTTP_{name.upper().replace("-", "_")}': value for name, value in headers.items()})
+
+    def assertBody(self, response, expected):
+        self.assertEqual(b''.join(response.streaming_content), expected)
+        self.assertEqual(response['Content-Length'], str(len(expected)))
+
+    def test_full_download(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertNotIn('Content-Range', response)
+        self.assertBody(response, self.data)
+
+    def test_open_ended_range(self):
+        response = self.get(Range='bytes=0-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 0-99/100')
+        self.assertBody(response, self.data)
+
+    def test_bounded_range_clamped_to_size(self):
+        response = self.get(Range='bytes=90-200')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 90-99/100')
+        self.assertBody(response, self.data[90:])
+
+    def test_suffix_range(self):
+        response = self.get(Range='bytes=-10')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 90-99/100')
+        self.assertBody(response, self.data[-10:])
+
+        # 파일보다 긴 접미사 범위는 파일 전체
+        response = self.get(Range='bytes=-500')
+        self.assertEqual(response['Content-Range'], 'bytes 0-99/100')
+        self.assertBody(response, self.data)
+
+    def test_unsatisfiable_ranges(self):
+        for header in ('bytes=100-', 'bytes=50-10', 'bytes=-0'):
+            with self.subTest(header=header):
+                response = self.get(Range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_multiple_ranges_fall_back_to_full_file(self):
+        response = self.get(Range='bytes=0-1,5-6')
+        self.assertEqual(response.status_code, 200)
+        self.assertBody(response, self.data)
+
+    def test_if_none_match(self):
+        etag = self.get()['ETag']
+        response = self.get(**{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        self.assertEqual(self.get(**{'If-None-Match': '"stale"'}).status_code, 200)
+
+    def test_if_range_mismatch_sends_full_file(self):
+        response = self.get(Range='bytes=0-9', **{'If-Range': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertBody(response, self.data)
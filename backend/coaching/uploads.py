@@ -0,0 +1,220 @@
+"""
+분할(재개 가능) 업로드
+
+큰 녹음/영상 파일을 multipart 요청 하나로 받으면 연결이 끊겼을 때 처음부터 다시 올려야 하고,
+Django가 요청 본문 전체를 임시 파일로 받아둔 뒤에야 뷰가 실행됩니다.
+업로드 세션을 만든 뒤 청크를 오프셋 위치에 PUT하고 마지막에 완료(finalize)하는 방식으로 받으며,
+청크는 세션 행을 잠그지 않은 채 임시 파일로 먼저 받은 뒤, 잠금을 잡고 최종 저장 위치에 기록하며
+내용 지문(content hash)도 기록하면서 함께 계산합니다.
+"""
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import FileUploadHandler
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .fingerprint import BLOCK_SIZE, ContentHasher
+from .models import Consultation, UploadSession
+
+
+# 요청 본문을 읽어 파일에 기록하는 단위
+READ_SIZE = 64 * 1024
+
+
+class ContentHashUploadHandler(FileUploadHandler):
+    """
+    multipart 업로드를 받는 동안 파일 내용 지문을 함께 계산하는 업로드 핸들러
+
+    데이터는 그대로 다음 핸들러(메모리/임시 파일)로 넘기므로 저장 방식에는 영향이 없고,
+    저장 후 파일을 다시 읽지 않아도 됩니다. 계산된 지문은 content_hashes[필드명]에 남습니다.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.content_hashes = {}
+        self._hasher = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hasher = ContentHasher()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.content_hashes[self.field_name] = self._hasher.hexdigest()
+        return None
+
+
+class UploadError(Exception):
+    """청크 업로드/완료 요청을 처리할 수 없는 경우 (status_code로 응답)"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def reserve_upload_file(file_name: str) -> str:
+    """
+    청크를 기록할 최종 저장 위치를 빈 파일로 예약
+
+    Returns:
+        저장소 기준 파일 이름 (consultations/...)
+    """
+    name = get_valid_filename(os.path.basename(file_name)) or 'upload'
+    return default_storage.save(f'consultations/{name}', ContentFile(b''))
+
+
+def parse_checksum_header(value):
+    """
+    Upload-Checksum 헤더 파싱 ("sha256 <base64 digest>")
+
+    Returns:
+        청크의 SHA-256 digest. 헤더가 없으면 None
+    """
+    if not value:
+        return None
+    algorithm, _, encoded = value.strip().partition(' ')
+    if algorithm.lower() != 'sha256':
+        raise UploadError('Upload-Checksum은 sha256만 지원합니다.')
+    try:
+        return base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError):
+        raise UploadError('Upload-Checksum 값이 올바른 base64가 아닙니다.')
+
+
+def check_chunk(session: UploadSession, offset: int, length: int):
+    """청크를 받을 수 있는 세션/오프셋/크기인지 확인"""
+    if session.status != 'uploading':
+        raise UploadError('이미 완료된 업로드입니다.', 409)
+    if offset != session.offset:
+        raise UploadError(f'Upload-Offset이 현재 오프셋({session.offset})과 다릅니다.', 409)
+    if length <= 0 or offset + length > session.total_size:
+        raise UploadError('청크 크기가 올바르지 않습니다.')
+    if offset + length < session.total_size and length % BLOCK_SIZE:
+        # 마지막이 아닌 청크는 지문 블록 경계에서 끝나야 다음 요청에서 이어서 계산 가능
+        raise UploadError(f'마지막 청크가 아니면 크기가 {BLOCK_SIZE} 바이트의 배수여야 합니다.')
+
+
+def receive_chunk(stream, length: int, checksum: bytes = None):
+    """
+    요청 본문에서 청크를 받아 임시 파일(작으면 메모리)에 저장
+
+    클라이언트에서 본문을 받는 동안에는 세션 행을 잠그지 않도록 먼저 받아두고,
+    받은 뒤 잠금을 잡아 write_chunk로 기록합니다.
+    본문을 끝까지 받지 못했거나(연결 끊김 포함) 체크섬이 맞지 않으면 UploadError(400)가 발생합니다.
+
+    Returns:
+        처음 위치로 되감은 임시 파일 (호출 측에서 닫아야 함)
+    """
+    chunk_file = tempfile.SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE, dir=settings.FILE_UPLOAD_TEMP_DIR,
+    )
+    chunk_hash = hashlib.sha256() if checksum is not None else None
+    try:
+        remaining = length
+        while remaining:
+            try:
+                data = stream.read(min(READ_SIZE, remaining))
+            except OSError:
+                # 클라이언트 연결이 끊긴 경우 (UnreadablePostError는 OSError의 하위 클래스)
+                data = b''
+            if not data:
+                raise UploadError('청크를 끝까지 받지 못했습니다. 같은 오프셋부터 다시 보내주세요.')
+            chunk_file.write(data)
+            if chunk_hash is not None:
+                chunk_hash.update(data)
+            remaining -= len(data)
+        if chunk_hash is not None and chunk_hash.digest() != checksum:
+            raise UploadError('청크 체크섬이 일치하지 않습니다.')
+    except BaseException:
+        chunk_file.close()
+        raise
+    chunk_file.seek(0)
+    return chunk_file
+
+
+def write_chunk(session: UploadSession, chunk_file, offset: int, length: int):
+    """
+    받아둔 청크를 세션 파일의 offset 위치에 기록하고 세션의 오프셋/블록 해시 갱신
+
+    같은 세션에 대한 동시 요청은 호출 측에서 세션 행을 잠가(select_for_update) 막아야 합니다.
+    청크를 받는 동안 다른 요청이 오프셋을 옮겼을 수 있으므로 잠근 뒤 다시 확인하며,
+    기록 중 실패하면 기록한 부분을 잘라내므로 클라이언트는 같은 오프셋부터 다시 보내면 됩니다.
+    """
+    check_chunk(session, offset, length)
+
+    hasher = ContentHasher(bytes(session.block_hashes))
+    written = False
+    with open(default_storage.path(session.file.name), 'r+b') as f:
+        f.seek(offset)
+        try:
+            for data in iter(lambda: chunk_file.read(READ_SIZE), b''):
+                f.write(data)
+                hasher.update(data)
+            written = True
+        finally:
+            if not written:
+                f.truncate(offset)
+
+    session.offset = offset + length
+    session.block_hashes = hasher.block_hashes
+    update_fields = ['offset', 'block_hashes', 'updated_at']
+    if session.offset == session.total_size:
+        session.content_hash = hasher.hexdigest()
+        update_fields.append('content_hash')
+    session.save(update_fields=update_fields)
+
+
+def finalize_upload(session: UploadSession) -> Consultation:
+    """
+    모든 청크를 받은 세션으로 상담 생성 (이미 완료된 세션이면 기존 상담 반환)
+
+    파일은 이미 최종 위치에 있으므로 복사하지 않고 그대로 상담 파일로 사용합니다.
+    """
+    if session.status == 'completed':
+        if session.consultation is None:
+            raise UploadError('업로드로 생성된 상담이 삭제되었습니다.', 410)
+        return session.consultation
+    if session.offset != session.total_size:
+        raise UploadError(f'아직 모든 청크를 받지 못했습니다 ({session.offset}/{session.total_size}).', 409)
+
+    consultation = Consultation.objects.create(
+        user=session.user,
+        title=session.title,
+        file=session.file.name,
+        file_type=session.file_type,
+        content_hash=session.content_hash,
+    )
+    session.status = 'completed'
+    session.consultation = consultation
+    session.save(update_fields=['status', 'consultation', 'updated_at'])
+    return consultation
+
+
+def abort_upload(session: UploadSession):
+    """진행 중인 업로드 취소 (예약한 파일 삭제)"""
+    if session.status != 'uploading':
+        raise UploadError('완료된 업로드는 취소할 수 없습니다.', 409)
+    session.file.delete(save=False)
+    session.delete()
+
+
+def delete_expired_sessions() -> int:
+    """UPLOAD_SESSION_EXPIRE_HOURS 동안 완료되지 않은 업로드 세션과 파일 삭제"""
+    cutoff = timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_EXPIRE_HOURS)
+    expired = UploadSession.objects.filter(status='uploading', updated_at__lt=cutoff)
+    count = 0
+    for session in expired.iterator():
+        abort_upload(session)
+        count += 1
+    return count
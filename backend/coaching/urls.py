@@ -7,17 +7,23 @@ from rest_framework_simplejwt.views import (
 )
 from .views import (
     ConsultationViewSet,
+    UploadSessionViewSet,
     UserRegistrationView,
     get_current_user,
     get_kpi_metrics,
 )
+from .streams import consultation_events
 
 router = DefaultRouter()
 router.register(r'consultations', ConsultationViewSet, basename='consultation')
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 
 urlpatterns = [
     path('', include(router.urls)),
     
+    # 비동기(ASGI) 분석 진행 상황 스트림
+    path('consultations/<int:pk>/events/', consultation_events, name='consultation-events'),
+    
     # 인증 관련 URL
     path('auth/register/', UserRegistrationView.as_view(), name='register'),
     path('auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -5,25 +5,50 @@ from rest_framework.renderers import BaseRenderer
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.http import StreamingHttpResponse, HttpResponse, FileResponse, HttpResponseRedirect
+from django.conf import settings
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.dateparse import parse_date
-from django.db.models import Count, Avg, Q, F, Sum
+from django.db import transaction
+from django.db.models import Count, Avg, Q, F, Sum, Case, When
 from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 import os
+import json
+import time
+import redis
 import requests
 from urllib.parse import urlparse
 from datetime import timedelta, datetime
 from django.contrib.auth.models import User
-from .models import Consultation
+from .aggregates import EpochSeconds, PercentileCont
+from .downloads import local_file_response, remote_file_response
+from .models import Consultation, DailyConsultationRollup, DailyUserActivity, UploadSession
+from .pagination import ConsultationCursorPagination
+from .search import search_consultations
+from .storage import create_signed_url
 from .serializers import (
     ConsultationSerializer, 
+    ConsultationListSerializer,
     ConsultationCreateSerializer,
+    UploadSessionSerializer,
     UserRegistrationSerializer,
     UserSerializer
 )
-from .tasks import analyze_consultation
+from .events import STREAM_STATUSES, TERMINAL_STATUSES, build_status_event, consultation_channel, get_redis
+from .tasks import start_consultation_processing
+from .uploads import (
+    ContentHashUploadHandler,
+    UploadError,
+    abort_upload,
+    check_chunk,
+    finalize_upload,
+    parse_checksum_header,
+    receive_chunk,
+    reserve_upload_file,
+    write_chunk,
+)
 
 
 class SSERenderer(BaseRenderer):
@@ -106,19 +131,31 @@ class ConsultationViewSet(viewsets.ModelViewSet):
     """
     상담 파일을 업로드하고 분석 결과를 조회하는 API
     
-    - list: 상담 목록 조회 (본인 것만)
+    - list: 상담 목록 조회 (본인 것만, 요약 필드만 반환. include=original_content,analysis_result로 본문 포함,
+      커서 페이지네이션: page_size, cursor, count=true. q=검색어로 제목/전사본 검색 시 관련도 순 상위 결과)
     - create: 상담 파일 업로드 및 분석 시작
     - retrieve: 상담 상세 조회 (본인 것만)
     - stream: SSE를 통한 실시간 분석 진행 상황 조회
     """
     serializer_class = ConsultationSerializer
+    pagination_class = ConsultationCursorPagination
     
     def get_queryset(self):
         """현재 사용자의 상담만 조회 및 필터링"""
         if not self.request.user.is_authenticated:
             return Consultation.objects.none()
         
-        queryset = Consultation.objects.filter(user=self.request.user)
+        # 검색 벡터는 전사본만큼 크고 응답에 포함되지 않으므로 읽지 않음 (검색 조건에서만 사용)
+        queryset = Consultation.objects.filter(user=self.request.user).select_related('user').defer('search_vector')
+        
+        # 목록에서는 요청하지 않은 큰 텍스트 필드를 DB에서 읽지 않음
+        if self.action == 'list':
+            deferred = [
+                field_name for field_name in ConsultationListSerializer.INCLUDABLE_FIELDS
+                if field_name not in self.get_included_fields()
+            ]
+            if deferred:
+                queryset = queryset.defer(*deferred)
         
         # 필터링 파라미터
         title = self.request.query_params.get('title', None)
@@ -156,13 +193,55 @@ class ConsultationViewSet(viewsets.ModelViewSet):
             except (ValueError, TypeError):
                 pass
         
+        # 제목/전사본 전문 검색 (관련도 순)
+        search_text = self.get_search_text()
+        if search_text:
+            queryset = search_consultations(queryset, search_text)
+        
         return queryset
     
+    def get_search_text(self):
+        """목록 검색어 (q 쿼리 파라미터)"""
+        if self.action != 'list':
+            return ''
+        return self.request.query_params.get('q', '').strip()
+    
+    def list(self, request, *args, **kwargs):
+        """
+        상담 목록 조회
+
+        q 검색은 관련도 순으로 정렬되므로 생성일 기준 커서 대신 상위 page_size건만 반환합니다.
+        """
+        if not self.get_search_text():
+            return super().list(request, *args, **kwargs)
+        
+        limit = self.paginator.get_page_size(request)
+        queryset = self.filter_queryset(self.get_queryset())[:limit]
+        serializer = self.get_serializer(queryset, many=True)
+        return Response({'next': None, 'previous': None, 'results': serializer.data})
+    
+    def get_included_fields(self):
+        """include 쿼리 파라미터로 목록에 포함할 본문 필드 (쉼표 구분)"""
+        include = self.request.query_params.get('include', '')
+        return {
+            field_name.strip() for field_name in include.split(',')
+            if field_name.strip() in ConsultationListSerializer.INCLUDABLE_FIELDS
+        }
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return ConsultationCreateSerializer
+        if self.action == 'list':
+            return ConsultationListSerializer
         return ConsultationSerializer
     
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'list':
+            context['include'] = self.get_included_fields()
+            context['search'] = bool(self.get_search_text())
+        return context
+    
     def finalize_response(self, request, response, *args, **kwargs):
         """SSE 스트림과 파일 다운로드의 경우 DRF 처리 흐름 우회"""
         # 파일 다운로드 응답인 경우 Content-Disposition 헤더 확인
@@ -178,13 +257,17 @@ class ConsultationViewSet(viewsets.ModelViewSet):
         return super().finalize_response(request, response, *args, **kwargs)
     
     def create(self, request, *args, **kwargs):
+        # 본문을 파싱하기 전에 등록해야 파일을 받으면서 내용 지문을 계산함
+        hash_handler = ContentHashUploadHandler(request)
+        request.upload_handlers.insert(0, hash_handler)
+        
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         # 현재 사용자를 자동으로 할당
-        consultation = serializer.save(user=request.user)
+        consultation = serializer.save(user=request.user, content_hash=hash_handler.content_hashes.get('file'))
         
-        # Celery 태스크로 분석 시작
-        analyze_consultation.delay(consultation.id)
+        # Celery 태스크로 분석 시작 (원본 파일 보관은 분석 완료를 기다리지 않고 동시에 진행)
+        start_consultation_processing(consultation.id)
         
         return Response(
             ConsultationSerializer(consultation).data,
@@ -225,22 +308,56 @@ class ConsultationViewSet(viewsets.ModelViewSet):
             )
         
         def event_stream():
-            while True:
+            # 상태 이벤트 채널을 먼저 구독한 뒤 현재 상태를 확인해야 그 사이의 이벤트를 놓치지 않음
+            pubsub = None
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(consultation_channel(consultation.id))
+            except redis.RedisError as e:
+                print(f"상태 이벤트 구독 실패, DB 확인으로 대체합니다: {e}")
+                pubsub = None
+            
+            try:
                 consultation.refresh_from_db()
+                if consultation.status in STREAM_STATUSES:
+                    yield f"data: {self._format_event(consultation.status, consultation)}\n\n"
+                if consultation.status in TERMINAL_STATUSES:
+                    return
                 
-                # 상태에 따른 이벤트 전송
-                if consultation.status == 'completed':
-                    yield f"data: {self._format_event('completed', consultation)}\n\n"
-                    break
-                elif consultation.status == 'failed':
-                    yield f"data: {self._format_event('failed', consultation)}\n\n"
-                    break
-                elif consultation.status == 'processing':
-                    yield f"data: {self._format_event('processing', consultation)}\n\n"
-                
-                # 1초마다 체크
-                import time
-                time.sleep(1)
+                last_db_check = time.monotonic()
+                while True:
+                    message = None
+                    if pubsub is not None:
+                        try:
+                            message = pubsub.get_message(timeout=settings.SSE_DB_FALLBACK_INTERVAL)
+                        except redis.RedisError as e:
+                            print(f"상태 이벤트 수신 실패, DB 확인으로 대체합니다: {e}")
+                            pubsub.close()
+                            pubsub = None
+                    else:
+                        time.sleep(settings.SSE_DB_FALLBACK_INTERVAL)
+                    
+                    if message and message['type'] == 'message':
+                        data = message['data']
+                        if isinstance(data, bytes):
+                            data = data.decode('utf-8')
+                        yield f"data: {data}\n\n"
+                        if json.loads(data).get('status') in TERMINAL_STATUSES:
+                            break
+                        continue
+                    
+                    # 이벤트가 없으면 낮은 빈도로 DB 상태 확인 (이벤트 유실 대비)
+                    if time.monotonic() - last_db_check < settings.SSE_DB_FALLBACK_INTERVAL:
+                        continue
+                    last_db_check = time.monotonic()
+                    consultation.refresh_from_db()
+                    if consultation.status in STREAM_STATUSES:
+                        yield f"data: {self._format_event(consultation.status, consultation)}\n\n"
+                    if consultation.status in TERMINAL_STATUSES:
+                        break
+            finally:
+                if pubsub is not None:
+                    pubsub.close()
         
         # DRF의 응답 처리 흐름을 우회하여 직접 StreamingHttpResponse 반환
         response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
@@ -252,7 +369,7 @@ class ConsultationViewSet(viewsets.ModelViewSet):
     @swagger_auto_schema(
         method='get',
         operation_summary='원본 파일 다운로드',
-        operation_description='업로드된 원본 파일을 다운로드합니다.',
+        operation_description='업로드된 원본 파일을 다운로드합니다. Range 헤더로 부분 다운로드(206)를 지원합니다.',
         tags=['상담']
     )
     @action(detail=True, methods=['get'], renderer_classes=[SSERenderer])
@@ -268,58 +385,28 @@ class ConsultationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Supabase URL이 있으면 파일을 다운로드하여 반환
+        file_name = os.path.basename(consultation.file.name) if consultation.file else 'download'
+        
+        # Supabase URL이 있으면 파일을 스트리밍으로 전달 (또는 서명 URL로 리다이렉트)
         if consultation.supabase_file_url:
+            # URL에서 파일명 추출 시도
+            url_filename = os.path.basename(urlparse(consultation.supabase_file_url).path)
+            remote_file_name = url_filename if url_filename and url_filename != '/' else file_name
+            
+            if settings.DOWNLOAD_MODE == 'redirect':
+                signed_url = create_signed_url(consultation.supabase_file_url, remote_file_name)
+                if signed_url:
+                    return HttpResponseRedirect(signed_url)
+            
             try:
-                # Supabase URL에서 파일 다운로드
-                file_response = requests.get(consultation.supabase_file_url, stream=True)
-                file_response.raise_for_status()
-                
-                # 파일명 추출 (URL에서 또는 원본 파일명 사용)
-                file_name = os.path.basename(consultation.file.name) if consultation.file else 'download'
-                # URL에서 파일명 추출 시도
-                parsed_url = urlparse(consultation.supabase_file_url)
-                url_filename = os.path.basename(parsed_url.path)
-                if url_filename and url_filename != '/':
-                    file_name = url_filename
-                
-                # Content-Type 확인
-                content_type = file_response.headers.get('Content-Type', 'application/octet-stream')
-                
-                # 파일을 다운로드로 제공
-                response = HttpResponse(file_response.content, content_type=content_type)
-                response['Content-Disposition'] = f'attachment; filename="{file_name}"'
-                return response
+                return remote_file_response(request, consultation.supabase_file_url, remote_file_name)
             except requests.RequestException as e:
                 # Supabase 다운로드 실패 시 로컬 파일로 폴백
                 print(f"Supabase 파일 다운로드 실패: {e}")
-                if consultation.file and os.path.exists(consultation.file.path):
-                    file_path = consultation.file.path
-                    file_name = os.path.basename(file_path)
-                    
-                    response = FileResponse(
-                        open(file_path, 'rb'),
-                        content_type='application/octet-stream'
-                    )
-                    response['Content-Disposition'] = f'attachment; filename="{file_name}"'
-                    return response
-                else:
-                    return Response(
-                        {'error': '파일을 찾을 수 없습니다.'},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
         
         # 로컬 파일 다운로드
         if consultation.file and os.path.exists(consultation.file.path):
-            file_path = consultation.file.path
-            file_name = os.path.basename(file_path)
-            
-            response = FileResponse(
-                open(file_path, 'rb'),
-                content_type='application/octet-stream'
-            )
-            response['Content-Disposition'] = f'attachment; filename="{file_name}"'
-            return response
+            return local_file_response(request, consultation.file.path, file_name)
         else:
             return Response(
                 {'error': '파일을 찾을 수 없습니다.'},
@@ -328,16 +415,124 @@ class ConsultationViewSet(viewsets.ModelViewSet):
     
     def _format_event(self, event_type, consultation):
         """이벤트 데이터 포맷팅"""
-        import json
-        data = {
-            'type': event_type,
-            'consultation_id': consultation.id,
-            'status': consultation.status,
-            'analysis_result': consultation.analysis_result if consultation.analysis_result else None,
-        }
+        data = build_status_event(consultation)
+        data['type'] = event_type
         return json.dumps(data)
 
 
+class UploadSessionViewSet(viewsets.GenericViewSet):
+    """
+    큰 녹음/영상 파일의 분할(재개 가능) 업로드 API
+    
+    - create: 업로드 세션 생성 (title, file_name, file_type, total_size) -> id, chunk_size
+    - retrieve: 현재까지 받은 오프셋 조회 (연결이 끊긴 뒤 이어서 보낼 위치 확인)
+    - update: 청크 업로드 (PUT, Upload-Offset 헤더, 본문은 application/offset+octet-stream,
+      선택적으로 Upload-Checksum: sha256 <base64>)
+    - finalize: 모든 청크를 받은 뒤 상담 생성 및 분석 시작
+    - destroy: 진행 중인 업로드 취소
+    """
+    serializer_class = UploadSessionSerializer
+    
+    def get_queryset(self):
+        if not self.request.user.is_authenticated:
+            return UploadSession.objects.none()
+        return UploadSession.objects.filter(user=self.request.user)
+    
+    def get_locked_object(self):
+        """같은 세션에 대한 동시 청크/완료 요청을 막기 위해 세션 행을 잠가 조회 (트랜잭션 안에서 호출)"""
+        queryset = self.get_queryset().select_for_update()
+        obj = get_object_or_404(queryset, pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, obj)
+        return obj
+    
+    def _upload_error_response(self, session, error):
+        data = {'error': str(error)}
+        if session is not None:
+            data['offset'] = session.offset
+        return Response(data, status=error.status_code)
+    
+    @swagger_auto_schema(operation_summary='분할 업로드 세션 생성', tags=['업로드'])
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        file_name = serializer.validated_data['file_name']
+        session = serializer.save(user=request.user, file=reserve_upload_file(file_name))
+        return Response(self.get_serializer(session).data, status=status.HTTP_201_CREATED)
+    
+    @swagger_auto_schema(operation_summary='분할 업로드 진행 상황 조회', tags=['업로드'])
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(self.get_object()).data)
+    
+    @swagger_auto_schema(
+        operation_summary='청크 업로드',
+        operation_description=(
+            'Upload-Offset 위치에 요청 본문을 기록합니다. 마지막 청크가 아니면 chunk_size(4MB의 배수) 크기로 보내야 합니다. '
+            '오프셋이 맞지 않으면 409와 현재 offset을 반환합니다.'
+        ),
+        tags=['업로드'],
+    )
+    def update(self, request, *args, **kwargs):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'Upload-Offset과 Content-Length 헤더가 필요합니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        session = self.get_object()
+        try:
+            checksum = parse_checksum_header(request.headers.get('Upload-Checksum'))
+            # 본문을 받기 전에 오프셋을 확인하여 잘못된 요청은 바로 409로 응답
+            check_chunk(session, offset, length)
+            # request.data를 사용하지 않고 본문을 직접 받음. 느린 클라이언트가 DB 연결과 행 잠금을
+            # 붙잡지 않도록 잠금 없이 먼저 받아둔 뒤, 잠금은 오프셋 재확인과 기록/갱신에만 사용
+            with receive_chunk(request.stream, length, checksum) as chunk_file:
+                with transaction.atomic():
+                    session = self.get_locked_object()
+                    write_chunk(session, chunk_file, offset, length)
+        except UploadError as e:
+            return self._upload_error_response(session, e)
+        
+        response = Response(self.get_serializer(session).data)
+        response['Upload-Offset'] = str(session.offset)
+        return response
+    
+    @swagger_auto_schema(
+        method='post',
+        operation_summary='분할 업로드 완료',
+        operation_description='모든 청크를 받은 세션으로 상담을 생성하고 분석을 시작합니다.',
+        tags=['업로드'],
+    )
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        session = None
+        try:
+            with transaction.atomic():
+                session = self.get_locked_object()
+                created = session.status == 'uploading'
+                consultation = finalize_upload(session)
+        except UploadError as e:
+            return self._upload_error_response(session, e)
+        
+        if created:
+            start_consultation_processing(consultation.id)
+        return Response(
+            ConsultationSerializer(consultation).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+    
+    @swagger_auto_schema(operation_summary='분할 업로드 취소', tags=['업로드'])
+    def destroy(self, request, *args, **kwargs):
+        session = self.get_object()
+        try:
+            abort_upload(session)
+        except UploadError as e:
+            return self._upload_error_response(session, e)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class IsAdminUser(permissions.BasePermission):
     """관리자 권한 체크"""
     def has_permission(self, request, view):
@@ -396,30 +591,55 @@ def get_kpi_metrics(request):
         except ValueError:
             pass
     
-    # 기본 쿼리셋
+    # 기본 쿼리셋 (원본 상담 데이터는 AI 분석 품질 지표에만 사용)
     base_queryset = Consultation.objects.all()
     if start_date:
         base_queryset = base_queryset.filter(created_at__gte=start_date)
     if end_date:
         base_queryset = base_queryset.filter(created_at__lte=end_date)
     
+    # 건수/처리 시간 지표는 일별 집계 테이블에서 계산 (날짜 단위)
+    all_rollups = DailyConsultationRollup.objects.all()
+    rollups = all_rollups
+    if start_date:
+        rollups = rollups.filter(date__gte=timezone.localdate(start_date))
+    if end_date:
+        rollups = rollups.filter(date__lte=timezone.localdate(end_date))
+    
     # 1. 사용자 활동 지표
-    total_consultations = base_queryset.count()
-    daily_consultations = Consultation.objects.filter(
-        created_at__date=now.date()
-    ).count() if not date_from and not date_to else None
+    today = timezone.localdate(now)
+    week_start = today - timedelta(days=7)
     
-    weekly_consultations = Consultation.objects.filter(
-        created_at__gte=now - timedelta(days=7)
-    ).count() if not date_from and not date_to else None
+    totals = rollups.aggregate(
+        total=Sum('consultation_count'),
+        completed=Sum('consultation_count', filter=Q(status='completed')),
+        failed=Sum('consultation_count', filter=Q(status='failed')),
+        processed=Sum('processed_count'),
+        processing_seconds=Sum('processing_seconds_sum'),
+        supabase_uploaded=Sum('supabase_uploaded_count'),
+        cache_lookups=Sum('cache_lookup_count'),
+        cache_hits=Sum('cache_hit_count'),
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+    total_consultations = totals['total']
     
-    monthly_consultations = Consultation.objects.filter(
-        created_at__gte=now - timedelta(days=30)
-    ).count() if not date_from and not date_to else None
+    if not date_from and not date_to:
+        recent = all_rollups.aggregate(
+            daily=Sum('consultation_count', filter=Q(date=today)),
+            weekly=Sum('consultation_count', filter=Q(date__gte=week_start)),
+            monthly=Sum('consultation_count', filter=Q(date__gte=today - timedelta(days=30))),
+        )
+        daily_consultations = recent['daily'] or 0
+        weekly_consultations = recent['weekly'] or 0
+        monthly_consultations = recent['monthly'] or 0
+    else:
+        daily_consultations = None
+        weekly_consultations = None
+        monthly_consultations = None
     
     # 파일 타입별 분포
-    file_type_distribution = base_queryset.values('file_type').annotate(
-        count=Count('id')
+    file_type_distribution = rollups.values('file_type').annotate(
+        count=Sum('consultation_count')
     ).order_by('-count')
     
     file_type_percentages = {}
@@ -430,79 +650,108 @@ def get_kpi_metrics(request):
             )
     
     # 활성 사용자 수 (DAU, WAU)
-    today = now.date()
-    week_start = today - timedelta(days=7)
+    dau = DailyUserActivity.objects.filter(
+        date=today
+    ).values('user').distinct().count() if not date_from and not date_to else None
     
-    dau = User.objects.filter(
-        consultations__created_at__date=today
-    ).distinct().count() if not date_from and not date_to else None
-    
-    wau = User.objects.filter(
-        consultations__created_at__gte=week_start
-    ).distinct().count() if not date_from and not date_to else None
+    wau = DailyUserActivity.objects.filter(
+        date__gte=week_start
+    ).values('user').distinct().count() if not date_from and not date_to else None
     
     # 재방문율 계산 (이전에 업로드한 사용자가 다시 업로드하는 비율)
     if not date_from and not date_to:
-        # 전체 사용자 중 이번 주에 업로드한 사용자
-        users_with_previous_uploads = User.objects.filter(
-            consultations__created_at__lt=week_start
-        ).distinct()
-        users_with_recent_uploads = User.objects.filter(
-            consultations__created_at__gte=week_start
-        ).distinct()
-        returning_users = users_with_recent_uploads.filter(
-            id__in=users_with_previous_uploads.values_list('id', flat=True)
-        ).count()
-        return_rate = round((returning_users / users_with_previous_uploads.count() * 100), 1) if users_with_previous_uploads.count() > 0 else 0
+        previous_user_ids = DailyUserActivity.objects.filter(
+            date__lt=week_start
+        ).values('user').distinct()
+        previous_users = previous_user_ids.count()
+        returning_users = DailyUserActivity.objects.filter(
+            date__gte=week_start,
+            user__in=previous_user_ids,
+        ).values('user').distinct().count()
+        return_rate = round((returning_users / previous_users * 100), 1) if previous_users > 0 else 0
     else:
         return_rate = None
     
     # 2. 시스템 성능 지표
-    completed_consultations = base_queryset.filter(status='completed')
-    failed_consultations = base_queryset.filter(status='failed')
+    completed_count = totals['completed']
+    failed_count = totals['failed']
     
-    success_rate = round((completed_consultations.count() / total_consultations * 100), 1) if total_consultations > 0 else 0
-    failure_rate = round((failed_consultations.count() / total_consultations * 100), 1) if total_consultations > 0 else 0
+    success_rate = round((completed_count / total_consultations * 100), 1) if total_consultations > 0 else 0
+    failure_rate = round((failed_count / total_consultations * 100), 1) if total_consultations > 0 else 0
     
     # 평균 처리 시간 계산
-    processing_times = []
-    file_type_processing_times = {}
-    
-    for consultation in completed_consultations.filter(completed_at__isnull=False):
-        if consultation.completed_at and consultation.created_at:
-            processing_time = (consultation.completed_at - consultation.created_at).total_seconds()
-            processing_times.append(processing_time)
-            
-            # 파일 타입별 처리 시간
-            if consultation.file_type not in file_type_processing_times:
-                file_type_processing_times[consultation.file_type] = []
-            file_type_processing_times[consultation.file_type].append(processing_time)
-    
-    avg_processing_time = round(sum(processing_times) / len(processing_times), 1) if processing_times else None
+    avg_processing_time = round(totals['processing_seconds'] / totals['processed'], 1) if totals['processed'] > 0 else None
     
     # 파일 타입별 평균 처리 시간
     avg_processing_time_by_type = {}
-    for file_type, times in file_type_processing_times.items():
-        avg_processing_time_by_type[file_type] = round(sum(times) / len(times), 1)
-    
-    # 3. AI 분석 품질 지표
-    # 분석 결과 길이
-    analysis_lengths = [
-        len(c.analysis_result) for c in completed_consultations 
-        if c.analysis_result
-    ]
-    avg_analysis_length = round(sum(analysis_lengths) / len(analysis_lengths), 0) if analysis_lengths else None
-    
-    # 분석 항목 커버리지 (간단한 키워드 기반 체크)
-    analysis_keywords = ['태도', '문제해결', '커뮤니케이션', '개선', '제안', '피드백']
-    coverage_count = 0
-    for consultation in completed_consultations.filter(analysis_result__isnull=False):
-        analysis_text = consultation.analysis_result.lower()
-        found_keywords = sum(1 for keyword in analysis_keywords if keyword in analysis_text)
-        if found_keywords >= 2:  # 최소 2개 이상의 키워드가 있으면 커버리지 있음
-            coverage_count += 1
-    
-    coverage_rate = round((coverage_count / completed_consultations.count() * 100), 1) if completed_consultations.count() > 0 else 0
+    for item in rollups.filter(status='completed').values('file_type').annotate(
+        processed=Sum('processed_count'),
+        processing_seconds=Sum('processing_seconds_sum'),
+    ):
+        if item['processed']:
+            avg_processing_time_by_type[item['file_type']] = round(item['processing_seconds'] / item['processed'], 1)
+    
+    # 처리 시간 분포 (평균 및 p50/p90/p99, DB에서 집계)
+    processing_seconds = EpochSeconds(F('completed_at') - F('created_at'))
+    processed_consultations = base_queryset.filter(status='completed', completed_at__isnull=False)
+    processing_aggregates = {
+        'count': Count('id'),
+        'avg': Avg(processing_seconds),
+        'p50': PercentileCont(processing_seconds, 0.5),
+        'p90': PercentileCont(processing_seconds, 0.9),
+        'p99': PercentileCont(processing_seconds, 0.99),
+    }
+    
+    def round_stats(stats):
+        return {
+            key: (round(value, 1) if isinstance(value, float) else value)
+            for key, value in stats.items()
+        }
+    
+    processing_time_percentiles = round_stats(processed_consultations.aggregate(**processing_aggregates))
+    processing_time_stats_by_type = {}
+    for item in processed_consultations.values('file_type').annotate(**processing_aggregates).order_by('file_type'):
+        processing_time_stats_by_type[item.pop('file_type')] = round_stats(item)
+    p99_processing_time_by_type = {
+        file_type: stats['p99'] for file_type, stats in processing_time_stats_by_type.items()
+    }
+    
+    # 3. AI 분석 품질 지표 (분석 시점에 저장한 구조화 필드를 DB에서 집계)
+    # 커버리지: 응대 태도/문제 해결/커뮤니케이션 점수와 개선 권고 중 2개 이상이 포함된 분석
+    covered_areas = (
+        Case(When(attitude_score__isnull=False, then=1), default=0)
+        + Case(When(problem_solving_score__isnull=False, then=1), default=0)
+        + Case(When(communication_score__isnull=False, then=1), default=0)
+        + Case(When(Q(recommendation_high_count__gt=0) | Q(recommendation_medium_count__gt=0)
+                    | Q(recommendation_low_count__gt=0), then=1), default=0)
+    )
+    quality = base_queryset.filter(status='completed').annotate(covered_areas=covered_areas).aggregate(
+        completed=Count('id'),
+        parsed=Count('id', filter=Q(analysis_parsed=True)),
+        covered=Count('id', filter=Q(covered_areas__gte=2)),
+        avg_analysis_length=Avg('analysis_length'),
+        avg_overall_score=Avg('overall_score'),
+        avg_attitude_score=Avg('attitude_score'),
+        avg_problem_solving_score=Avg('problem_solving_score'),
+        avg_communication_score=Avg('communication_score'),
+        high_recommendations=Sum('recommendation_high_count'),
+        medium_recommendations=Sum('recommendation_medium_count'),
+        low_recommendations=Sum('recommendation_low_count'),
+        score_1_3=Count('id', filter=Q(overall_score__lt=4)),
+        score_4_6=Count('id', filter=Q(overall_score__gte=4, overall_score__lt=7)),
+        score_7_8=Count('id', filter=Q(overall_score__gte=7, overall_score__lt=9)),
+        score_9_10=Count('id', filter=Q(overall_score__gte=9)),
+    )
+    
+    def round_or_none(value, digits=1):
+        return round(value, digits) if value is not None else None
+    
+    avg_analysis_length = round_or_none(quality['avg_analysis_length'], 0)
+    coverage_rate = round((quality['covered'] / quality['completed'] * 100), 1) if quality['completed'] > 0 else 0
+    parse_success_rate = round((quality['parsed'] / quality['completed'] * 100), 1) if quality['completed'] > 0 else 0
+    
+    # 분석 결과 캐시 히트율
+    cache_hit_rate = round((totals['cache_hits'] / totals['cache_lookups'] * 100), 1) if totals['cache_lookups'] > 0 else None
     
     # 4. 기술적 지표
     # 데이터베이스 크기 (SQLite인 경우)
@@ -518,7 +767,7 @@ def get_kpi_metrics(request):
         pass
     
     # Supabase 업로드 성공률
-    supabase_uploaded = base_queryset.filter(supabase_file_url__isnull=False).count()
+    supabase_uploaded = totals['supabase_uploaded']
     supabase_success_rate = round((supabase_uploaded / total_consultations * 100), 1) if total_consultations > 0 else 0
     
     # 응답 데이터 구성
@@ -541,17 +790,40 @@ def get_kpi_metrics(request):
         },
         'system_performance': {
             'total_consultations': total_consultations,
-            'completed_count': completed_consultations.count(),
-            'failed_count': failed_consultations.count(),
+            'completed_count': completed_count,
+            'failed_count': failed_count,
             'success_rate': success_rate,
             'failure_rate': failure_rate,
             'avg_processing_time_seconds': avg_processing_time,
             'avg_processing_time_by_type': avg_processing_time_by_type,
+            'processing_time_percentiles': processing_time_percentiles,
+            'processing_time_stats_by_type': processing_time_stats_by_type,
+            'p99_processing_time_by_type': p99_processing_time_by_type,
         },
         'ai_analysis_quality': {
             'avg_analysis_length': avg_analysis_length,
             'coverage_rate': coverage_rate,
-            'completed_analyses': completed_consultations.count(),
+            'parse_success_rate': parse_success_rate,
+            'avg_scores': {
+                'overall': round_or_none(quality['avg_overall_score']),
+                'customer_service_attitude': round_or_none(quality['avg_attitude_score']),
+                'problem_solving': round_or_none(quality['avg_problem_solving_score']),
+                'communication_skills': round_or_none(quality['avg_communication_score']),
+            },
+            'overall_score_distribution': {
+                '1-3': quality['score_1_3'],
+                '4-6': quality['score_4_6'],
+                '7-8': quality['score_7_8'],
+                '9-10': quality['score_9_10'],
+            },
+            'recommendation_counts': {
+                'high': quality['high_recommendations'] or 0,
+                'medium': quality['medium_recommendations'] or 0,
+                'low': quality['low_recommendations'] or 0,
+            },
+            'completed_analyses': completed_count,
+            'cache_hit_rate': cache_hit_rate,
+            'cache_hits': totals['cache_hits'],
         },
         'technical_metrics': {
             'db_size_mb': db_size,
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Django 초기화 이후에 import해야 모델을 불러올 수 있음
+from coaching.streams import StreamDisconnectMiddleware  # noqa: E402
+
+application = StreamDisconnectMiddleware(django_application)
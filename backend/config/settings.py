@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
@@ -184,6 +185,8 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'upload-offset',
+    'upload-checksum',
 ]
 
 # Preflight 요청 캐시 시간 (초)
@@ -197,18 +200,151 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# 분석 파이프라인 단계별 큐 라우팅
+# - stt: CPU 집약적인 전사 작업 (적은 수의 프로세스로 실행)
+# - llm: Gemini API 호출 (네트워크 대기 위주, threads 풀로 높은 동시성)
+# - storage: Supabase 업로드 (네트워크 I/O 위주, threads 풀, 분석과 별도로 상담 생성 시 시작)
+CELERY_TASK_ROUTES = {
+    'coaching.tasks.analyze_consultation': {'queue': 'llm'},
+    'coaching.tasks.transcribe_consultation': {'queue': 'stt'},
+    'coaching.tasks.analyze_transcript': {'queue': 'llm'},
+    'coaching.tasks.archive_consultation': {'queue': 'storage'},
+    'coaching.tasks.flush_analysis_batch': {'queue': 'llm'},
+    'coaching.tasks.analyze_batch': {'queue': 'llm'},
+}
+# 긴 STT 작업이 다른 작업을 미리 가져가 붙잡아두지 않도록 함
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv('CELERY_WORKER_PREFETCH_MULTIPLIER', '1'))
+
+# 진행 상황 이벤트(pub/sub)용 Redis
+REDIS_URL = os.getenv('REDIS_URL', CELERY_BROKER_URL)
+# SSE 스트림에서 이벤트 유실에 대비해 DB 상태를 확인하는 주기 (초)
+SSE_DB_FALLBACK_INTERVAL = float(os.getenv('SSE_DB_FALLBACK_INTERVAL', '15'))
+# 비동기 SSE 스트림에서 프록시 유휴 타임아웃을 막기 위한 하트비트 주기 (초)
+SSE_HEARTBEAT_INTERVAL = float(os.getenv('SSE_HEARTBEAT_INTERVAL', '15'))
+
 # Google Gemini Configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 # 모델 선택: gemini-2.0-flash (기본값, 빠르고 저렴, multimodal 지원), gemini-2.5-flash, gemini-2.5-pro
 # 사용 가능한 모델: gemini-2.0-flash, gemini-2.5-flash, gemini-2.5-pro, gemini-flash-latest, gemini-pro-latest
 GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')
 
+# Gemini 호출 속도 제한 (모든 워커가 Redis 토큰 버킷을 공유, 모델별 적용, 0이면 제한 없음)
+GEMINI_RPM_LIMIT = int(os.getenv('GEMINI_RPM_LIMIT', '15'))
+GEMINI_TPM_LIMIT = int(os.getenv('GEMINI_TPM_LIMIT', '1000000'))
+# 토큰 수 추정: 프롬프트 글자 수 / GEMINI_CHARS_PER_TOKEN + 예상 출력 토큰 수
+GEMINI_CHARS_PER_TOKEN = float(os.getenv('GEMINI_CHARS_PER_TOKEN', '2'))
+GEMINI_OUTPUT_TOKEN_ESTIMATE = int(os.getenv('GEMINI_OUTPUT_TOKEN_ESTIMATE', '1024'))
+# 호출 용량이 없어 LLM 단계를 다시 예약하며 기다리는 최대 누적 시간 (초)
+# 0이면 제한 없음: 토큰 버킷 대기는 API 에러가 아니므로 기본적으로 실패 처리하지 않고 순서대로 처리
+# 지정하는 경우 대기열 길이 / RPM보다 충분히 큰 값 (예: 수 시간)으로 설정
+GEMINI_RATE_LIMIT_TIMEOUT = float(os.getenv('GEMINI_RATE_LIMIT_TIMEOUT', '0'))
+# 할당량 초과(ResourceExhausted) 시 재시도 설정
+# 워커에서 대기하지 않고 LLM 단계를 countdown으로 다시 예약하며, 재시도 횟수를 모두 쓰면 실패 처리
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '5'))
+GEMINI_RETRY_BASE_DELAY = float(os.getenv('GEMINI_RETRY_BASE_DELAY', '2'))
+GEMINI_RETRY_MAX_DELAY = float(os.getenv('GEMINI_RETRY_MAX_DELAY', '300'))
+
+# 분석 결과 캐시 (동일한 상담 내용 재분석 시 Gemini 호출 생략)
+ANALYSIS_CACHE_ENABLED = os.getenv('ANALYSIS_CACHE_ENABLED', 'True') == 'True'
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv('ANALYSIS_CACHE_TTL_SECONDS', str(60 * 60 * 24 * 30)))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '10000'))
+
+# STT 전사본 캐시 (같은 녹음 파일 재업로드 시 ffmpeg/Whisper 전사 생략)
+TRANSCRIPT_CACHE_ENABLED = os.getenv('TRANSCRIPT_CACHE_ENABLED', 'True') == 'True'
+TRANSCRIPT_CACHE_TTL_SECONDS = int(os.getenv('TRANSCRIPT_CACHE_TTL_SECONDS', str(60 * 60 * 24 * 90)))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv('TRANSCRIPT_CACHE_MAX_ENTRIES', '10000'))
+
+# 짧은 텍스트 상담 일괄 분석 (여러 건을 한 번의 Gemini 요청으로 분석하여 RPM 할당량 절약)
+# 최대 ANALYSIS_BATCH_MAX_ITEMS건 또는 ANALYSIS_BATCH_MAX_WAIT_MS 동안 모아서 전송
+ANALYSIS_BATCH_ENABLED = os.getenv('ANALYSIS_BATCH_ENABLED', 'False') == 'True'
+ANALYSIS_BATCH_MAX_ITEMS = int(os.getenv('ANALYSIS_BATCH_MAX_ITEMS', '5'))
+ANALYSIS_BATCH_MAX_WAIT_MS = int(os.getenv('ANALYSIS_BATCH_MAX_WAIT_MS', '2000'))
+# 이 크기(바이트) 이하의 텍스트 파일만 일괄 분석 대상
+ANALYSIS_BATCH_MAX_FILE_SIZE = int(os.getenv('ANALYSIS_BATCH_MAX_FILE_SIZE', str(16 * 1024)))
+
+# 긴 상담 내용 분석 (map-reduce)
+# 프롬프트 추정 토큰 수가 ANALYSIS_LONG_TRANSCRIPT_TOKENS를 넘으면 ANALYSIS_WINDOW_TOKENS 이하의 구간으로 나누어
+# 최대 ANALYSIS_MAP_CONCURRENCY개씩 동시에 분석한 뒤, 구간별 결과를 한 번 더 호출하여 종합
+ANALYSIS_LONG_TRANSCRIPT_TOKENS = int(os.getenv('ANALYSIS_LONG_TRANSCRIPT_TOKENS', '24000'))
+ANALYSIS_WINDOW_TOKENS = int(os.getenv('ANALYSIS_WINDOW_TOKENS', '8000'))
+ANALYSIS_MAP_CONCURRENCY = int(os.getenv('ANALYSIS_MAP_CONCURRENCY', '4'))
+
+# Whisper STT Configuration
+# STT 엔진: whisper (openai-whisper, PyTorch) 또는 faster-whisper (CTranslate2, CPU int8 양자화)
+STT_ENGINE = os.getenv('STT_ENGINE', 'whisper')
+# faster-whisper 연산 정밀도 (int8: CPU 양자화, float32 등)와 CPU 스레드 수 (0이면 엔진 기본값)
+STT_COMPUTE_TYPE = os.getenv('STT_COMPUTE_TYPE', 'int8')
+STT_CPU_THREADS = int(os.getenv('STT_CPU_THREADS', '0'))
+# 사용할 모델 크기: tiny, base, small, medium, large
+# 모델 선택 정책(STT_MODEL_POLICY_ENABLED)을 끄거나 파일 길이를 알 수 없을 때 사용
+WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'base')
+# 워커 프로세스당 메모리에 유지할 최대 모델 수 (초과 시 가장 오래 사용하지 않은 모델 제거)
+# 모델 선택 정책의 후보 모델 수(STT_MODEL_TIERS)만큼 유지해야 모델을 반복해서 다시 로드하지 않음
+WHISPER_MODEL_CACHE_SIZE = int(os.getenv('WHISPER_MODEL_CACHE_SIZE', '3'))
+# 워커 시작 시 미리 로드할 모델 목록 (쉼표 구분, 비워두면 첫 사용 시 로드)
+WHISPER_PRELOAD_MODELS = [m.strip() for m in os.getenv('WHISPER_PRELOAD_MODELS', '').split(',') if m.strip()]
+# 긴 오디오 병렬 분할 전사
+# 병렬 전사 프로세스 수 (0이면 CPU 코어 수). Celery prefork 자식 프로세스에서는 하위 프로세스를
+# 만들 수 없으므로 병렬 전사를 사용하려면 워커를 --pool=solo 또는 --pool=threads로 실행해야 합니다.
+STT_PARALLEL_WORKERS = int(os.getenv('STT_PARALLEL_WORKERS', '0'))
+# 이 길이(초) 이상인 오디오만 분할 전사
+STT_CHUNK_MIN_DURATION = float(os.getenv('STT_CHUNK_MIN_DURATION', '600'))
+# 목표 청크 길이(초)와 무음 경계 탐색 범위(초)
+STT_CHUNK_SECONDS = float(os.getenv('STT_CHUNK_SECONDS', '120'))
+STT_SILENCE_SEARCH_SECONDS = float(os.getenv('STT_SILENCE_SEARCH_SECONDS', '15'))
+
+# 파일 길이 기반 STT 모델 선택 정책
+# 작업당 지연 시간 예산(초) 안에 끝낼 수 있는 가장 큰 모델을 선택하며,
+# stt 큐에 대기 작업이 쌓이면 예산을 (대기 수 + 1)로 나누어 작은 모델로 내려갑니다.
+STT_MODEL_POLICY_ENABLED = os.getenv('STT_MODEL_POLICY_ENABLED', 'True') == 'True'
+# 후보 모델 (큰 모델부터, 쉼표 구분)
+STT_MODEL_TIERS = [m.strip() for m in os.getenv('STT_MODEL_TIERS', 'small,base,tiny').split(',') if m.strip()]
+STT_LATENCY_BUDGET_SECONDS = float(os.getenv('STT_LATENCY_BUDGET_SECONDS', '300'))
+# 모델별 예상 실시간 배율 (전사 시간 / 오디오 길이). 사용하는 STT 엔진 기준으로,
+# 상담별로 기록되는 stt_rtf나 benchmark_stt 명령 결과를 보고 조정
+STT_MODEL_RTF = {
+    name.strip(): float(value)
+    for name, value in (
+        item.split(':') for item in os.getenv(
+            'STT_MODEL_RTF', 'tiny:0.1,base:0.2,small:0.6,medium:1.5,large:3.0'
+        ).split(',') if item.strip()
+    )
+}
+
+# 분할(재개 가능) 업로드
+# 청크 크기는 내용 지문 블록 크기(4MB)의 배수여야 함
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', str(5 * 1024 * 1024 * 1024)))
+# 이 시간 동안 완료되지 않은 업로드 세션은 cleanup_upload_sessions 명령으로 삭제
+UPLOAD_SESSION_EXPIRE_HOURS = int(os.getenv('UPLOAD_SESSION_EXPIRE_HOURS', '24'))
+
 # Supabase Configuration
 SUPABASE_URL = os.getenv('SUPABASE_URL', '')
 # 서버 사이드에서는 service_role key 사용 권장 (RLS 우회, 모든 권한)
 # 클라이언트에서는 anon key 사용 (RLS 정책 적용)
 SUPABASE_KEY = os.getenv('SUPABASE_KEY', '')
 SUPABASE_STORAGE_BUCKET = os.getenv('SUPABASE_STORAGE_BUCKET', 'consultations')
+# Supabase 파일 요청용 공유 HTTP 세션 (프로세스당 연결 풀 크기, 타임아웃 초)
+SUPABASE_HTTP_POOL_SIZE = int(os.getenv('SUPABASE_HTTP_POOL_SIZE', '10'))
+SUPABASE_HTTP_CONNECT_TIMEOUT = float(os.getenv('SUPABASE_HTTP_CONNECT_TIMEOUT', '5'))
+SUPABASE_HTTP_READ_TIMEOUT = float(os.getenv('SUPABASE_HTTP_READ_TIMEOUT', '60'))
+# 이 크기 이상인 파일은 TUS 재개 가능 업로드로 전송 (Supabase 권장 기준 6MB)
+SUPABASE_RESUMABLE_UPLOAD_THRESHOLD = int(os.getenv('SUPABASE_RESUMABLE_UPLOAD_THRESHOLD', str(6 * 1024 * 1024)))
+# 재개 가능 업로드 청크 크기 (Supabase는 6MB 청크를 요구)
+SUPABASE_UPLOAD_CHUNK_SIZE = int(os.getenv('SUPABASE_UPLOAD_CHUNK_SIZE', str(6 * 1024 * 1024)))
+# 청크 전송 실패 시 연속 재시도 횟수
+SUPABASE_UPLOAD_MAX_RETRIES = int(os.getenv('SUPABASE_UPLOAD_MAX_RETRIES', '3'))
+# 원본 파일 보관(업로드) 태스크 재시도 횟수와 지수 백오프 지연 (초)
+ARCHIVE_MAX_RETRIES = int(os.getenv('ARCHIVE_MAX_RETRIES', '5'))
+ARCHIVE_RETRY_BASE_DELAY = int(os.getenv('ARCHIVE_RETRY_BASE_DELAY', '30'))
+ARCHIVE_RETRY_MAX_DELAY = int(os.getenv('ARCHIVE_RETRY_MAX_DELAY', '1800'))
+
+# 원본 파일 다운로드 방식
+# - proxy: 서버가 Supabase 파일을 스트리밍으로 전달 (Range 지원)
+# - redirect: 짧은 유효기간의 Supabase 서명 URL로 리다이렉트 (서버를 거치지 않음)
+DOWNLOAD_MODE = os.getenv('DOWNLOAD_MODE', 'proxy')
+DOWNLOAD_SIGNED_URL_EXPIRES = int(os.getenv('DOWNLOAD_SIGNED_URL_EXPIRES', '300'))
+DOWNLOAD_CHUNK_SIZE = int(os.getenv('DOWNLOAD_CHUNK_SIZE', str(256 * 1024)))
 
 # REST Framework
 REST_FRAMEWORK = {
@@ -223,6 +359,15 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10
 }
 
+# 상담 목록 커서 페이지네이션 (coaching.pagination.ConsultationCursorPagination)
+CONSULTATION_PAGE_SIZE = int(os.getenv('CONSULTATION_PAGE_SIZE', '10'))
+CONSULTATION_MAX_PAGE_SIZE = int(os.getenv('CONSULTATION_MAX_PAGE_SIZE', '100'))
+# count=true 요청 시 실행 계획 추정치가 이보다 작으면 정확한 COUNT(*) 사용
+CONSULTATION_EXACT_COUNT_THRESHOLD = int(os.getenv('CONSULTATION_EXACT_COUNT_THRESHOLD', '1000'))
+
+# 상담 전문 검색 설정 (PostgreSQL text search configuration, 한국어 사전이 없으므로 simple)
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'simple')
+
 # JWT Settings
 from datetime import timedelta
 
@@ -1,4 +1,6 @@
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
+// 분석 진행 상황 스트림은 비동기(ASGI) 서버에서 제공 (설정이 없으면 API 서버 사용)
+const STREAM_BASE_URL = process.env.REACT_APP_STREAM_API_URL || API_BASE_URL;
 
 // 헬퍼 함수: 인증 헤더 가져오기
 const getAuthHeaders = () => {
@@ -28,7 +30,98 @@ export const uploadConsultation = async (formData) => {
   return response.json();
 };
 
-export const getConsultations = async (filters = {}) => {
+// 이 크기 이상인 파일은 분할(재개 가능) 업로드 사용
+export const RESUMABLE_UPLOAD_THRESHOLD = 8 * 1024 * 1024;
+const CHUNK_MAX_RETRIES = 5;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const resumableUploadKey = (file) => `upload:${file.name}:${file.size}:${file.lastModified}`;
+
+const requestUploadSession = async (url, options = {}) => {
+  const response = await fetch(url, {
+    ...options,
+    headers: { ...getAuthHeaders(), ...(options.headers || {}) },
+  });
+  const data = await response.json().catch(() => ({}));
+  return { response, data };
+};
+
+// 같은 파일로 진행 중이던 세션이 있으면 이어서, 없으면 새로 생성
+const getOrCreateUploadSession = async (file, title, fileType) => {
+  const savedId = localStorage.getItem(resumableUploadKey(file));
+  if (savedId) {
+    const { response, data } = await requestUploadSession(`${API_BASE_URL}/uploads/${savedId}/`);
+    if (response.ok && data.status === 'uploading') {
+      return data;
+    }
+    localStorage.removeItem(resumableUploadKey(file));
+  }
+
+  const { response, data } = await requestUploadSession(`${API_BASE_URL}/uploads/`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ title, file_name: file.name, file_type: fileType, total_size: file.size }),
+  });
+  if (!response.ok) {
+    throw new Error(data.error || data.detail || '업로드 세션 생성 실패');
+  }
+  localStorage.setItem(resumableUploadKey(file), data.id);
+  return data;
+};
+
+// 큰 파일을 청크 단위로 업로드 (연결이 끊기면 서버에 저장된 오프셋부터 이어서 전송)
+export const uploadConsultationResumable = async (file, title, fileType, onProgress) => {
+  const session = await getOrCreateUploadSession(file, title, fileType);
+  const sessionUrl = `${API_BASE_URL}/uploads/${session.id}/`;
+  let offset = session.offset;
+  let failures = 0;
+
+  while (offset < file.size) {
+    onProgress && onProgress(offset, file.size);
+    try {
+      const chunk = file.slice(offset, offset + session.chunk_size);
+      const { response, data } = await requestUploadSession(sessionUrl, {
+        method: 'PUT',
+        headers: {
+          'Content-Type': 'application/offset+octet-stream',
+          'Upload-Offset': String(offset),
+        },
+        body: chunk,
+      });
+      if (response.status === 409 && data.offset !== undefined) {
+        // 서버가 받은 위치와 다르면 서버 오프셋부터 다시 전송
+        offset = data.offset;
+        continue;
+      }
+      if (!response.ok) {
+        throw new Error(data.error || '청크 업로드 실패');
+      }
+      offset = data.offset;
+      failures = 0;
+    } catch (error) {
+      failures += 1;
+      if (failures > CHUNK_MAX_RETRIES) {
+        throw error;
+      }
+      await sleep(Math.min(1000 * 2 ** failures, 30000));
+      const { response, data } = await requestUploadSession(sessionUrl).catch(() => ({ response: {} }));
+      if (response.ok) {
+        offset = data.offset;
+      }
+    }
+  }
+  onProgress && onProgress(file.size, file.size);
+
+  const { response, data } = await requestUploadSession(`${sessionUrl}finalize/`, { method: 'POST' });
+  if (!response.ok) {
+    throw new Error(data.error || data.detail || '업로드 완료 처리 실패');
+  }
+  localStorage.removeItem(resumableUploadKey(file));
+  return data;
+};
+
+export const getConsultations = async (filters = {}, nextUrl = null) => {
   const token = localStorage.getItem('access_token');
   const headers = {};
   
@@ -38,13 +131,15 @@ export const getConsultations = async (filters = {}) => {
   
   // 필터 파라미터를 쿼리 스트링으로 변환
   const queryParams = new URLSearchParams();
+  if (filters.q) queryParams.append('q', filters.q);
   if (filters.title) queryParams.append('title', filters.title);
   if (filters.status) queryParams.append('status', filters.status);
   if (filters.file_type) queryParams.append('file_type', filters.file_type);
   if (filters.date_from) queryParams.append('date_from', filters.date_from);
   if (filters.date_to) queryParams.append('date_to', filters.date_to);
   
-  const url = `${API_BASE_URL}/consultations/${queryParams.toString() ? '?' + queryParams.toString() : ''}`;
+  // 다음 페이지는 서버가 내려준 커서 URL을 그대로 사용
+  const url = nextUrl || `${API_BASE_URL}/consultations/${queryParams.toString() ? '?' + queryParams.toString() : ''}`;
   
   const response = await fetch(url, {
     headers,
@@ -80,7 +175,7 @@ export const getConsultation = async (id) => {
 
 export const subscribeToConsultation = (consultationId, onMessage) => {
   const token = localStorage.getItem('access_token');
-  const url = `${API_BASE_URL}/consultations/${consultationId}/stream/`;
+  const url = `${STREAM_BASE_URL}/consultations/${consultationId}/events/`;
   
   // EventSource는 헤더를 설정할 수 없으므로 fetch API를 사용하여 스트림 읽기
   const controller = new AbortController();
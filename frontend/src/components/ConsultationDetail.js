@@ -149,6 +149,14 @@ function ConsultationDetail() {
           </div>
         )}
 
+        {consultation.status === 'waiting_quota' && (
+          <div className="detail-section">
+            <div className="quota-notice">
+              <p>Gemini API 할당량이 부족하여 분석이 잠시 대기 중입니다. 할당량이 회복되면 자동으로 다시 분석합니다.</p>
+            </div>
+          </div>
+        )}
+
         {consultation.status === 'pending' && (
           <div className="detail-section">
             <div className="pending-notice">
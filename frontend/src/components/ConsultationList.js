@@ -3,13 +3,24 @@ import { useNavigate } from 'react-router-dom';
 import { downloadConsultationFile } from '../api';
 import './ConsultationList.css';
 
-const ConsultationList = ({ consultations, loading, onRefresh, filters, onFiltersChange }) => {
+// 검색 결과 발췌에서 <mark>로 감싼 검색어만 강조 (나머지는 일반 텍스트로 렌더링)
+const SearchHeadline = ({ text }) => (
+  <>
+    {text.split(/(<mark>.*?<\/mark>)/g).map((part, index) => (
+      part.startsWith('<mark>') && part.endsWith('</mark>')
+        ? <mark key={index}>{part.slice(6, -7)}</mark>
+        : <React.Fragment key={index}>{part}</React.Fragment>
+    ))}
+  </>
+);
+
+const ConsultationList = ({ consultations, loading, onRefresh, hasMore, loadingMore, onLoadMore, filters, onFiltersChange }) => {
   const navigate = useNavigate();
   const [showFilters, setShowFilters] = useState(false);
   
   // 필터 상태 관리
   const [localFilters, setLocalFilters] = useState({
-    title: filters?.title || '',
+    q: filters?.q || '',
     status: filters?.status || '',
     file_type: filters?.file_type || '',
     date_from: filters?.date_from || '',
@@ -28,7 +39,7 @@ const ConsultationList = ({ consultations, loading, onRefresh, filters, onFilter
   // 필터 초기화
   const handleResetFilters = () => {
     const emptyFilters = {
-      title: '',
+      q: '',
       status: '',
       file_type: '',
       date_from: '',
@@ -76,15 +87,15 @@ const ConsultationList = ({ consultations, loading, onRefresh, filters, onFilter
           <div className="search-box">
             <input
               type="text"
-              placeholder="제목 검색"
-              value={localFilters.title}
-              onChange={(e) => handleFilterChange('title', e.target.value)}
+              placeholder="제목/내용 검색"
+              value={localFilters.q}
+              onChange={(e) => handleFilterChange('q', e.target.value)}
               className="search-input"
             />
-            {localFilters.title && (
+            {localFilters.q && (
               <button 
                 className="search-clear"
-                onClick={() => handleFilterChange('title', '')}
+                onClick={() => handleFilterChange('q', '')}
                 title="검색 초기화"
               >
                 ×
@@ -117,6 +128,7 @@ const ConsultationList = ({ consultations, loading, onRefresh, filters, onFilter
                 <option value="">전체</option>
                 <option value="pending">대기중</option>
                 <option value="processing">처리중</option>
+                <option value="waiting_quota">할당량 대기중</option>
                 <option value="completed">완료</option>
                 <option value="failed">실패</option>
               </select>
@@ -189,7 +201,14 @@ const ConsultationList = ({ consultations, loading, onRefresh, filters, onFilter
                   onClick={() => handleRowClick(consultation.id)}
                 >
                   <td className="id-cell">{consultation.id}</td>
-                  <td className="title-cell">{consultation.title}</td>
+                  <td className="title-cell">
+                    {consultation.title}
+                    {consultation.search_headline && (
+                      <div className="search-headline">
+                        <SearchHeadline text={consultation.search_headline} />
+                      </div>
+                    )}
+                  </td>
                   <td>
                     <span className="file-type-badge">{consultation.file_type}</span>
                   </td>
@@ -246,6 +265,17 @@ const ConsultationList = ({ consultations, loading, onRefresh, filters, onFilter
               ))}
             </tbody>
           </table>
+          {hasMore && (
+            <div className="load-more">
+              <button
+                className="load-more-btn"
+                onClick={onLoadMore}
+                disabled={loadingMore}
+              >
+                {loadingMore ? '불러오는 중...' : '더 보기'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
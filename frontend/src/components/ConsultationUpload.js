@@ -1,5 +1,10 @@
 import React, { useState, useRef } from 'react';
-import { uploadConsultation, subscribeToConsultation } from '../api';
+import {
+  RESUMABLE_UPLOAD_THRESHOLD,
+  uploadConsultation,
+  uploadConsultationResumable,
+  subscribeToConsultation,
+} from '../api';
 import AnalysisResultDisplay from './AnalysisResultDisplay';
 import './ConsultationUpload.css';
 
@@ -70,12 +75,19 @@ const ConsultationUpload = ({ onUploadSuccess }) => {
       setUploadStatus('업로드 중...');
       setAnalysisResult(null);
       
-      const formData = new FormData();
-      formData.append('title', title);
-      formData.append('file', file);
-      formData.append('file_type', fileType);
-
-      const consultation = await uploadConsultation(formData);
+      let consultation;
+      if (file.size >= RESUMABLE_UPLOAD_THRESHOLD) {
+        // 큰 파일은 청크로 나누어 업로드 (연결이 끊겨도 이어서 전송)
+        consultation = await uploadConsultationResumable(file, title, fileType, (sent, total) => {
+          setUploadStatus(`업로드 중... ${Math.floor((sent / total) * 100)}%`);
+        });
+      } else {
+        const formData = new FormData();
+        formData.append('title', title);
+        formData.append('file', file);
+        formData.append('file_type', fileType);
+        consultation = await uploadConsultation(formData);
+      }
       setUploadStatus('분석 중...');
 
       // SSE로 실시간 업데이트 구독
@@ -104,6 +116,8 @@ const ConsultationUpload = ({ onUploadSuccess }) => {
           setUploading(false);
         } else if (data.type === 'processing') {
           setUploadStatus('분석 중...');
+        } else if (data.type === 'waiting_quota') {
+          setUploadStatus('할당량 대기 중... (자동으로 다시 시도합니다)');
         }
       });
       
@@ -9,9 +9,11 @@ import './Dashboard.css';
 function Dashboard() {
   const [consultations, setConsultations] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextUrl, setNextUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [user, setUser] = useState(null);
   const [filters, setFilters] = useState({
-    title: '',
+    q: '',
     status: '',
     file_type: '',
     date_from: '',
@@ -51,6 +53,7 @@ function Dashboard() {
       setLoading(true);
       const data = await getConsultations(filters);
       setConsultations(data.results || data);
+      setNextUrl(data.next || null);
     } catch (error) {
       console.error('상담 목록 로드 실패:', error);
       if (error.message.includes('401') || error.message.includes('인증')) {
@@ -60,11 +63,26 @@ function Dashboard() {
         return;
       }
       setConsultations([]);
+      setNextUrl(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreConsultations = async () => {
+    if (!nextUrl || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const data = await getConsultations(filters, nextUrl);
+      setConsultations((prev) => [...prev, ...(data.results || [])]);
+      setNextUrl(data.next || null);
+    } catch (error) {
+      console.error('상담 목록 추가 로드 실패:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleUploadSuccess = () => {
     loadConsultations();
   };
@@ -117,6 +135,9 @@ function Dashboard() {
           consultations={consultations} 
           loading={loading}
           onRefresh={loadConsultations}
+          hasMore={!!nextUrl}
+          loadingMore={loadingMore}
+          onLoadMore={loadMoreConsultations}
           filters={filters}
           onFiltersChange={setFilters}
         />